@@ -4,4 +4,4 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__)
 
 # Import routes to register them with the blueprint
-from api import contact_routes, auth_routes, blog_routes, upload_routes, career_routes
\ No newline at end of file
+from api import contact_routes, auth_routes, blog_routes, upload_routes, chunked_upload_routes, direct_upload_routes, career_routes, job_routes
\ No newline at end of file
@@ -2,15 +2,25 @@
 
 from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, tuple_, select
+from sqlalchemy.orm import load_only, selectinload
 from datetime import datetime
-from models.blog import BlogPost, BlogTag, BlogPostTag, BlogComment, BlogSubscriber
+from models.blog import BlogPost, BlogTag, BlogPostTag, BlogPostRelated, BlogComment, BlogSubscriber
 from extensions import db
 from . import api_bp
 from uuid import UUID
+import base64
+import json
 
-from services.email_service import send_newsletter_email
+from services.job_queue import enqueue
+from services.blog_jobs import SEND_POST_NEWSLETTER, UPDATE_RELATED_POSTS
+from services.search_service import index_post, apply_search
+from services.response_cache import response_cache, cached_response
+from services.view_counter import view_counter
+from services.export_service import EXPORT_FORMATS, export_response, iter_query_rows
 
+# Largest page a listing request may ask for
+MAX_LISTING_LIMIT = 100
 
 # Add a new blog post
 @api_bp.route('/blog/posts', methods=['POST'])
@@ -56,23 +66,22 @@ def create_blog_post():
                     post.tags.append(tag)
 
         db.session.add(post)
-        db.session.commit()
+        db.session.flush()
+        index_post(post)
 
-        # Send newsletter email if the post is published
+        # Queue the newsletter and the related-posts update in the same transaction,
+        # a worker runs them (see worker.py)
+        newsletter_job_id = None
         if post.status == 'published':
-            subscribers = BlogSubscriber.query.filter_by(is_active=True).all()
-            email_list = [subscriber.email for subscriber in subscribers]
-            post_data = {
-                'title': post.title,
-                'slug': post.slug,
-                'content': post.content,
-                'featured_image': post.featured_image
-            }
-            send_newsletter_email(email_list, post_data)
+            newsletter_job_id = enqueue(SEND_POST_NEWSLETTER, {'post_id': post.id}, commit=False).id
+            enqueue(UPDATE_RELATED_POSTS, {'post_id': post.id}, commit=False)
 
-        
+        db.session.commit()
+        response_cache.invalidate()
 
-        return jsonify(post.to_dict()), 201
+        response = post.to_dict()
+        response['newsletter_job_id'] = newsletter_job_id
+        return jsonify(response), 201
 
     except Exception as e:
         current_app.logger.error(f"Error creating blog post: {str(e)}")
@@ -116,6 +125,7 @@ def create_tag():
 
         db.session.add(tag)
         db.session.commit()
+        response_cache.invalidate()
 
         return jsonify(tag.to_dict()), 201
 
@@ -125,39 +135,145 @@ def create_tag():
     
 
 
+def encode_cursor(post):
+    """Encode the (published_at, id) position of a post as an opaque cursor."""
+    raw = json.dumps([post.published_at.isoformat(), post.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into a (published_at, id) tuple."""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    published_at, post_id = json.loads(raw)
+    return datetime.fromisoformat(published_at), str(post_id)
+
+def parse_listing_fields(fields):
+    """
+    Resolve the fields query parameter of a listing endpoint.
+
+    Returns None for the full representation, BlogPost.SUMMARY_FIELDS for
+    'summary', or the requested field names. Raises ValueError on unknown fields.
+    """
+    if not fields:
+        return None
+    if fields == 'summary':
+        return BlogPost.SUMMARY_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in requested if field not in BlogPost.LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def listing_options(fields):
+    """Loader options that fetch only the columns needed for the given fields."""
+    options = []
+    if fields is None or 'tags' in fields:
+        # Tags for the whole page are loaded with one extra IN query rather than one per post
+        options.append(selectinload(BlogPost.tags))
+    if fields is not None:
+        # id and published_at are always needed for cursors and ordering
+        columns = {'id', 'published_at'} | {field for field in fields if field != 'tags'}
+        options.append(load_only(*(getattr(BlogPost, column) for column in columns)))
+    return options
+
 @api_bp.route('/blog/posts', methods=['GET'])
+@cached_response
 def get_blog_posts():
-    """Fetch blog posts with filtering, sorting, and pagination."""
+    """
+    Fetch blog posts with filtering, sorting, and pagination.
+
+    Pages are addressed with page/limit by default. Passing cursor (empty for
+    the first page) switches to keyset pagination on (published_at, id): the
+    response carries next_cursor instead of total, and deep pages cost the
+    same as the first one. Only posts with a publish date are listed in
+    cursor mode.
+
+    fields selects the representation of each post: 'summary' for every
+    field except the article body, or a comma-separated list of fields.
+    Without it the full post is returned.
+
+    limit must be at least 1 and is capped at MAX_LISTING_LIMIT.
+    """
     try:
         search = request.args.get('search', '')
         page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 9))
+        try:
+            limit = int(request.args.get('limit', 9))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+        limit = min(limit, MAX_LISTING_LIMIT)
         tags = request.args.get('tags', '')
         sort = request.args.get('sort', 'date_desc')
+        cursor = request.args.get('cursor')
+
+        try:
+            fields = parse_listing_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        query = BlogPost.query
+        def serialize(post):
+            return post.to_dict() if fields is None else post.to_summary_dict(fields)
+
+        query = BlogPost.query.options(*listing_options(fields))
+        relevance = None
 
         # Apply search filter
         if search:
-            query = query.filter(or_(
-                BlogPost.title.ilike(f'%{search}%'),
-                BlogPost.content.ilike(f'%{search}%')
-            ))
+            query, relevance = apply_search(query, search)
 
-        # Apply tags filter
+        # Apply tags filter (as a subquery so posts matching several tags are listed once)
         if tags:
             tag_ids = [tag.strip() for tag in tags.split(',')]
-            query = query.join(BlogPostTag).filter(BlogPostTag.tag_id.in_(tag_ids))
+            tagged_posts = db.session.query(BlogPostTag.post_id).filter(BlogPostTag.tag_id.in_(tag_ids))
+            query = query.filter(BlogPost.id.in_(tagged_posts))
+
+        # Keyset pagination, skipping the OFFSET scan and the COUNT query
+        if cursor is not None:
+            if sort == 'relevance':
+                return jsonify({'error': 'Cursor pagination does not support sort=relevance'}), 400
+
+            descending = sort != 'date_asc'
+            query = query.filter(BlogPost.published_at.isnot(None))
+
+            if cursor:
+                try:
+                    position = tuple_(*decode_cursor(cursor))
+                except (ValueError, TypeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                key = tuple_(BlogPost.published_at, BlogPost.id)
+                query = query.filter(key < position if descending else key > position)
+
+            if descending:
+                query = query.order_by(BlogPost.published_at.desc(), BlogPost.id.desc())
+            else:
+                query = query.order_by(BlogPost.published_at.asc(), BlogPost.id.asc())
+
+            # Fetch one extra row to learn whether another page exists
+            items = query.limit(limit + 1).all()
+            has_more = len(items) > limit
+            items = items[:limit]
+
+            return jsonify({
+                'posts': [serialize(post) for post in items],
+                'next_cursor': encode_cursor(items[-1]) if has_more else None,
+                'limit': limit
+            }), 200
 
         # Apply sorting
         if sort == 'date_desc':
             query = query.order_by(BlogPost.published_at.desc())
         elif sort == 'date_asc':
             query = query.order_by(BlogPost.published_at.asc())
+        elif sort == 'relevance':
+            # Without a search term there is nothing to rank, newest first instead
+            if relevance is not None:
+                query = query.order_by(relevance)
+            query = query.order_by(BlogPost.published_at.desc())
 
         # Pagination
         paginated_posts = query.paginate(page=page, per_page=limit, error_out=False)
-        posts = [post.to_dict() for post in paginated_posts.items]
+        posts = [serialize(post) for post in paginated_posts.items]
 
         return jsonify({
             'posts': posts,
@@ -171,6 +287,7 @@ def get_blog_posts():
         return jsonify({'error': 'An error occurred processing your request'}), 500
 
 @api_bp.route('/blog/tags', methods=['GET'])
+@cached_response
 def get_all_tags():
     """Fetch all available tags for blog posts."""
     try:
@@ -181,6 +298,7 @@ def get_all_tags():
         return jsonify({'error': 'An error occurred processing your request'}), 500
 
 @api_bp.route('/blog/posts/<string:slug>', methods=['GET'])
+@cached_response
 def get_blog_post_by_slug(slug):
     """Fetch a single blog post by slug."""
     try:
@@ -191,16 +309,20 @@ def get_blog_post_by_slug(slug):
         return jsonify({'error': 'An error occurred processing your request'}), 500
 
 @api_bp.route('/blog/posts/<string:post_id>/related', methods=['GET'])
+@cached_response
 def get_related_posts(post_id):
-    """Fetch related blog posts based on a post's tags or category."""
+    """Fetch related blog posts from the precomputed related-posts index."""
     try:
         limit = int(request.args.get('limit', 3))
-        post = BlogPost.query.get_or_404(post_id)
-        tag_ids = [tag.id for tag in post.tags]
-        related_posts = BlogPost.query.join(BlogPostTag).filter(
-            BlogPostTag.tag_id.in_(tag_ids),
-            BlogPost.id != post_id
-        ).limit(limit).all()
+        if db.session.query(BlogPost.id).filter_by(id=post_id).first() is None:
+            return jsonify({'error': 'Post not found'}), 404
+        related_posts = (BlogPost.query
+                         .join(BlogPostRelated, BlogPostRelated.related_post_id == BlogPost.id)
+                         .filter(BlogPostRelated.post_id == post_id)
+                         .order_by(BlogPostRelated.score.desc())
+                         .options(selectinload(BlogPost.tags))
+                         .limit(limit)
+                         .all())
         return jsonify([post.to_dict() for post in related_posts]), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching related posts: {str(e)}")
@@ -208,12 +330,20 @@ def get_related_posts(post_id):
 
 @api_bp.route('/blog/posts/<string:post_id>/views', methods=['POST'])
 def increment_post_view_count(post_id):
-    """Increment view count for a blog post."""
+    """
+    Increment view count for a blog post.
+
+    The view is buffered and written in a later batch, so the response is
+    only an acknowledgement.
+    """
     try:
-        post = BlogPost.query.get_or_404(post_id)
-        post.view_count += 1
-        db.session.commit()
-        return jsonify(post.to_dict()), 200
+        try:
+            post_id = str(UUID(post_id))
+        except ValueError:
+            return jsonify({'error': 'Invalid post_id format. Must be a valid UUID.'}), 400
+
+        view_counter.increment(post_id)
+        return jsonify({'success': True, 'post_id': post_id}), 202
     except Exception as e:
         current_app.logger.error(f"Error incrementing post view count: {str(e)}")
         return jsonify({'error': 'An error occurred processing your request'}), 500
@@ -303,3 +433,23 @@ def get_subscribers():
     except Exception as e:
         current_app.logger.error(f"Error fetching subscribers: {str(e)}")
         return jsonify({'error': 'An error occurred processing your request'}), 500
+
+@api_bp.route('/blog/newsletter/subscribers/export', methods=['GET'])
+@jwt_required()
+def export_subscribers():
+    """Stream newsletter subscribers as CSV or NDJSON."""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        
+        # Same fields as the subscribers list, read through a server-side cursor
+        statement = (select(BlogSubscriber.id, BlogSubscriber.email, BlogSubscriber.is_active,
+                            BlogSubscriber.created_at.label('subscribed_at'))
+                     .order_by(BlogSubscriber.id))
+        fields = ['id', 'email', 'is_active', 'subscribed_at']
+        
+        return export_response(iter_query_rows(statement), fields, export_format, 'subscribers')
+    except Exception as e:
+        current_app.logger.error(f"Error exporting subscribers: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
@@ -4,10 +4,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 import re
 import uuid
 from datetime import datetime
-from services.supabase_service import SupabaseService
+from services.supabase_service import SupabaseService, COUNT_MODES
+from services.async_supabase_service import AsyncSupabaseService
+from services.export_service import EXPORT_FORMATS, export_response
+from models.career_application import CareerApplication
 from security import require_api_key, validate_origin, check_honeypot, security_headers
 from . import api_bp
 
+APPLICATION_STATUSES = ['pending', 'reviewing', 'shortlisted', 'rejected', 'hired']
+
 def validate_email(email):
     """Validate email format."""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -198,12 +203,24 @@ def list_career_applications():
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)
         status_filter = request.args.get('status')
-        
-        # Get applications from Supabase
+        cursor = request.args.get('cursor')  # keyset pagination, empty for the first page
+        count = request.args.get('count', 'exact')
+        
+        if count not in COUNT_MODES:
+            return jsonify({'error': f'Invalid count. Must be one of: {", ".join(COUNT_MODES)}'}), 400
+        if cursor:
+            try:
+                SupabaseService.decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Get applications and their total from Supabase in one request
         result = SupabaseService.get_career_applications(
             page=page, 
             page_size=per_page, 
-            status_filter=status_filter
+            status_filter=status_filter,
+            cursor=cursor,
+            count=count
         )
         
         if result is None:
@@ -211,6 +228,17 @@ def list_career_applications():
                 'error': 'Failed to fetch applications'
             }), 500
         
+        if cursor is not None:
+            return jsonify({
+                'success': True,
+                'applications': result['items'],
+                'pagination': {
+                    'per_page': result['page_size'],
+                    'total': result['total'],
+                    'next_cursor': result['next_cursor']
+                }
+            }), 200
+        
         return jsonify({
             'success': True,
             'applications': result['items'],
@@ -228,6 +256,60 @@ def list_career_applications():
             'error': 'An error occurred while fetching applications'
         }), 500
 
+@api_bp.route('/apply/export', methods=['GET'])
+@jwt_required()
+def export_career_applications():
+    """Stream all career applications as CSV or NDJSON (admin only)."""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        status_filter = request.args.get('status')
+        
+        if not SupabaseService.get_client():
+            return jsonify({
+                'error': 'Failed to fetch applications'
+            }), 500
+        
+        # Applications live in Supabase, fetched page by page while the response streams
+        rows = SupabaseService.iter_career_applications(status_filter=status_filter)
+        fields = [column.name for column in CareerApplication.__table__.c]
+        
+        return export_response(rows, fields, export_format, 'career_applications')
+        
+    except Exception as e:
+        current_app.logger.error(f"Error exporting career applications: {str(e)}")
+        return jsonify({
+            'error': 'An error occurred while fetching applications'
+        }), 500
+
+@api_bp.route('/apply/stats', methods=['GET'])
+@jwt_required()
+def career_application_stats():
+    """Count career applications per status (admin only)."""
+    try:
+        # One count query per status, all in flight at once
+        counts = AsyncSupabaseService.fan_out(*(
+            AsyncSupabaseService.count_career_applications(status) for status in APPLICATION_STATUSES
+        ))
+        
+        if any(count is None for count in counts):
+            return jsonify({
+                'error': 'Failed to fetch applications'
+            }), 500
+        
+        return jsonify({
+            'success': True,
+            'total': sum(counts),
+            'by_status': dict(zip(APPLICATION_STATUSES, counts))
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error counting career applications: {str(e)}")
+        return jsonify({
+            'error': 'An error occurred while fetching applications'
+        }), 500
+
 @api_bp.route('/apply/<application_id>/status', methods=['PUT'])
 @jwt_required()
 def update_application_status(application_id):
@@ -239,9 +321,8 @@ def update_application_status(application_id):
         if not data.get('status'):
             return jsonify({'error': 'Status is required'}), 400
         
-        valid_statuses = ['pending', 'reviewing', 'shortlisted', 'rejected', 'hired']
-        if data.get('status') not in valid_statuses:
-            return jsonify({'error': f'Invalid status. Must be one of: {", ".join(valid_statuses)}'}), 400
+        if data.get('status') not in APPLICATION_STATUSES:
+            return jsonify({'error': f'Invalid status. Must be one of: {", ".join(APPLICATION_STATUSES)}'}), 400
         
         # Update status in Supabase
         updated_application = SupabaseService.update_career_application_status(
@@ -0,0 +1,155 @@
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.utils import secure_filename
+from extensions import db
+from models.upload import ChunkedUpload
+from services.chunked_upload import (
+    ChunkedUploadError, create_upload, store_part, complete_upload, abort_upload
+)
+from services.upload_stream import UploadTooLarge, MalformedUpload
+from .upload_routes import SHA256_PATTERN
+
+from . import api_bp
+
+# Images plus the video and audio formats browsers play natively
+MEDIA_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp4', 'webm', 'mov', 'm4v', 'mp3', 'm4a', 'ogg'}
+
+def allowed_media_file(filename):
+    """Check if the file extension is allowed for chunked uploads"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in MEDIA_EXTENSIONS
+
+def get_own_upload(upload_id):
+    """Return the upload if it exists and belongs to the current user, None otherwise"""
+    upload = db.session.get(ChunkedUpload, upload_id)
+    if upload is None or upload.created_by != str(get_jwt_identity()):
+        return None
+    return upload
+
+def upload_response(upload, status=200, **extra):
+    """Upload state, with the resumable offset also in an Upload-Offset header"""
+    data = {**extra, **upload.to_dict()}
+    response = jsonify(data)
+    response.headers['Upload-Offset'] = str(data['offset'])
+    return response, status
+
+# Start a resumable upload
+@api_bp.route('/uploads/multipart', methods=['POST'])
+@jwt_required()
+def initiate_chunked_upload():
+    """
+    Start a chunked upload.
+
+    Expects JSON with filename, size (bytes) and optionally content_type. The
+    response gives the upload_id and the part_size every part but the last
+    must have; parts are then PUT to /uploads/multipart/<upload_id>/parts/<n>.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(data.get('filename') or '')
+        if not filename or not allowed_media_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        try:
+            size = int(data.get('size'))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Missing required field: size'}), 400
+
+        upload = create_upload(filename, data.get('content_type'), size, created_by=str(get_jwt_identity()))
+        return upload_response(upload, 201)
+
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error starting chunked upload: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+# Offset query, to find out where to resume
+@api_bp.route('/uploads/multipart/<string:upload_id>', methods=['GET'])
+@jwt_required()
+def get_chunked_upload(upload_id):
+    """Get the state of a chunked upload: received and missing parts, offset and, once assembled, its URL."""
+    try:
+        upload = get_own_upload(upload_id)
+        if upload is None:
+            return jsonify({'error': 'Upload not found'}), 404
+        return upload_response(upload)
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching chunked upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+# Upload one part
+@api_bp.route('/uploads/multipart/<string:upload_id>/parts/<int:part_number>', methods=['PUT'])
+@jwt_required()
+def upload_chunked_part(upload_id, part_number):
+    """
+    Upload part part_number (1-based) of a chunked upload as the raw request body.
+
+    Parts may be sent in any order and in parallel. X-Content-SHA256 can be
+    set to have the part checked before it is accepted.
+    """
+    try:
+        upload = get_own_upload(upload_id)
+        if upload is None:
+            return jsonify({'error': 'Upload not found'}), 404
+
+        claimed_digest = request.headers.get('X-Content-SHA256', '').lower() or None
+        if claimed_digest and not SHA256_PATTERN.match(claimed_digest):
+            return jsonify({'error': 'X-Content-SHA256 must be a hex SHA-256 digest'}), 400
+
+        part = store_part(upload, part_number, request.stream, request.content_length, claimed_digest)
+        return upload_response(upload, part={'part_number': part.part_number, 'size': part.size, 'sha256': part.sha256})
+
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except UploadTooLarge:
+        return jsonify({'error': f'Part {part_number} is larger than {upload.part_length(part_number)} bytes'}), 400
+    except MalformedUpload as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error uploading part {part_number} of {upload_id}: {str(e)}")
+        return jsonify({'error': 'Failed to upload to Supabase'}), 500
+
+# Assemble the parts
+@api_bp.route('/uploads/multipart/<string:upload_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_chunked_upload(upload_id):
+    """
+    Finish a chunked upload once every part is stored.
+
+    The parts are assembled in the background (see worker.py); poll
+    GET /uploads/multipart/<upload_id> until status is completed and url is set.
+    """
+    try:
+        upload = get_own_upload(upload_id)
+        if upload is None:
+            return jsonify({'error': 'Upload not found'}), 404
+        upload = complete_upload(upload)
+        return upload_response(upload, 200 if upload.status == 'completed' else 202)
+
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error completing chunked upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+# Abort an unfinished upload
+@api_bp.route('/uploads/multipart/<string:upload_id>', methods=['DELETE'])
+@jwt_required()
+def abort_chunked_upload(upload_id):
+    """Abort a chunked upload and delete the parts stored so far."""
+    try:
+        upload = get_own_upload(upload_id)
+        if upload is None:
+            return jsonify({'error': 'Upload not found'}), 404
+        abort_upload(upload)
+        return jsonify({'success': True, 'message': 'Upload aborted'}), 200
+
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error aborting chunked upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
@@ -1,11 +1,15 @@
 # api/contact_routes.py - Routes for handling contact form submissions
 from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required
+from sqlalchemy import select
 from models.contact import Contact
-from extensions import db, supabase_client
+from extensions import db
 from . import api_bp
 from services.email_service import send_confirmation_email
 from services.email_service import send_admin_notification
+from services.task_dispatcher import task_dispatcher
+from services.supabase_outbox import add_to_outbox, schedule_outbox_flush
+from services.export_service import EXPORT_FORMATS, export_response, iter_query_rows
 
 @api_bp.route('/contact', methods=['POST'])
 def submit_contact_form():
@@ -21,29 +25,21 @@ def submit_contact_form():
             if not data.get(field):
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Create new contact entry using SQLAlchemy ORM
+        # Create new contact entry using SQLAlchemy ORM, queued for Supabase in the same commit
         contact = Contact.create_from_dict(data)
         db.session.add(contact)
+        db.session.flush()
+        add_to_outbox('contacts', contact.to_dict())
         db.session.commit()
         
-        # Also store in Supabase if available
-        if supabase_client:
-            try:
-                supabase_client.table('contacts').insert(contact.to_dict()).execute()
-            except Exception as e:
-                current_app.logger.error(f"Error storing contact in Supabase: {str(e)}")
+        # Mirror to Supabase after responding, batched with other pending rows
+        schedule_outbox_flush()
         
-        # Send confirmation email (async task)
-        try:
-            send_confirmation_email(data['email'], data['name'])
-        except Exception as e:
-            current_app.logger.error(f"Error sending confirmation email: {str(e)}")
-
-        # Send Admin email (async task)
-        try:
-            send_admin_notification(data)
-        except Exception as e:
-            current_app.logger.error(f"Error sending confirmation email: {str(e)}")
+        # Send confirmation and admin emails after responding, concurrently and with retries
+        task_dispatcher.submit(send_confirmation_email, data['email'], data['name'],
+                               description=f"confirmation email to {data['email']}")
+        task_dispatcher.submit(send_admin_notification, data,
+                               description=f"admin notification for contact {contact.id}")
         
         return jsonify({'success': True, 'message': 'Contact form submitted successfully'}), 201
     
@@ -76,4 +72,24 @@ def get_contacts():
     
     except Exception as e:
         current_app.logger.error(f"Error retrieving contacts: {str(e)}")
-        return jsonify({'error': 'An error occurred processing your request'}), 500
\ No newline at end of file
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+@api_bp.route('/contacts/export', methods=['GET'])
+@jwt_required()
+def export_contacts():
+    """Stream all contact submissions as CSV or NDJSON (protected route)."""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        
+        # Same ordering as the list view, read through a server-side cursor
+        columns = Contact.__table__.c
+        statement = select(columns).order_by(columns.created_at.desc(), columns.id.desc())
+        fields = [column.name for column in columns]
+        
+        return export_response(iter_query_rows(statement), fields, export_format, 'contacts')
+    
+    except Exception as e:
+        current_app.logger.error(f"Error exporting contacts: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
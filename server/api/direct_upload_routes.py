@@ -0,0 +1,60 @@
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.utils import secure_filename
+from extensions import db
+from models.upload import DirectUpload
+from services.direct_upload import DirectUploadError, create_direct_upload, complete_direct_upload
+from .chunked_upload_routes import allowed_media_file
+
+from . import api_bp
+
+# Issue a signed upload URL
+@api_bp.route('/uploads/direct', methods=['POST'])
+@jwt_required()
+def initiate_direct_upload():
+    """
+    Get a short-lived signed URL to upload a file straight to storage.
+
+    Expects JSON with filename. The browser PUTs the file to signed_url
+    (or passes path and token to supabase-js uploadToSignedUrl), then calls
+    /uploads/direct/<upload_id>/complete before expires_at.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(data.get('filename') or '')
+        if not filename or not allowed_media_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+
+        upload, signed = create_direct_upload(filename, created_by=str(get_jwt_identity()))
+        return jsonify({
+            **upload.to_dict(),
+            'bucket': current_app.config['S3_BUCKET_NAME'],
+            'signed_url': signed['signed_url'],
+            'token': signed['token'],
+            'max_size': current_app.config['DIRECT_UPLOAD_MAX_SIZE']
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating signed upload URL: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+# Completion callback
+@api_bp.route('/uploads/direct/<string:upload_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_direct_upload_route(upload_id):
+    """Confirm a direct upload: the file is checked in storage and recorded with its public URL."""
+    try:
+        upload = db.session.get(DirectUpload, upload_id)
+        if upload is None or upload.created_by != str(get_jwt_identity()):
+            return jsonify({'error': 'Upload not found'}), 404
+
+        upload = complete_direct_upload(upload)
+        return jsonify({'success': True, **upload.to_dict()}), 200
+
+    except DirectUploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error completing direct upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
@@ -0,0 +1,21 @@
+# api/job_routes.py - Routes for inspecting background jobs
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required
+from models.job import Job
+from extensions import db
+from . import api_bp
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get the status of a background job (protected route)."""
+    try:
+        job = db.session.get(Job, job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify(job.to_dict()), 200
+    
+    except Exception as e:
+        current_app.logger.error(f"Error fetching job {job_id}: {str(e)}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
@@ -124,75 +124,147 @@
 
 from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import os
-import uuid
+import re
 from werkzeug.utils import secure_filename
-from supabase import create_client, Client
+from supabase import Client
+from services import supabase_clients
+from services.upload_stream import open_multipart_file, collect_chunks, UploadTooLarge, MalformedUpload
+from services.image_variants import image_processor, verify_image, INVALID_IMAGE_ERRORS
+from services.upload_index import find_image, record_image
 
 from . import api_bp
 
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
 def get_supabase_client():
-    """Initialize and return a Supabase client"""
+    """Return the shared Supabase client for the storage (service role) credentials"""
     url = current_app.config['SUPABASE_URL']
     key = current_app.config['S3_SECRET']
-    return create_client(url, key)
+    return supabase_clients.get_supabase_client(url, key)
 
 def allowed_file(filename):
     """Check if the file extension is allowed"""
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def existing_image_response(image):
+    """Response for an upload whose bytes are already stored"""
+    return jsonify({
+        'success': True,
+        'deduplicated': True,
+        'message': 'Image already uploaded',
+        **image.to_dict()
+    }), 200
+
 @api_bp.route('/uploads/image', methods=['POST'])
 @jwt_required()
 def upload_image():
     """
     Upload an image to Supabase storage and return the public URL
+
+    The file is read from the request stream chunk by chunk and hashed on
+    the way, request.files must not be touched here: it would spool the
+    whole upload to a temporary file first. Unlike chunked upload parts,
+    the image is not streamed on to storage but collected in one buffer
+    of at most UPLOAD_MAX_IMAGE_SIZE bytes, since the digest decides
+    whether and where it is stored and the variants need all of it.
+    Images whose SHA-256 is already indexed are not stored again, the
+    existing URLs are returned. A client that sends the digest in
+    X-Content-SHA256 gets them before the body is read at all. New images
+    are stored under their digest together with their responsive WebP
+    variants.
     """
+    max_size = current_app.config['UPLOAD_MAX_IMAGE_SIZE']
     try:
-        if 'image' not in request.files:
+        claimed_digest = request.headers.get('X-Content-SHA256', '').lower() or None
+        if claimed_digest:
+            if not SHA256_PATTERN.match(claimed_digest):
+                return jsonify({'error': 'X-Content-SHA256 must be a hex SHA-256 digest'}), 400
+            existing = find_image(claimed_digest)
+            if existing:
+                return existing_image_response(existing)
+
+        if request.content_length and request.content_length > max_size + 64 * 1024:
+            return jsonify({'error': f'Image is larger than {max_size} bytes'}), 413
+
+        try:
+            file = open_multipart_file(
+                request.stream, request.content_type, 'image',
+                max_size=max_size, chunk_size=current_app.config['UPLOAD_CHUNK_SIZE']
+            )
+        except MalformedUpload:
             return jsonify({'error': 'No image part in the request'}), 400
-        
-        file = request.files['image']
 
-        if file.filename == '':
+        if not file.filename:
             return jsonify({'error': 'No file selected'}), 400
 
-        if file and allowed_file(file.filename):
+        if allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
             current_user = get_jwt_identity()
-            object_path = f"blog-uploads/{unique_filename}"
 
-            # Save temporarily
-            temp_path = os.path.join('/tmp', unique_filename)
-            file.save(temp_path)
+            # One buffer of at most UPLOAD_MAX_IMAGE_SIZE bytes serves the storage write and the variants
+            try:
+                data, digest = collect_chunks(file)
+            except UploadTooLarge:
+                return jsonify({'error': f'Image is larger than {max_size} bytes'}), 413
+            except MalformedUpload:
+                return jsonify({'error': 'Incomplete upload'}), 400
+
+            if claimed_digest and claimed_digest != digest:
+                return jsonify({'error': 'X-Content-SHA256 does not match the uploaded file'}), 400
+
+            existing = find_image(digest)
+            if existing:
+                return existing_image_response(existing)
+
+            # Reject files that are not images before anything is written to storage
+            try:
+                verify_image(data)
+            except INVALID_IMAGE_ERRORS:
+                return jsonify({'error': 'File is not a valid image'}), 400
+
+            object_path = f"blog-uploads/{digest}_{filename}"
 
             try:
                 supabase: Client = get_supabase_client()
                 bucket_name = current_app.config['S3_BUCKET_NAME']
+                bucket = supabase.storage.from_(bucket_name)
 
-                with open(temp_path, "rb") as f:
-                    response = supabase.storage.from_(bucket_name).upload(object_path, f, {
-                        "content-type": file.content_type,
-                        "x-upsert": "true"
-                    })
-
-                # Clean up temp file
-                os.remove(temp_path)
+                bucket.upload_stream(object_path, (data,), file.content_type, upsert=True)
 
                 # Get public URL
-                public_url = supabase.storage.from_(bucket_name).get_public_url(object_path)
+                public_url = bucket.get_public_url(object_path)
+
+                # Resized WebP variants, stored under blog-uploads/<digest>/
+                try:
+                    variants = image_processor.publish(bucket, f"blog-uploads/{digest}", data)
+                except INVALID_IMAGE_ERRORS:
+                    # Passed verify_image but its pixel data could not be decoded
+                    bucket.remove([object_path])
+                    return jsonify({'error': 'File is not a valid image'}), 400
+                except Exception as e:
+                    # The original is stored, the post can still use it without variants.
+                    # It is left out of the index so the next upload renders them again.
+                    current_app.logger.warning(f"Image variants failed for {object_path}: {str(e)}")
+                    return jsonify({
+                        'success': True,
+                        'deduplicated': False,
+                        'message': 'Image uploaded successfully',
+                        'imageUrl': public_url,
+                        'sha256': digest,
+                        'size': file.size
+                    }), 200
 
+                image = record_image(digest, object_path, public_url, file.content_type, file.size, variants)
                 return jsonify({
                     'success': True,
-                    'imageUrl': public_url,
-                    'message': 'Image uploaded successfully'
+                    'deduplicated': False,
+                    'message': 'Image uploaded successfully',
+                    **image.to_dict()
                 }), 200
 
             except Exception as e:
                 current_app.logger.error(f"Supabase upload error: {e}")
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
                 return jsonify({'error': 'Failed to upload to Supabase'}), 500
 
         else:
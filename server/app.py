@@ -1,9 +1,15 @@
 
-from flask import Flask
+import os
+import click
+from flask import Flask, request, send_from_directory
 from flask_cors import CORS
 from config import Config
 from api import api_bp
 from extensions import db, jwt, init_supabase
+from services.response_cache import response_cache
+from services.view_counter import view_counter
+from services.task_dispatcher import task_dispatcher
+from services.image_variants import image_processor
 
 def create_app(config_class=Config):
     """
@@ -18,6 +24,10 @@ def create_app(config_class=Config):
     db.init_app(app)
     jwt.init_app(app)
     init_supabase(app)
+    response_cache.init_app(app)
+    view_counter.init_app(app)
+    task_dispatcher.init_app(app)
+    image_processor.init_app(app)
     
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix='/api')
@@ -26,6 +36,64 @@ def create_app(config_class=Config):
     def health_check():
         return {"status": "healthy", "message": "Flask backend is running"}, 200
     
+    if app.config.get('SUPABASE_BACKEND') == 'fake':
+        @app.route('/fake-storage/<bucket>/<path:path>')
+        def fake_storage_object(bucket, path):
+            """Serve objects uploaded to the offline Supabase stand-in."""
+            from services.supabase_clients import fake_backend
+            return send_from_directory(os.path.join(fake_backend().storage_dir, bucket), path)
+        
+        @app.route('/fake-storage/upload/sign/<bucket>/<path:path>', methods=['PUT'])
+        def fake_storage_signed_upload(bucket, path):
+            """Accept an upload to a signed upload URL, as a raw body or a multipart 'file' field."""
+            from storage3.utils import StorageException
+            from services.supabase_clients import fake_backend
+            body = request.files['file'].stream if 'file' in request.files else request.stream
+            try:
+                result = fake_backend().upload_to_signed_url(bucket, path, request.args.get('token', ''), body)
+            except StorageException as e:
+                error = e.args[0]
+                return error, int(error['statusCode'])
+            return {'Key': result['Key']}, 200
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Reindex all blog posts for full-text search."""
+        from services.search_service import rebuild_search_index
+        print(f"Indexed {rebuild_search_index()} blog posts")
+    
+    @app.cli.command('rebuild-related-index')
+    def rebuild_related_index_command():
+        """Recompute related posts for every published blog post."""
+        from services.related_posts import rebuild_related_index
+        print(f"Computed related posts for {rebuild_related_index()} blog posts")
+    
+    @app.cli.command('flush-supabase-outbox')
+    def flush_supabase_outbox_command():
+        """Mirror pending outbox rows to Supabase."""
+        from services.supabase_outbox import flush_outbox
+        print(f"Mirrored {flush_outbox()} rows to Supabase")
+    
+    @app.cli.command('requeue-supabase-outbox')
+    @click.option('--table', default=None, help="Only requeue rows for this Supabase table.")
+    def requeue_supabase_outbox_command(table):
+        """Retry outbox rows that were marked failed, then flush the outbox."""
+        from services.supabase_outbox import requeue_failed, flush_outbox
+        print(f"Requeued {requeue_failed(table)} failed rows")
+        print(f"Mirrored {flush_outbox()} rows to Supabase")
+    
+    @app.cli.command('purge-chunked-uploads')
+    def purge_chunked_uploads_command():
+        """Delete expired unfinished or failed chunked uploads and their parts."""
+        from services.chunked_upload import purge_expired_uploads
+        print(f"Purged {purge_expired_uploads()} expired uploads")
+    
+    @app.cli.command('purge-direct-uploads')
+    def purge_direct_uploads_command():
+        """Delete files uploaded with signed URLs that were never completed or were refused."""
+        from services.direct_upload import purge_expired_direct_uploads
+        print(f"Purged {purge_expired_direct_uploads()} abandoned or refused direct uploads")
+    
     return app
 
 # For Vercel deployment
@@ -0,0 +1 @@
+# benchmarks/__init__.py - Local benchmark harnesses, run with python -m benchmarks.<name>
@@ -0,0 +1,222 @@
+# benchmarks/email_throughput.py - Email delivery throughput against a local SMTP sink
+"""
+Measure the email senders without a real mail server.
+
+An in-process SMTP sink stands in for Gmail and the senders in
+services/email_service.py are pointed at it through the usual SMTP_*
+environment variables. For each path and size the harness reports
+messages per second, p50/p99 send latency and how many SMTP connections
+were opened.
+
+    python -m benchmarks.email_throughput
+    python -m benchmarks.email_throughput --sizes 1000 --latency 0.02 --fail-rate 0.01
+    python -m benchmarks.email_throughput --paths newsletter --json > before.json
+
+Run it before and after a change to email delivery and compare the numbers.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from flask import Flask
+
+from benchmarks.smtp_sink import SMTPSink
+
+PATHS = ('confirmation', 'admin', 'newsletter')
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class _TimedConnections:
+    """Wraps an SMTPPool so the time spent in each server.send_message is recorded."""
+
+    def __init__(self, pool, latencies):
+        self._pool = pool
+        self._latencies = latencies
+
+    @contextmanager
+    def connection(self):
+        with self._pool.connection() as server:
+            send_message = server.send_message
+
+            def timed_send(msg, *args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return send_message(msg, *args, **kwargs)
+                finally:
+                    self._latencies.append(time.perf_counter() - started)
+
+            server.send_message = timed_send
+            try:
+                yield server
+            finally:
+                del server.send_message
+
+
+def _run_per_call(app, send, count, concurrency):
+    """Call send(i) count times from concurrency threads, the way concurrent requests would."""
+    latencies = []
+
+    def one(i):
+        with app.app_context():
+            started = time.perf_counter()
+            ok = send(i)
+            latencies.append(time.perf_counter() - started)
+            return bool(ok)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(count)))
+    return results.count(True), results.count(False), latencies
+
+
+def run_path(app, path, count, concurrency):
+    """
+    Send count emails through one of the email paths.
+
+    Returns:
+        tuple: (sent, failed, latencies in seconds)
+    """
+    from services import email_service
+    from services.smtp_pool import get_smtp_pool
+
+    if path == 'confirmation':
+        return _run_per_call(
+            app,
+            lambda i: email_service.send_confirmation_email(f"user{i}@example.com", f"User {i}"),
+            count, concurrency
+        )
+
+    if path == 'admin':
+        return _run_per_call(
+            app,
+            lambda i: email_service.send_admin_notification({
+                'name': f"User {i}",
+                'email': f"user{i}@example.com",
+                'subject': 'Benchmark',
+                'message': 'Hello,\nthis is a benchmark message.'
+            }),
+            count, concurrency
+        )
+
+    latencies = []
+    build_message = email_service.newsletter_message_builder({
+        'title': 'Benchmark post',
+        'slug': 'benchmark-post',
+        'content': '<p>' + 'Lorem ipsum dolor sit amet. ' * 40 + '</p>'
+    })
+    recipients = (f"user{i}@example.com" for i in range(count))
+    with app.app_context():
+        pool = _TimedConnections(get_smtp_pool(), latencies)
+        report = email_service.deliver_newsletter(recipients, build_message, pool)
+    return report.sent, len(report.failed), latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark email delivery against a local SMTP sink.")
+    parser.add_argument('--paths', default=','.join(PATHS), help="comma separated subset of: " + ', '.join(PATHS))
+    parser.add_argument('--sizes', default='1000,10000,100000', help="comma separated recipient counts")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the sink spends on each message")
+    parser.add_argument('--connect-latency', type=float, default=0.0, help="seconds the sink spends on each new connection")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="share of recipients the sink refuses")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="share of messages after which the sink hangs up")
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent callers for the confirmation and admin paths")
+    parser.add_argument('--newsletter-concurrency', type=int, default=None, help="overrides NEWSLETTER_CONCURRENCY")
+    parser.add_argument('--rate', type=float, default=1e9, help="NEWSLETTER_RATE_LIMIT for the run, unlimited by default")
+    parser.add_argument('--pool-size', type=int, default=None, help="overrides SMTP_POOL_SIZE")
+    parser.add_argument('--seed', type=int, default=1, help="seed for failure injection")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    paths = [p.strip() for p in args.paths.split(',') if p.strip()]
+    unknown = set(paths) - set(PATHS)
+    if unknown:
+        parser.error(f"unknown paths: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    sink = SMTPSink(
+        latency=args.latency,
+        connect_latency=args.connect_latency,
+        fail_rate=args.fail_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed
+    ).start()
+
+    # Point the senders at the sink, these are read on every send
+    os.environ.update({
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(sink.port),
+        'SMTP_USE_TLS': 'false',
+        'GOOGLE_APP_PASSWORD': 'benchmark',
+        'ADMIN_EMAIL': 'admin@example.com',
+        'NEWSLETTER_RATE_LIMIT': str(args.rate)
+    })
+    if args.newsletter_concurrency:
+        os.environ['NEWSLETTER_CONCURRENCY'] = str(args.newsletter_concurrency)
+    if args.pool_size:
+        os.environ['SMTP_POOL_SIZE'] = str(args.pool_size)
+
+    from services.smtp_pool import get_smtp_pool
+
+    # The senders only need an application for current_app.logger
+    app = Flask('email_benchmark')
+    app.logger.setLevel(logging.CRITICAL)
+
+    results = []
+    for path in paths:
+        for size in sizes:
+            pool = get_smtp_pool()
+            pool.close()  # every run starts without warm connections
+            opened_before = pool.connections_opened
+            sink_before = sink.snapshot()
+
+            started = time.perf_counter()
+            sent, failed, latencies = run_path(app, path, size, args.concurrency)
+            elapsed = time.perf_counter() - started
+
+            sink_after = sink.snapshot()
+            latencies.sort()
+            results.append({
+                'path': path,
+                'recipients': size,
+                'sent': sent,
+                'failed': failed,
+                'seconds': round(elapsed, 3),
+                'msgs_per_sec': round(sent / elapsed, 1) if elapsed else 0.0,
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'pool_connections': pool.connections_opened - opened_before,
+                'sink_connections': sink_after['connections'] - sink_before['connections'],
+                'sink_refused': sink_after['refused'] - sink_before['refused'],
+                'sink_dropped': sink_after['dropped'] - sink_before['dropped']
+            })
+            if not args.json:
+                print(_format_row(results[-1]), flush=True)
+
+    sink.stop()
+    if args.json:
+        json.dump({'settings': vars(args), 'results': results}, sys.stdout, indent=2)
+        print()
+
+
+def _format_row(row):
+    return (
+        f"{row['path']:<13}{row['recipients']:>8} recipients  "
+        f"{row['msgs_per_sec']:>9.1f} msgs/s  "
+        f"p50 {row['p50_ms']:>7.2f} ms  p99 {row['p99_ms']:>7.2f} ms  "
+        f"sent {row['sent']}  failed {row['failed']}  "
+        f"connections {row['pool_connections']} (sink {row['sink_connections']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
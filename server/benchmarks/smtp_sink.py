@@ -0,0 +1,152 @@
+# benchmarks/smtp_sink.py - In-process SMTP server that accepts and discards mail
+import random
+import socket
+import socketserver
+import threading
+import time
+
+
+class _SMTPSession(socketserver.StreamRequestHandler):
+    """Minimal ESMTP dialogue: enough for smtplib's EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET and QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def setup(self):
+        super().setup()
+        self.server.track(self.connection)
+
+    def finish(self):
+        self.server.untrack(self.connection)
+        super().finish()
+
+    def handle(self):
+        sink = self.server
+        sink.record('connections')
+        if sink.connect_latency:
+            time.sleep(sink.connect_latency)
+        self.reply('220 localhost ESMTP benchmark sink')
+
+        in_data = False
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if line != '.':
+                    continue
+                in_data = False
+                if sink.latency:
+                    time.sleep(sink.latency)
+                if sink.chance(sink.drop_rate):
+                    sink.record('dropped')
+                    self.reply('421 Service not available, closing transmission channel')
+                    return
+                sink.record('messages')
+                self.reply('250 OK: queued')
+                continue
+
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250-AUTH PLAIN LOGIN')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 localhost')
+            elif command == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif command == 'RCPT':
+                if sink.chance(sink.fail_rate):
+                    sink.record('refused')
+                    self.reply('550 No such user here')
+                else:
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                in_data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                # MAIL, RSET, NOOP
+                self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in for the real SMTP server, for benchmarks.
+
+    Messages are counted and thrown away. Every accepted message is
+    delayed by latency seconds and every new connection by
+    connect_latency seconds. A fail_rate share of recipients is refused
+    with 550, and a drop_rate share of messages makes the server answer
+    421 and hang up. drop_connections() hangs up on every client at once.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on, 0 picks a free one
+        latency (float): Seconds spent on each message
+        connect_latency (float): Seconds spent on each connection handshake
+        fail_rate (float): Probability a recipient is refused
+        drop_rate (float): Probability the connection is dropped after a message
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, connect_latency=0.0, fail_rate=0.0, drop_rate=0.0, seed=None):
+        super().__init__((host, port), _SMTPSession)
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.counters = dict.fromkeys(['connections', 'messages', 'refused', 'dropped'], 0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def chance(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def record(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def track(self, sock):
+        with self._lock:
+            self._sockets.add(sock)
+
+    def untrack(self, sock):
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def drop_connections(self):
+        """Hang up on every open client connection without a reply, as an idle timeout would."""
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(sockets)
+
+    def snapshot(self):
+        """Current counter values, as a copy."""
+        with self._lock:
+            return dict(self.counters)
+
+    def start(self):
+        """Serve from a background thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
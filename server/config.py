@@ -23,6 +23,45 @@ class Config:
     S3_PUBLIC_URL = os.getenv('SUPABASE_PUBLIC_URL')
     S3_REGION = os.getenv('SUPABASE_REGION')
     
+    # HTTP connection pool shared by every Supabase client in the process
+    SUPABASE_HTTP_POOL_SIZE = int(os.environ.get('SUPABASE_HTTP_POOL_SIZE', 20))
+    SUPABASE_HTTP_KEEPALIVE = int(os.environ.get('SUPABASE_HTTP_KEEPALIVE', 10))  # idle connections kept open
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY = int(os.environ.get('SUPABASE_HTTP_KEEPALIVE_EXPIRY', 60))  # seconds
+    SUPABASE_HTTP2 = os.environ.get('SUPABASE_HTTP2', 'true').lower() != 'false'
+    SUPABASE_POSTGREST_TIMEOUT = int(os.environ.get('SUPABASE_POSTGREST_TIMEOUT', 30))  # seconds
+    SUPABASE_STORAGE_TIMEOUT = int(os.environ.get('SUPABASE_STORAGE_TIMEOUT', 60))  # seconds
+    
+    # SUPABASE_BACKEND=fake runs against a local SQLite/filesystem stand-in (services/fake_supabase.py)
+    SUPABASE_BACKEND = os.environ.get('SUPABASE_BACKEND', 'supabase')
+    FAKE_SUPABASE_DB = os.environ.get('FAKE_SUPABASE_DB')  # defaults to a file in the temp directory
+    FAKE_SUPABASE_STORAGE_DIR = os.environ.get('FAKE_SUPABASE_STORAGE_DIR')
+    FAKE_SUPABASE_PUBLIC_URL = os.environ.get('FAKE_SUPABASE_PUBLIC_URL', 'http://localhost:5000/fake-storage')
+    FAKE_SUPABASE_LATENCY = float(os.environ.get('FAKE_SUPABASE_LATENCY', 0))  # seconds per request
+    
+    # Image uploads are buffered in memory, up to UPLOAD_MAX_IMAGE_SIZE, to verify, hash and dedup them; never written to /tmp
+    UPLOAD_MAX_IMAGE_SIZE = int(os.environ.get('UPLOAD_MAX_IMAGE_SIZE', 10 * 1024 * 1024))  # bytes
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 64 * 1024))  # bytes read per chunk
+    
+    # Resumable chunked uploads of large media; parts are assembled by the job worker
+    CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 2 * 1024 ** 3))  # bytes
+    CHUNKED_UPLOAD_PART_SIZE = int(os.environ.get('CHUNKED_UPLOAD_PART_SIZE', 8 * 1024 * 1024))  # bytes
+    CHUNKED_UPLOAD_TTL = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 3600))  # seconds before unfinished uploads are purged
+    CHUNKED_UPLOAD_ASSEMBLY_CONCURRENCY = int(os.environ.get('CHUNKED_UPLOAD_ASSEMBLY_CONCURRENCY', 4))  # parts fetched in parallel
+    
+    # Direct browser-to-storage uploads with signed upload URLs
+    DIRECT_UPLOAD_TTL = int(os.environ.get('DIRECT_UPLOAD_TTL', 600))  # seconds to upload and confirm
+    DIRECT_UPLOAD_MAX_SIZE = int(os.environ.get('DIRECT_UPLOAD_MAX_SIZE', 500 * 1024 * 1024))  # bytes, checked on completion
+    
+    # Responsive WebP variants of uploaded images, rendered in a process pool (0 workers = inline)
+    IMAGE_PROCESS_WORKERS = int(os.environ.get('IMAGE_PROCESS_WORKERS', 2))
+    IMAGE_VARIANT_WIDTHS = [int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '480,768,1280,1920').split(',')]
+    IMAGE_THUMBNAIL_SIZE = (int(os.environ.get('IMAGE_THUMBNAIL_WIDTH', 320)), int(os.environ.get('IMAGE_THUMBNAIL_HEIGHT', 320)))
+    IMAGE_WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY', 80))
+    IMAGE_PROCESS_TIMEOUT = int(os.environ.get('IMAGE_PROCESS_TIMEOUT', 30))  # seconds
+    
+    # Identical concurrent Supabase reads share one request; results are kept this many seconds (0 = off)
+    SUPABASE_READ_CACHE_TTL = float(os.environ.get('SUPABASE_READ_CACHE_TTL', 0))
+    
     # JWT configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=2)
@@ -33,6 +72,40 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Response cache for public blog endpoints
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds
+    
+    # Buffered blog view counting
+    VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', 10))  # seconds
+    VIEW_COUNT_MAX_PENDING = int(os.environ.get('VIEW_COUNT_MAX_PENDING', 1000))
+    
+    # Related-posts index
+    RELATED_POSTS_TOP_K = int(os.environ.get('RELATED_POSTS_TOP_K', 10))
+    RELATED_POSTS_TAG_WEIGHT = float(os.environ.get('RELATED_POSTS_TAG_WEIGHT', 0.5))  # tag Jaccard vs. text cosine
+    RELATED_POSTS_MAX_FEATURES = int(os.environ.get('RELATED_POSTS_MAX_FEATURES', 2048))
+    
+    # Background job queue (see worker.py)
+    JOB_POLL_INTERVAL = int(os.environ.get('JOB_POLL_INTERVAL', 5))  # seconds
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 30))  # seconds, doubled on every retry
+    JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', 1800))  # seconds without a touch_job heartbeat before a running job is reclaimed
+    
+    # Newsletter sends walk subscribers in chunks of this size and checkpoint after each
+    NEWSLETTER_CHUNK_SIZE = int(os.environ.get('NEWSLETTER_CHUNK_SIZE', 500))
+    
+    # In-process pool for work done after the response, e.g. contact form emails
+    TASK_DISPATCH_WORKERS = int(os.environ.get('TASK_DISPATCH_WORKERS', 4))
+    TASK_DISPATCH_QUEUE_SIZE = int(os.environ.get('TASK_DISPATCH_QUEUE_SIZE', 1000))
+    TASK_DISPATCH_MAX_ATTEMPTS = int(os.environ.get('TASK_DISPATCH_MAX_ATTEMPTS', 3))
+    TASK_DISPATCH_RETRY_DELAY = int(os.environ.get('TASK_DISPATCH_RETRY_DELAY', 2))  # seconds, doubled on every retry
+    
+    # Mirroring of local rows to Supabase through the supabase_outbox table
+    SUPABASE_OUTBOX_BATCH_SIZE = int(os.environ.get('SUPABASE_OUTBOX_BATCH_SIZE', 100))
+    SUPABASE_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('SUPABASE_OUTBOX_MAX_ATTEMPTS', 8))
+    SUPABASE_OUTBOX_RETRY_DELAY = int(os.environ.get('SUPABASE_OUTBOX_RETRY_DELAY', 30))  # seconds, doubled on every retry
+    SUPABASE_OUTBOX_CLAIM_TIMEOUT = int(os.environ.get('SUPABASE_OUTBOX_CLAIM_TIMEOUT', 300))  # seconds before rows claimed by a dead flusher are sent again
+    
 class DevelopmentConfig(Config):
     """Development configuration with debug enabled."""
     DEBUG = True
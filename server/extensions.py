@@ -12,13 +12,14 @@ supabase_client = None
 def init_supabase(app):
     """Initialize Supabase client with credentials from app config."""
     global supabase_client
-    from supabase import create_client
+    from services import supabase_clients
+    supabase_clients.init_app(app)
     
     url = app.config['SUPABASE_URL']
     key = app.config['SUPABASE_KEY']
     
-    if url and key:
-        supabase_client = create_client(url, key)
+    if (url and key) or supabase_clients.using_fake_backend():
+        supabase_client = supabase_clients.get_supabase_client(url, key)
         return supabase_client
     else:
         app.logger.warning("Supabase URL or key not provided. Supabase functionality will not work.")
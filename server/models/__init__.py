@@ -1,5 +1,8 @@
 from models.contact import Contact
 from models.user import User
 from models.career_application import CareerApplication
+from models.job import Job
+from models.outbox import SupabaseOutbox
+from models.upload import UploadedImage, ChunkedUpload, ChunkedUploadPart, DirectUpload
 
-__all__ = ['Contact', 'User', 'CareerApplication']
\ No newline at end of file
+__all__ = ['Contact', 'User', 'CareerApplication', 'Job', 'SupabaseOutbox', 'UploadedImage', 'ChunkedUpload', 'ChunkedUploadPart', 'DirectUpload']
\ No newline at end of file
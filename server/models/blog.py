@@ -1,4 +1,6 @@
 from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from extensions import db
 import uuid
 
@@ -19,8 +21,23 @@ class BlogPost(db.Model):
     meta_title = db.Column(db.String(255))
     meta_description = db.Column(db.Text)
     reading_time = db.Column(db.Integer)
+    # Weighted title/content tsvector on Postgres; SQLite uses the blog_posts_fts table instead
+    search_vector = db.deferred(db.Column(TSVECTOR().with_variant(db.Text(), 'sqlite')))
     tags = db.relationship('BlogTag', secondary='blog_post_tags', back_populates='posts')
 
+    # Fields served by listing endpoints, everything except the article body
+    SUMMARY_FIELDS = (
+        'id', 'title', 'slug', 'excerpt', 'featured_image', 'author_id', 'published_at',
+        'created_at', 'updated_at', 'view_count', 'status', 'meta_title', 'meta_description',
+        'reading_time', 'tags'
+    )
+    LISTING_FIELDS = SUMMARY_FIELDS + ('content',)
+
+    __table_args__ = (
+        db.Index('ix_blog_posts_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        db.Index('ix_blog_posts_published_at_id', 'published_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -41,6 +58,37 @@ class BlogPost(db.Model):
             'tags': [tag.to_dict() for tag in self.tags]
         }
 
+    def to_summary_dict(self, fields=SUMMARY_FIELDS):
+        """
+        Convert to a listing dictionary containing only the given fields.
+
+        Unlike to_dict, attributes outside of fields are never touched, so
+        columns left out of a load_only() query are not lazily loaded.
+        """
+        data = {}
+        for field in fields:
+            if field == 'tags':
+                data['tags'] = [tag.to_dict() for tag in self.tags]
+                continue
+            value = getattr(self, field)
+            data[field] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+# FTS5 index used for blog search when running on SQLite (tests, local development)
+event.listen(
+    BlogPost.__table__,
+    'after_create',
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS blog_posts_fts "
+        "USING fts5(post_id UNINDEXED, title, content, tokenize='porter unicode61')"
+    ).execute_if(dialect='sqlite')
+)
+event.listen(
+    BlogPost.__table__,
+    'after_drop',
+    DDL("DROP TABLE IF EXISTS blog_posts_fts").execute_if(dialect='sqlite')
+)
+
 class BlogTag(db.Model):
     __tablename__ = 'blog_tags'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -66,6 +114,17 @@ class BlogPostTag(db.Model):
     post_id = db.Column(db.String, db.ForeignKey('blog_posts.id'), primary_key=True)
     tag_id = db.Column(db.String, db.ForeignKey('blog_tags.id'), primary_key=True)
 
+class BlogPostRelated(db.Model):
+    """Precomputed nearest neighbours of a published post, see services/related_posts.py."""
+    __tablename__ = 'blog_post_related'
+    post_id = db.Column(db.String, db.ForeignKey('blog_posts.id'), primary_key=True)
+    related_post_id = db.Column(db.String, db.ForeignKey('blog_posts.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_blog_post_related_post_id_score', 'post_id', 'score'),
+    )
+
 class BlogComment(db.Model):
     __tablename__ = 'blog_comments'
     # id = db.Column(db.String, primary_key=True)
@@ -111,4 +170,30 @@ class BlogSubscriber(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class NewsletterCampaign(db.Model):
+    """Progress of the newsletter for one post, so an interrupted send resumes where it stopped."""
+    __tablename__ = 'newsletter_campaigns'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    post_id = db.Column(db.String, db.ForeignKey('blog_posts.id'), nullable=False, unique=True)
+    status = db.Column(db.String(20), default='sending')  # sending, completed
+    last_subscriber_id = db.Column(db.Integer, default=0)  # Checkpoint: subscribers up to this id are done
+    sent_count = db.Column(db.Integer, default=0)
+    failed_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'post_id': self.post_id,
+            'status': self.status,
+            'last_subscriber_id': self.last_subscriber_id,
+            'sent_count': self.sent_count,
+            'failed_count': self.failed_count,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
@@ -0,0 +1,36 @@
+# Models for the Supabase mirroring outbox
+from datetime import datetime
+from extensions import db
+
+class SupabaseOutbox(db.Model):
+    """A row waiting to be mirrored to a Supabase table, written in the same transaction as the row itself."""
+    __tablename__ = 'supabase_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(100), nullable=False)  # Supabase table to upsert into
+    payload = db.Column(db.JSON, nullable=False)             # Row to upsert, including its primary key
+    
+    # Delivery state; rows are deleted once mirrored
+    status = db.Column(db.String(20), default='pending')    # pending, sending, failed
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)  # While sending: when the claim lapses
+    last_error = db.Column(db.Text, nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_supabase_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': self.id,
+            'table_name': self.table_name,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
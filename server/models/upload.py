@@ -0,0 +1,131 @@
+# Models for uploads: content-addressed images, resumable chunked uploads and direct uploads
+import uuid
+from datetime import datetime
+from extensions import db
+
+class UploadedImage(db.Model):
+    """An image already in storage, keyed by the SHA-256 of its bytes so repeated uploads reuse it."""
+    __tablename__ = 'uploaded_images'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)   # Hex digest of the uploaded bytes
+    object_path = db.Column(db.String(512), nullable=False)  # Path of the original in the bucket
+    public_url = db.Column(db.Text, nullable=False)
+    content_type = db.Column(db.String(100))
+    size = db.Column(db.Integer, nullable=False)           # Bytes
+    variants = db.Column(db.JSON)                          # Responsive variants, see services/image_variants.py
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert model to the upload response fields."""
+        return {
+            'imageUrl': self.public_url,
+            'sha256': self.sha256,
+            'size': self.size,
+            **(self.variants or {})
+        }
+
+class ChunkedUpload(db.Model):
+    """A resumable upload of a large file, sent as numbered parts and assembled into one object."""
+    __tablename__ = 'chunked_uploads'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(100))
+    size = db.Column(db.BigInteger, nullable=False)        # Total bytes, announced when the upload starts
+    part_size = db.Column(db.Integer, nullable=False)      # Bytes in every part but the last
+    object_path = db.Column(db.String(512), nullable=False)  # Where the assembled file is stored
+    public_url = db.Column(db.Text)
+    status = db.Column(db.String(20), default='uploading')  # uploading, assembling, completed, failed, aborted
+    last_error = db.Column(db.Text)
+    created_by = db.Column(db.String(255))                 # JWT identity of the uploader
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)    # Unfinished uploads are purged after this
+    completed_at = db.Column(db.DateTime)
+    parts = db.relationship('ChunkedUploadPart', backref='upload', cascade='all, delete-orphan',
+                            order_by='ChunkedUploadPart.part_number')
+    
+    __table_args__ = (
+        db.Index('ix_chunked_uploads_status_expires_at', 'status', 'expires_at'),
+    )
+    
+    @property
+    def part_count(self):
+        return max(1, -(-self.size // self.part_size))
+    
+    def part_length(self, part_number):
+        """Exact size in bytes that part part_number (1-based) must have."""
+        if part_number < self.part_count:
+            return self.part_size
+        return self.size - self.part_size * (self.part_count - 1)
+    
+    def to_dict(self):
+        """Convert model to dictionary, including the resumable offset."""
+        received = {part.part_number for part in self.parts}
+        # Bytes received without a gap from the start of the file
+        offset = 0
+        for part_number in range(1, self.part_count + 1):
+            if part_number not in received:
+                break
+            offset += self.part_length(part_number)
+        return {
+            'upload_id': self.id,
+            'filename': self.filename,
+            'content_type': self.content_type,
+            'size': self.size,
+            'part_size': self.part_size,
+            'part_count': self.part_count,
+            'offset': offset,
+            'parts_received': sorted(received),
+            'missing_parts': [n for n in range(1, self.part_count + 1) if n not in received],
+            'status': self.status,
+            'url': self.public_url,
+            'error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class ChunkedUploadPart(db.Model):
+    """A part of a ChunkedUpload already in storage. Re-sending a part replaces it."""
+    __tablename__ = 'chunked_upload_parts'
+    
+    upload_id = db.Column(db.String(36), db.ForeignKey('chunked_uploads.id', ondelete='CASCADE'), primary_key=True)
+    part_number = db.Column(db.Integer, primary_key=True)  # 1-based
+    size = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DirectUpload(db.Model):
+    """A file the browser uploads straight to storage with a signed URL, recorded once the API has checked it."""
+    __tablename__ = 'direct_uploads'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    filename = db.Column(db.String(255), nullable=False)
+    object_path = db.Column(db.String(512), nullable=False)
+    content_type = db.Column(db.String(100))               # As stored, known once completed
+    size = db.Column(db.BigInteger)                        # Bytes, known once completed
+    public_url = db.Column(db.Text)
+    status = db.Column(db.String(20), default='pending')    # pending, completed, rejected, expired
+    created_by = db.Column(db.String(255))                 # JWT identity of the uploader
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)    # Completion is refused after this
+    completed_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_direct_uploads_status_expires_at', 'status', 'expires_at'),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'upload_id': self.id,
+            'filename': self.filename,
+            'path': self.object_path,
+            'content_type': self.content_type,
+            'size': self.size,
+            'url': self.public_url,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
@@ -0,0 +1,366 @@
+# services/async_supabase_service.py - asyncio variant of SupabaseService for concurrent queries
+import asyncio
+import os
+import threading
+from flask import current_app, has_app_context
+from services.supabase_clients import get_async_supabase_client, using_fake_backend
+from services.single_flight import invalidates
+from services.supabase_service import SupabaseService
+
+# Event loop serving run_sync, one per process
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def _service_loop():
+    """Start the background event loop on first use, and again in a forked worker."""
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name='supabase-async', daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine, timeout=None):
+    """
+    Run a coroutine from synchronous code, such as a Flask view, and return its result.
+    
+    The coroutine runs on a background event loop shared by the process, so
+    async Supabase clients and their connections are reused between
+    requests. The caller's app context is made available to it.
+    
+    Args:
+        coroutine: The coroutine to run
+        timeout (float): Seconds to wait before raising TimeoutError
+    """
+    app = current_app._get_current_object() if has_app_context() else None
+    
+    async def with_app_context():
+        if app is None:
+            return await coroutine
+        with app.app_context():
+            return await coroutine
+    
+    future = asyncio.run_coroutine_threadsafe(with_app_context(), _service_loop())
+    return future.result(timeout)
+
+
+class AsyncSupabaseService:
+    """
+    Async counterpart of SupabaseService.
+    
+    Covers the contact and career application table methods of
+    SupabaseService, plus count_career_applications. They have the same
+    arguments, return values and error handling as their namesakes, but
+    are coroutines on the async Supabase client, so independent queries
+    can run concurrently with gather(). The auth methods and the
+    iter_career_applications export have no async version. From sync
+    code, use run_sync() or fan_out(). Reads are not coalesced, writes
+    invalidate the same single-flight namespaces.
+    """
+    
+    @staticmethod
+    async def get_client():
+        """
+        Get the async Supabase client for the configured project.
+        
+        Returns:
+            The async Supabase client or None if Supabase is not configured
+        """
+        url = current_app.config.get('SUPABASE_URL')
+        key = current_app.config.get('SUPABASE_KEY')
+        if (not url or not key) and not using_fake_backend():
+            current_app.logger.warning("Supabase client not initialized")
+            return None
+        return await get_async_supabase_client(url, key)
+    
+    @staticmethod
+    async def gather(*coroutines):
+        """
+        Run independent queries concurrently.
+        
+        Returns:
+            list: Their results, in argument order
+        """
+        return list(await asyncio.gather(*coroutines))
+    
+    @classmethod
+    def fan_out(cls, *coroutines, timeout=None):
+        """
+        Run independent queries concurrently from sync code.
+        
+        The total latency is that of the slowest query rather than the sum.
+        
+        Returns:
+            list: Their results, in argument order
+        """
+        return run_sync(cls.gather(*coroutines), timeout)
+    
+    @classmethod
+    @invalidates('contacts')
+    async def insert_contact(cls, contact_data):
+        """
+        Insert a new contact into Supabase.
+        
+        Args:
+            contact_data (dict): Contact form data
+            
+        Returns:
+            dict: Response from Supabase
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await client.table('contacts').insert(contact_data).execute()
+            return response.data
+        except Exception as e:
+            current_app.logger.error(f"Error inserting contact into Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def get_contacts(cls, page=1, page_size=20, cursor=None, count='exact'):
+        """
+        Get contacts with pagination, see SupabaseService.paginate.
+        
+        Returns:
+            dict: Paginated contacts data
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            query = SupabaseService.page_query(client, 'contacts', page, page_size, cursor=cursor, count=count)
+            return SupabaseService.page_result(await query.execute(), page, page_size, cursor)
+        except Exception as e:
+            current_app.logger.error(f"Error getting contacts from Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def get_contact_by_id(cls, contact_id):
+        """
+        Get a specific contact by ID.
+        
+        Args:
+            contact_id (str): The contact ID
+            
+        Returns:
+            dict: Contact data or None if not found
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await (client.table('contacts')
+                              .select('*')
+                              .eq('id', contact_id)
+                              .limit(1)
+                              .execute())
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error getting contact from Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    @invalidates('contacts')
+    async def update_contact(cls, contact_id, update_data):
+        """
+        Update an existing contact.
+        
+        Args:
+            contact_id (str): The contact ID
+            update_data (dict): Data to update
+            
+        Returns:
+            dict: Updated contact data or None if failed
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await (client.table('contacts')
+                              .update(update_data)
+                              .eq('id', contact_id)
+                              .execute())
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error updating contact in Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    @invalidates('contacts')
+    async def delete_contact(cls, contact_id):
+        """
+        Delete a contact by ID.
+        
+        Args:
+            contact_id (str): The contact ID
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        client = await cls.get_client()
+        if not client:
+            return False
+            
+        try:
+            response = await (client.table('contacts')
+                              .delete()
+                              .eq('id', contact_id)
+                              .execute())
+            return bool(response.data)
+        except Exception as e:
+            current_app.logger.error(f"Error deleting contact from Supabase: {str(e)}")
+            return False
+    
+    @classmethod
+    @invalidates('career_applications')
+    async def insert_career_application(cls, application_data):
+        """
+        Insert a new career application into Supabase.
+        
+        Args:
+            application_data (dict): Career application data
+            
+        Returns:
+            dict: Response from Supabase
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await client.table('career_applications').insert(application_data).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error inserting career application into Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def get_career_application_by_email(cls, email):
+        """
+        Get a career application by email.
+        
+        Args:
+            email (str): The applicant's email
+            
+        Returns:
+            dict: Application data or None if not found
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await (client.table('career_applications')
+                              .select('*')
+                              .eq('email', email)
+                              .limit(1)
+                              .execute())
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error getting career application from Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def get_career_application_by_id(cls, application_id):
+        """
+        Get a career application by application ID.
+        
+        Args:
+            application_id (str): The application ID
+            
+        Returns:
+            dict: Application data or None if not found
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await (client.table('career_applications')
+                              .select('*')
+                              .eq('application_id', application_id)
+                              .limit(1)
+                              .execute())
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error getting career application from Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def get_career_applications(cls, page=1, page_size=20, status_filter=None, cursor=None, count='exact'):
+        """
+        Get career applications with pagination and optional status filter, see SupabaseService.paginate.
+        
+        Returns:
+            dict: Paginated applications data
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            filters = {'status': status_filter} if status_filter else None
+            query = SupabaseService.page_query(client, 'career_applications', page, page_size,
+                                               filters=filters, cursor=cursor, count=count)
+            return SupabaseService.page_result(await query.execute(), page, page_size, cursor)
+        except Exception as e:
+            current_app.logger.error(f"Error getting career applications from Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    async def count_career_applications(cls, status_filter=None, count='exact'):
+        """
+        Count career applications, optionally with a given status.
+        
+        Returns:
+            int: Number of applications or None if failed
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            query = client.table('career_applications').select('id', count=count)
+            if status_filter:
+                query = query.eq('status', status_filter)
+            response = await query.limit(1).execute()
+            return response.count or 0
+        except Exception as e:
+            current_app.logger.error(f"Error counting career applications in Supabase: {str(e)}")
+            return None
+    
+    @classmethod
+    @invalidates('career_applications')
+    async def update_career_application_status(cls, application_id, status):
+        """
+        Update the status of a career application.
+        
+        Args:
+            application_id (str): The application ID
+            status (str): New status
+            
+        Returns:
+            dict: Updated application data or None if failed
+        """
+        client = await cls.get_client()
+        if not client:
+            return None
+            
+        try:
+            response = await (client.table('career_applications')
+                              .update({'status': status, 'updated_at': 'now()'})
+                              .eq('application_id', application_id)
+                              .execute())
+            return response.data[0] if response.data else None
+        except Exception as e:
+            current_app.logger.error(f"Error updating career application status in Supabase: {str(e)}")
+            return None
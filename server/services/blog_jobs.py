@@ -0,0 +1,160 @@
+# services/blog_jobs.py - Background jobs for the blog
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db
+from models.blog import BlogPost, BlogSubscriber, NewsletterCampaign
+from services.email_service import newsletter_message_builder, deliver_newsletter
+from services.smtp_pool import get_smtp_pool
+from services.job_queue import enqueue, is_final_attempt, job_handler, touch_job
+from services.related_posts import update_related_for_post
+
+SEND_POST_NEWSLETTER = 'send_post_newsletter'
+UPDATE_RELATED_POSTS = 'update_related_posts'
+
+
+def iter_subscriber_chunks(after_id=0, chunk_size=500):
+    """
+    Yield active subscribers in id order, chunk_size (id, email) rows at a time.
+    
+    Each chunk is a separate keyset query (id > last id seen), so memory stays
+    constant and no cursor is held open while the chunk is being sent.
+    
+    Args:
+        after_id (int): Only subscribers with a greater id are returned
+        chunk_size (int): Rows per chunk
+    """
+    while True:
+        rows = (db.session.query(BlogSubscriber.id, BlogSubscriber.email)
+                .filter(BlogSubscriber.is_active == True, BlogSubscriber.id > after_id)
+                .order_by(BlogSubscriber.id)
+                .limit(chunk_size)
+                .all())
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1].id
+
+
+@job_handler(SEND_POST_NEWSLETTER)
+def send_post_newsletter(post_id, subscriber_ids=None):
+    """
+    Email a published post to every active newsletter subscriber.
+    
+    Progress is checkpointed in a NewsletterCampaign after every chunk, so
+    a retried or re-run job continues after the last subscriber already
+    handled instead of mailing everyone again. Subscribers the SMTP server
+    turned away for now (4xx, dropped connection) in a chunk that otherwise
+    went out are resent to by a follow-up job.
+    
+    Args:
+        post_id (str): The post ID
+        subscriber_ids (list): Only send to these subscribers, whose delivery
+            failed temporarily in an earlier run
+    """
+    post = db.session.get(BlogPost, post_id)
+    if post is None or post.status != 'published':
+        return
+    
+    smtp_pool = get_smtp_pool()
+    if not smtp_pool:
+        current_app.logger.warning("SMTP password not set. Email service is disabled.")
+        return
+    
+    campaign = NewsletterCampaign.query.filter_by(post_id=post_id).first()
+    if campaign is None:
+        campaign = NewsletterCampaign(post_id=post_id, last_subscriber_id=0, sent_count=0, failed_count=0)
+        db.session.add(campaign)
+        db.session.commit()
+    if campaign.status == 'completed' and subscriber_ids is None:
+        return
+    
+    build_message = newsletter_message_builder({
+        'title': post.title,
+        'slug': post.slug,
+        'content': post.content,
+        'featured_image': post.featured_image
+    })
+    
+    if subscriber_ids is not None:
+        _resend_newsletter(post_id, campaign, subscriber_ids, build_message, smtp_pool)
+        return
+    
+    chunk_size = current_app.config.get('NEWSLETTER_CHUNK_SIZE', 500)
+    for chunk in iter_subscriber_chunks(campaign.last_subscriber_id, chunk_size):
+        report = deliver_newsletter([row.email for row in chunk], build_message, smtp_pool)
+        
+        # Nothing got through and not only because addresses were refused, e.g.
+        # the SMTP server is down: fail without moving the checkpoint so the
+        # retry sends this chunk again
+        if report.sent == 0 and report.temporary:
+            error = report.failed[next(iter(report.temporary))]
+            raise RuntimeError(f"Newsletter delivery failed for post {post_id}: {error}")
+        
+        # Some of the chunk got through, so sending it again would mail them
+        # twice: queue a resend to just the subscribers turned away for now
+        if report.temporary:
+            _enqueue_resend(post_id, chunk, report)
+        
+        # Permanent refusals (unknown mailbox and the like) would fail again, count them and move on
+        permanent = len(report.failed) - len(report.temporary)
+        if permanent:
+            current_app.logger.warning(f"Newsletter for post {post_id} could not be delivered to {permanent} subscribers")
+        campaign.last_subscriber_id = chunk[-1].id
+        campaign.sent_count += report.sent
+        campaign.failed_count += permanent
+        db.session.commit()
+        # A large list takes longer than JOB_LOCK_TIMEOUT, keep other workers off it
+        touch_job()
+    
+    campaign.status = 'completed'
+    campaign.completed_at = datetime.utcnow()
+    db.session.commit()
+    current_app.logger.info(f"Newsletter for post {post_id} sent to {campaign.sent_count} subscribers")
+
+
+def _enqueue_resend(post_id, rows, report):
+    """Queue a delayed resend to the rows whose delivery failed temporarily, in the caller's transaction."""
+    delay = current_app.config.get('JOB_RETRY_DELAY', 30)
+    enqueue(SEND_POST_NEWSLETTER, {
+        'post_id': post_id,
+        'subscriber_ids': [row.id for row in rows if row.email in report.temporary]
+    }, run_at=datetime.utcnow() + timedelta(seconds=delay), commit=False)
+
+
+def _resend_newsletter(post_id, campaign, subscriber_ids, build_message, smtp_pool):
+    """Send the newsletter to the given subscribers again, see send_post_newsletter."""
+    rows = (db.session.query(BlogSubscriber.id, BlogSubscriber.email)
+            .filter(BlogSubscriber.is_active == True, BlogSubscriber.id.in_(subscriber_ids))
+            .order_by(BlogSubscriber.id)
+            .all())
+    if not rows:
+        return
+    report = deliver_newsletter([row.email for row in rows], build_message, smtp_pool)
+    
+    # Nothing got through: back off and retry the same subscribers, or give up on them for good
+    if report.sent == 0 and report.temporary:
+        if is_final_attempt():
+            campaign.failed_count += len(report.failed)
+            db.session.commit()
+        error = report.failed[next(iter(report.temporary))]
+        raise RuntimeError(f"Newsletter resend failed for post {post_id}: {error}")
+    
+    if report.temporary:
+        _enqueue_resend(post_id, rows, report)
+    campaign.sent_count += report.sent
+    campaign.failed_count += len(report.failed) - len(report.temporary)
+    db.session.commit()
+
+
+@job_handler(UPDATE_RELATED_POSTS)
+def update_post_related(post_id):
+    """
+    Add a newly published post to the related-posts index.
+    
+    Scoring reads every published post, so it runs on the worker rather
+    than in the request that publishes the post.
+    
+    Args:
+        post_id (str): The post ID
+    """
+    update_related_for_post(post_id)
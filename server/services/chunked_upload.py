@@ -0,0 +1,257 @@
+# services/chunked_upload.py - Resumable uploads of large files, sent in numbered parts
+import hashlib
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db
+from models.upload import ChunkedUpload, ChunkedUploadPart
+from services import supabase_clients
+from services.job_queue import enqueue, is_final_attempt, job_handler, touch_job
+from services.upload_stream import read_stream, MalformedUpload
+
+ASSEMBLE_CHUNKED_UPLOAD = 'assemble_chunked_upload'
+
+
+class ChunkedUploadError(Exception):
+    """A request that does not fit the upload, with the HTTP status to answer it with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def storage_bucket():
+    """Return the uploads bucket, with the storage (service role) credentials."""
+    client = supabase_clients.get_supabase_client(current_app.config['SUPABASE_URL'], current_app.config['S3_SECRET'])
+    return client.storage.from_(current_app.config['S3_BUCKET_NAME'])
+
+
+def part_path(upload, part_number):
+    """Storage path of one part until the upload is assembled."""
+    return f"upload-parts/{upload.id}/{part_number:05d}"
+
+
+def create_upload(filename, content_type, size, created_by=None):
+    """
+    Start a resumable upload.
+
+    Args:
+        filename (str): Sanitized name of the file
+        content_type (str): Content-Type the assembled object is stored with
+        size (int): Total size of the file in bytes
+        created_by (str): JWT identity of the uploader
+
+    Returns:
+        ChunkedUpload: The new upload, parts are expected at part_size bytes each
+    """
+    max_size = current_app.config['CHUNKED_UPLOAD_MAX_SIZE']
+    if size > max_size:
+        raise ChunkedUploadError(f"File is larger than {max_size} bytes", 413)
+    if size <= 0:
+        raise ChunkedUploadError("size must be a positive number of bytes")
+
+    upload_id = str(uuid.uuid4())
+    upload = ChunkedUpload(
+        id=upload_id,
+        filename=filename,
+        content_type=content_type or 'application/octet-stream',
+        size=size,
+        part_size=current_app.config['CHUNKED_UPLOAD_PART_SIZE'],
+        object_path=f"media-uploads/{upload_id}_{filename}",
+        created_by=created_by,
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['CHUNKED_UPLOAD_TTL'])
+    )
+    db.session.add(upload)
+    db.session.commit()
+    return upload
+
+
+def store_part(upload, part_number, stream, content_length=None, claimed_digest=None):
+    """
+    Stream one part of an upload from the request body to storage.
+
+    The part goes to its own object as it is read, so parts of an upload
+    can be sent concurrently and none is held by the worker. Sending a
+    part again replaces it. A part that ends early or does not match
+    claimed_digest aborts the storage request before it completes, so it
+    is never recorded.
+
+    Args:
+        upload (ChunkedUpload): The upload, in the uploading state
+        part_number (int): 1-based part number
+        stream: The raw request body
+        content_length (int): Request Content-Length, checked before anything is read
+        claimed_digest (str): Hex SHA-256 the client expects the part to have
+
+    Returns:
+        ChunkedUploadPart: The stored part
+    """
+    if upload.status != 'uploading':
+        raise ChunkedUploadError(f"Upload is {upload.status}", 409)
+    if not 1 <= part_number <= upload.part_count:
+        raise ChunkedUploadError(f"Part number must be between 1 and {upload.part_count}")
+    expected = upload.part_length(part_number)
+    if content_length is not None and content_length != expected:
+        raise ChunkedUploadError(f"Part {part_number} must be exactly {expected} bytes")
+
+    digest = hashlib.sha256()
+    received = 0
+
+    def chunks():
+        nonlocal received
+        for chunk in read_stream(stream, expected, current_app.config['UPLOAD_CHUNK_SIZE']):
+            digest.update(chunk)
+            received += len(chunk)
+            yield chunk
+        # Raised before the body is finished, so storage discards the object
+        if received != expected:
+            raise MalformedUpload(f"Part {part_number} ended after {received} of {expected} bytes")
+        if claimed_digest and claimed_digest != digest.hexdigest():
+            raise MalformedUpload(f"Part {part_number} does not match its X-Content-SHA256")
+
+    storage_bucket().upload_stream(part_path(upload, part_number), chunks(), 'application/octet-stream', upsert=True)
+
+    part = db.session.get(ChunkedUploadPart, (upload.id, part_number))
+    if part is None:
+        part = ChunkedUploadPart(upload_id=upload.id, part_number=part_number)
+        db.session.add(part)
+    part.size = received
+    part.sha256 = digest.hexdigest()
+    part.created_at = datetime.utcnow()
+    db.session.commit()
+    return part
+
+
+def complete_upload(upload):
+    """
+    Queue the assembly of an upload whose parts have all been stored.
+
+    Completing an upload that is already assembling or completed is a no-op,
+    so the client can safely retry. An upload whose assembly failed is
+    queued again, its parts are kept until it expires.
+
+    Returns:
+        ChunkedUpload: The upload, now assembling
+    """
+    if upload.status in ('assembling', 'completed'):
+        return upload
+    if upload.status not in ('uploading', 'failed'):
+        raise ChunkedUploadError(f"Upload is {upload.status}", 409)
+    received = {part.part_number for part in upload.parts}
+    missing = [n for n in range(1, upload.part_count + 1) if n not in received]
+    if missing:
+        raise ChunkedUploadError(f"Missing parts: {', '.join(map(str, missing[:20]))}", 409)
+
+    upload.status = 'assembling'
+    upload.last_error = None
+    enqueue(ASSEMBLE_CHUNKED_UPLOAD, {'upload_id': upload.id}, commit=False)
+    db.session.commit()
+    return upload
+
+
+def abort_upload(upload):
+    """Discard an unfinished upload and the parts already stored."""
+    if upload.status in ('assembling', 'completed'):
+        raise ChunkedUploadError(f"Upload is {upload.status}", 409)
+    _remove_parts(storage_bucket(), upload)
+    upload.status = 'aborted'
+    db.session.commit()
+
+
+def _remove_parts(bucket, upload):
+    paths = [part_path(upload, part.part_number) for part in upload.parts]
+    # The storage API removes up to 1000 objects per request
+    for start in range(0, len(paths), 1000):
+        bucket.remove(paths[start:start + 1000])
+
+
+def _iter_parts(bucket, upload, window):
+    """
+    Download the parts of an upload in order, with up to window downloads in flight.
+
+    At most window + 1 parts are in memory at a time, however large the file.
+    The job's lock is refreshed after every part, so a long assembly is not
+    reclaimed by another worker.
+    """
+    def fetch(part_number):
+        data = bucket.download(part_path(upload, part_number))
+        if len(data) != upload.part_length(part_number):
+            raise ValueError(f"Part {part_number} has {len(data)} bytes in storage, expected {upload.part_length(part_number)}")
+        return data
+
+    part_numbers = iter(range(1, upload.part_count + 1))
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        pending = deque(pool.submit(fetch, n) for _, n in zip(range(window), part_numbers))
+        while pending:
+            data = pending.popleft().result()
+            touch_job()
+            next_part = next(part_numbers, None)
+            if next_part is not None:
+                pending.append(pool.submit(fetch, next_part))
+            yield data
+
+
+@job_handler(ASSEMBLE_CHUNKED_UPLOAD)
+def assemble_upload(upload_id):
+    """
+    Concatenate the parts of an upload into its final object.
+
+    Parts are fetched in parallel and streamed into a single storage write,
+    then removed. Runs on the job worker, as large files take longer than a
+    request may; a failed assembly is retried by the job queue, and the
+    upload is marked failed once the job has no attempts left.
+    """
+    upload = db.session.get(ChunkedUpload, upload_id)
+    if upload is None or upload.status != 'assembling':
+        return
+
+    bucket = storage_bucket()
+    window = current_app.config['CHUNKED_UPLOAD_ASSEMBLY_CONCURRENCY']
+    try:
+        bucket.upload_stream(upload.object_path, _iter_parts(bucket, upload, window), upload.content_type, upsert=True)
+    except Exception as e:
+        upload.last_error = str(e)
+        if is_final_attempt():
+            upload.status = 'failed'
+        db.session.commit()
+        raise
+
+    upload.public_url = bucket.get_public_url(upload.object_path)
+    upload.status = 'completed'
+    upload.completed_at = datetime.utcnow()
+    db.session.commit()
+
+    try:
+        _remove_parts(bucket, upload)
+    except Exception as e:
+        # Leftover parts only cost storage, the assembled file is complete
+        current_app.logger.warning(f"Failed to remove parts of upload {upload.id}: {str(e)}")
+
+
+def purge_expired_uploads():
+    """
+    Delete unfinished or failed uploads past their expiry, with their stored parts.
+
+    Uploads whose parts could not be removed are kept for the next run.
+
+    Returns:
+        int: Number of uploads purged
+    """
+    bucket = storage_bucket()
+    expired = ChunkedUpload.query.filter(
+        ChunkedUpload.status.in_(('uploading', 'aborted', 'failed')),
+        ChunkedUpload.expires_at < datetime.utcnow()
+    ).all()
+    purged = 0
+    for upload in expired:
+        try:
+            _remove_parts(bucket, upload)
+        except Exception as e:
+            current_app.logger.warning(f"Failed to remove parts of upload {upload.id}: {str(e)}")
+            continue
+        db.session.delete(upload)
+        purged += 1
+    db.session.commit()
+    return purged
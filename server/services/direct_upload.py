@@ -0,0 +1,187 @@
+# services/direct_upload.py - Uploads sent by the browser straight to storage with signed upload URLs
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from storage3.utils import StorageException
+from extensions import db
+from models.upload import DirectUpload
+from services.chunked_upload import storage_bucket
+
+# Supabase signed upload URLs stay valid this long, whatever our own expiry
+SIGNED_UPLOAD_URL_LIFETIME = timedelta(hours=2)
+
+# Major content types accepted once the file is in storage
+MEDIA_TYPES = {'image', 'video', 'audio'}
+
+# Bytes read from the start of an uploaded file to identify its format
+SNIFF_LENGTH = 64
+
+# ISO base media (ftyp) brands that are audio or still images rather than video
+AUDIO_BRANDS = {b'M4A ', b'M4B ', b'M4P '}
+IMAGE_BRANDS = {b'avif', b'avis', b'heic', b'heix', b'mif1', b'msf1'}
+
+
+class DirectUploadError(Exception):
+    """A completion that cannot be accepted, with the HTTP status to answer it with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def create_direct_upload(filename, created_by=None):
+    """
+    Issue a signed URL the browser can upload one file to.
+
+    Args:
+        filename (str): Sanitized name of the file
+        created_by (str): JWT identity of the uploader
+
+    Returns:
+        tuple: (DirectUpload, dict with the signed_url and token from storage)
+    """
+    upload_id = str(uuid.uuid4())
+    object_path = f"direct-uploads/{upload_id}_{filename}"
+    # Signed first, so nothing is recorded when storage is unavailable
+    signed = storage_bucket().create_signed_upload_url(object_path)
+
+    upload = DirectUpload(
+        id=upload_id,
+        filename=filename,
+        object_path=object_path,
+        created_by=created_by,
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['DIRECT_UPLOAD_TTL'])
+    )
+    db.session.add(upload)
+    db.session.commit()
+    return upload, signed
+
+
+def sniff_media_types(head):
+    """
+    Identify the major content types a file can be from its first bytes.
+
+    Covers the formats accepted for upload (see MEDIA_EXTENSIONS). The
+    Content-Type stored with a signed upload is whatever the browser sent,
+    so it is checked against this.
+
+    Args:
+        head (bytes): The first SNIFF_LENGTH bytes of the file
+
+    Returns:
+        set: Any of 'image', 'video' and 'audio', empty for other files
+    """
+    if head.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a')):
+        return {'image'}
+    if head[:4] == b'RIFF' and head[8:12] in (b'WEBP', b'WAVE', b'AVI '):
+        return {{b'WEBP': 'image', b'WAVE': 'audio', b'AVI ': 'video'}[head[8:12]]}
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in AUDIO_BRANDS:
+            return {'audio'}
+        if brand in IMAGE_BRANDS:
+            return {'image'}
+        return {'video', 'audio'}
+    # Matroska/WebM and Ogg carry either video or just audio
+    if head.startswith((b'\x1a\x45\xdf\xa3', b'OggS')):
+        return {'video', 'audio'}
+    if head.startswith((b'ID3', b'fLaC')) or (len(head) > 1 and head[0] == 0xff and head[1] & 0xe0 == 0xe0):
+        return {'audio'}
+    return set()
+
+
+def _discard(bucket, upload, status):
+    try:
+        bucket.remove([upload.object_path])
+    except Exception as e:
+        current_app.logger.warning(f"Failed to remove direct upload {upload.object_path}: {str(e)}")
+    upload.status = status
+    db.session.commit()
+
+
+def complete_direct_upload(upload):
+    """
+    Check that the browser's upload arrived and record it.
+
+    The object must exist, be at most DIRECT_UPLOAD_MAX_SIZE bytes and be an
+    image, video or audio file; otherwise it is deleted from storage. Storage
+    cannot enforce these for a signed URL, so this is where they are checked.
+    The Content-Type was declared by the browser, so the file's first bytes
+    are read back and must match it. Completing an upload twice returns the
+    recorded upload.
+
+    Returns:
+        DirectUpload: The completed upload, with its size, type and public URL
+    """
+    if upload.status == 'completed':
+        return upload
+    if upload.status != 'pending':
+        raise DirectUploadError(f"Upload is {upload.status}", 409)
+
+    bucket = storage_bucket()
+    if datetime.utcnow() > upload.expires_at:
+        _discard(bucket, upload, 'expired')
+        raise DirectUploadError("Upload expired, request a new upload URL", 410)
+
+    try:
+        info = bucket.info(upload.object_path)
+    except StorageException:
+        raise DirectUploadError("File has not been uploaded yet", 409)
+
+    # Newer storage APIs return size and content_type, older ones only the object metadata
+    metadata = info.get('metadata') or {}
+    size = info.get('size', metadata.get('size'))
+    content_type = info.get('content_type') or metadata.get('mimetype') or ''
+
+    max_size = current_app.config['DIRECT_UPLOAD_MAX_SIZE']
+    if size is None or int(size) > max_size:
+        _discard(bucket, upload, 'rejected')
+        raise DirectUploadError(f"File is larger than {max_size} bytes", 413)
+    if content_type.split('/')[0] not in MEDIA_TYPES:
+        _discard(bucket, upload, 'rejected')
+        raise DirectUploadError(f"Content type {content_type or 'unknown'} is not allowed", 415)
+    if content_type.split('/')[0] not in sniff_media_types(bucket.download_head(upload.object_path, SNIFF_LENGTH)):
+        _discard(bucket, upload, 'rejected')
+        raise DirectUploadError(f"File content does not match its content type {content_type}", 415)
+
+    upload.size = int(size)
+    upload.content_type = content_type
+    upload.public_url = bucket.get_public_url(upload.object_path)
+    upload.status = 'completed'
+    upload.completed_at = datetime.utcnow()
+    db.session.commit()
+    return upload
+
+
+def purge_expired_direct_uploads():
+    """
+    Remove files uploaded with signed URLs that were never completed, and their records.
+
+    Rejected and expired uploads are included: their signed URL stays
+    usable after the object was deleted at completion, so a second upload
+    could land there. Only uploads whose signed URL can no longer be used
+    are purged, so nothing can land after this removal. Batches whose
+    objects could not be removed are kept for the next run.
+
+    Returns:
+        int: Number of uploads purged
+    """
+    bucket = storage_bucket()
+    expired = DirectUpload.query.filter(
+        DirectUpload.status.in_(('pending', 'rejected', 'expired')),
+        DirectUpload.created_at < datetime.utcnow() - SIGNED_UPLOAD_URL_LIFETIME
+    ).all()
+    purged = 0
+    # The storage API removes up to 1000 objects per request, missing objects are skipped
+    for start in range(0, len(expired), 1000):
+        batch = expired[start:start + 1000]
+        try:
+            bucket.remove([upload.object_path for upload in batch])
+        except Exception as e:
+            current_app.logger.warning(f"Failed to remove {len(batch)} direct uploads: {str(e)}")
+            continue
+        for upload in batch:
+            db.session.delete(upload)
+        db.session.commit()
+        purged += len(batch)
+    return purged
@@ -0,0 +1,144 @@
+# services/email_templates.py - Email templates, compiled once at import
+import re
+from email.mime.text import MIMEText
+from jinja2 import Environment
+from markupsafe import Markup, escape
+
+# Recipient-specific values are left in the pre-rendered body as \x00name\x00 slots
+_SLOT_PATTERN = re.compile('\x00(\\w+)\x00')
+
+
+def _nl2br(value):
+    """Escape text and turn its line breaks into <br> tags."""
+    return Markup('<br>').join(escape(value).split('\n'))
+
+
+_env = Environment(autoescape=True)
+_env.filters['nl2br'] = _nl2br
+
+CONFIRMATION_TEMPLATE = _env.from_string("""
+    <html>
+    <body>
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <div style="background-color: #4f46e5; color: white; padding: 20px; text-align: center;">
+                <h1>Thank You for Contacting Us!</h1>
+            </div>
+            <div style="padding: 20px; border: 1px solid #e5e7eb; border-top: none;">
+                <p>Hello {{ recipient_name }},</p>
+                <p>Thank you for reaching out to Solve Ease. We've received your message and our team will review it shortly.</p>
+                <p>We typically respond within 24-48 business hours.</p>
+                <p>If you have any urgent matters, please call us at +91 72751-56652.</p>
+                <p>Best regards,<br>The Solve Ease Team</p>
+            </div>
+            <div style="background-color: #f3f4f6; padding: 10px; text-align: center; font-size: 12px; color: #6b7280;">
+                <p>© 2025 Solve Ease. All rights reserved.</p>
+                <p>Keshav Mahavidyalaya, Pitampura, New Delhi, India</p>
+            </div>
+        </div>
+    </body>
+    </html>
+""")
+
+ADMIN_NOTIFICATION_TEMPLATE = _env.from_string("""
+    <html>
+    <body>
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <div style="background-color: #4f46e5; color: white; padding: 20px; text-align: center;">
+                <h1>New Contact Form Submission</h1>
+            </div>
+            <div style="padding: 20px; border: 1px solid #e5e7eb; border-top: none;">
+                <p><strong>Name:</strong> {{ name }}</p>
+                <p><strong>Email:</strong> {{ email }}</p>
+                <p><strong>Subject:</strong> {{ subject }}</p>
+                <p><strong>Message:</strong></p>
+                <div style="background-color: #f9fafb; padding: 15px; border-left: 4px solid #4f46e5;">
+                    {{ message|nl2br }}
+                </div>
+                <p style="margin-top: 20px;">You can respond directly to the sender by replying to their email address.</p>
+            </div>
+            <div style="background-color: #f3f4f6; padding: 10px; text-align: center; font-size: 12px; color: #6b7280;">
+                <p>This is an automated notification from your website's contact form.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+""")
+
+NEWSLETTER_TEMPLATE = _env.from_string("""
+    <html>
+    <body>
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <div style="background-color: #4f46e5; color: white; padding: 20px; text-align: center;">
+                <h1>New Blog Post</h1>
+                <p style="font-size: 14px; margin-top: 5px;">{{ current_date }}</p>
+            </div>
+            <div style="padding: 20px; border: 1px solid #e5e7eb; border-top: none;">
+                <h2 style="font-size: 22px; color: #2c3e50; margin-bottom: 15px;">{{ title }}</h2>
+
+                <p style="margin-bottom: 20px; color: #555555;">{{ excerpt }}</p>
+
+                <a href="{{ post_url }}" style="display: inline-block; background-color: #4f46e5; color: white; text-decoration: none; padding: 10px 20px; border-radius: 5px; font-weight: bold;">Read Full Post</a>
+            </div>
+            <div style="background-color: #f3f4f6; padding: 10px; text-align: center; font-size: 12px; color: #6b7280;">
+                <p>Thank you for subscribing to our blog updates!</p>
+                <p>© {{ current_year }} Solve Ease. All rights reserved.</p>
+                <p>
+                    <a href="{{ unsubscribe_url }}" style="color: #6b7280; text-decoration: underline;">Unsubscribe</a>
+                </p>
+            </div>
+        </div>
+    </body>
+    </html>
+""")
+
+
+class PrerenderedEmail:
+    """
+    An email rendered once for a whole send, with slots for per-recipient fields.
+
+    The template is rendered a single time with placeholder slots for
+    the recipient fields and split into segments. render() then only
+    joins the segments with the escaped values, so the cost per
+    recipient does not depend on the template.
+    """
+
+    def __init__(self, template, recipient_fields, **context):
+        slots = {field: Markup(f'\x00{field}\x00') for field in recipient_fields}
+        # A NUL in a shared value (e.g. a pasted post title) would be read as a slot delimiter
+        context = {key: value.replace('\x00', '') if isinstance(value, str) else value
+                   for key, value in context.items()}
+        parts = _SLOT_PATTERN.split(template.render(**context, **slots))
+        # Even indexes are literal HTML, odd indexes name the field for that slot
+        self._literals = parts[0::2]
+        self._fields = parts[1::2]
+
+    def render(self, **values):
+        """
+        Fill the recipient fields in.
+
+        Args:
+            **values: Value for every recipient field, HTML-escaped here
+
+        Returns:
+            str: The complete HTML body
+        """
+        escaped = {field: str(escape(value)) for field, value in values.items()}
+        out = [self._literals[0]]
+        for field, literal in zip(self._fields, self._literals[1:]):
+            out.append(escaped[field])
+            out.append(literal)
+        return ''.join(out)
+
+
+def html_message(sender, recipient, subject, body):
+    """
+    Build a single-part HTML email.
+
+    Returns:
+        MIMEText: The message, ready to be sent
+    """
+    msg = MIMEText(body, 'html', 'utf-8')
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    return msg
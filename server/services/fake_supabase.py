@@ -0,0 +1,479 @@
+# services/fake_supabase.py - Offline stand-in for Supabase tables and storage (SQLite + filesystem)
+import asyncio
+import json
+import mimetypes
+import os
+import re
+import secrets
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from postgrest.exceptions import APIError
+from storage3.utils import StorageException
+
+# Matches one PostgREST filter inside or=(...): column.operator.value
+_FILTER_PATTERN = re.compile(r'^(\w+)\.(eq|neq|gt|gte|lt|lte)\.(.*)$', re.S)
+_OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(text):
+    """Split a PostgREST logic expression on commas that are not inside parentheses or quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _literal(value):
+    """Convert a PostgREST filter value to a Python value."""
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1]
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return {'true': True, 'false': False, 'null': None}.get(value, value)
+
+
+def _column(name):
+    return f"json_extract(data, '$.{name}')"
+
+
+def _sql_value(value):
+    # json_extract returns SQLite integers for JSON booleans
+    return int(value) if isinstance(value, bool) else value
+
+
+def _logic_sql(expression, joiner):
+    """Translate the inside of or=(...) / and(...) into SQL and parameters."""
+    clauses, params = [], []
+    for part in _split_top_level(expression):
+        for nested in ('and', 'or'):
+            if part.startswith(f'{nested}(') and part.endswith(')'):
+                sql, nested_params = _logic_sql(part[len(nested) + 1:-1], nested.upper())
+                break
+        else:
+            match = _FILTER_PATTERN.match(part)
+            if not match:
+                raise APIError({'message': f'Unsupported filter: {part}', 'code': 'PGRST100'})
+            column, operator, value = match.groups()
+            sql, nested_params = f"{_column(column)} {_OPERATORS[operator]} ?", [_sql_value(_literal(value))]
+        clauses.append(f'({sql})')
+        params.extend(nested_params)
+    return f' {joiner} '.join(clauses), params
+
+
+class FakeResponse:
+    """What execute() returns: rows in data and, when requested, the total in count."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeSupabaseBackend:
+    """
+    Rows of every table in one SQLite file, stored as JSON, and storage objects on disk.
+
+    Tables need no schema: they are created on first insert. Rows without
+    an id get the next integer, and created_at defaults to now, like the
+    real tables' column defaults. Every request sleeps latency seconds to
+    mimic the network round trip.
+    """
+
+    def __init__(self, db_path=None, storage_dir=None, public_url='http://localhost:5000/fake-storage', latency=0.0):
+        self.db_path = db_path or os.path.join(tempfile.gettempdir(), 'fake_supabase.sqlite3')
+        self.storage_dir = storage_dir or os.path.join(tempfile.gettempdir(), 'fake_supabase_storage')
+        self.public_url = public_url.rstrip('/')
+        self.latency = latency
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(self.storage_dir, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rows ('
+                ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' table_name TEXT NOT NULL,'
+                ' row_id TEXT NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' UNIQUE (table_name, row_id))'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS signed_uploads ('
+                ' token TEXT PRIMARY KEY,'
+                ' bucket TEXT NOT NULL,'
+                ' path TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            # Serves the MAX(id) lookup when inserting rows without an id
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rows_table_id "
+                "ON rows (table_name, CAST(json_extract(data, '$.id') AS INTEGER))"
+            )
+
+    def _connection(self):
+        # SQLite connections cannot be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def execute(self, request):
+        """Run a query built by FakeQuery and return a FakeResponse."""
+        connection = self._connection()
+        where, params = ['table_name = ?'], [request.table]
+        for sql, filter_params in request.filters:
+            # Parenthesized, or an or_() filter would swallow the conditions ANDed with it
+            where.append(f'({sql})')
+            params.extend(filter_params)
+        where_sql = ' AND '.join(where)
+
+        if request.method == 'select':
+            sql = f'SELECT data FROM rows WHERE {where_sql}'
+            if request.ordering:
+                sql += ' ORDER BY ' + ', '.join(
+                    f"{_column(column)} {'DESC' if desc else 'ASC'}" for column, desc in request.ordering)
+            else:
+                sql += ' ORDER BY seq'
+            if request.row_limit is not None:
+                sql += f' LIMIT {int(request.row_limit)} OFFSET {int(request.row_offset or 0)}'
+            rows = [json.loads(data) for (data,) in connection.execute(sql, params)]
+            count = None
+            if request.count:
+                (count,) = connection.execute(f'SELECT COUNT(*) FROM rows WHERE {where_sql}', params).fetchone()
+            return FakeResponse([self._project(row, request.columns) for row in rows], count)
+
+        with self._write_lock:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                if request.method in ('insert', 'upsert'):
+                    data = self._write_rows(connection, request)
+                elif request.method == 'update':
+                    data = self._update_rows(connection, request, where_sql, params)
+                else:
+                    data = [json.loads(row) for (row,) in connection.execute(
+                        f'SELECT data FROM rows WHERE {where_sql}', params)]
+                    connection.execute(f'DELETE FROM rows WHERE {where_sql}', params)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return FakeResponse(data, len(data) if request.count else None)
+
+    def _write_rows(self, connection, request):
+        rows = request.payload if isinstance(request.payload, list) else [request.payload]
+        written = []
+        for row in rows:
+            row = {key: (_now() if value == 'now()' else value) for key, value in row.items()}
+            if row.get('id') is None:
+                (last_id,) = connection.execute(
+                    "SELECT COALESCE(MAX(CAST(json_extract(data, '$.id') AS INTEGER)), 0) FROM rows WHERE table_name = ?",
+                    (request.table,)).fetchone()
+                row['id'] = last_id + 1
+            row.setdefault('created_at', _now())
+            if request.method == 'upsert':
+                connection.execute(
+                    'INSERT INTO rows (table_name, row_id, data) VALUES (?, ?, ?) '
+                    'ON CONFLICT (table_name, row_id) DO UPDATE SET data = excluded.data',
+                    (request.table, json.dumps(row['id']), json.dumps(row)))
+            else:
+                try:
+                    connection.execute('INSERT INTO rows (table_name, row_id, data) VALUES (?, ?, ?)',
+                                       (request.table, json.dumps(row['id']), json.dumps(row)))
+                except sqlite3.IntegrityError:
+                    raise APIError({'message': 'duplicate key value violates unique constraint', 'code': '23505'})
+            written.append(row)
+        return written
+
+    def _update_rows(self, connection, request, where_sql, params):
+        changes = {key: (_now() if value == 'now()' else value) for key, value in request.payload.items()}
+        updated = []
+        for seq, data in connection.execute(f'SELECT seq, data FROM rows WHERE {where_sql}', params).fetchall():
+            row = {**json.loads(data), **changes}
+            connection.execute('UPDATE rows SET data = ? WHERE seq = ?', (json.dumps(row), seq))
+            updated.append(row)
+        return updated
+
+    @staticmethod
+    def _project(row, columns):
+        if columns == '*':
+            return row
+        return {column: row.get(column) for column in columns.split(',')}
+
+    # Storage
+
+    def object_path(self, bucket, path):
+        full_path = os.path.realpath(os.path.join(self.storage_dir, bucket, path))
+        if not full_path.startswith(os.path.realpath(self.storage_dir) + os.sep):
+            raise StorageException({'statusCode': 400, 'error': 'InvalidKey', 'message': 'Invalid key'})
+        return full_path
+
+    def upload(self, bucket, path, file, file_options=None):
+        file_options = file_options or {}
+        destination = self.object_path(bucket, path)
+        upsert = str(file_options.get('x-upsert', file_options.get('upsert', 'false'))).lower() == 'true'
+        if os.path.exists(destination) and not upsert:
+            raise StorageException({'statusCode': 409, 'error': 'Duplicate', 'message': 'The resource already exists'})
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+        # Write next to the destination and rename, so readers never see a partial object
+        partial = f'{destination}.{threading.get_ident()}.part'
+        try:
+            if isinstance(file, (bytes, bytearray)):
+                with open(partial, 'wb') as out:
+                    out.write(file)
+            elif isinstance(file, (str, os.PathLike)):
+                shutil.copyfile(file, partial)
+            elif hasattr(file, 'read'):
+                with open(partial, 'wb') as out:
+                    shutil.copyfileobj(file, out)
+            else:
+                # Iterable of chunks, from upload_stream()
+                with open(partial, 'wb') as out:
+                    for chunk in file:
+                        out.write(chunk)
+            os.replace(partial, destination)
+        except BaseException:
+            # An aborted stream leaves nothing behind, like an aborted request to Supabase
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return {'path': path, 'Key': f'{bucket}/{path}'}
+
+    def download(self, bucket, path, length=None):
+        try:
+            with open(self.object_path(bucket, path), 'rb') as f:
+                return f.read() if length is None else f.read(length)
+        except FileNotFoundError:
+            raise StorageException({'statusCode': 404, 'error': 'not_found', 'message': 'Object not found'})
+
+    def remove(self, bucket, paths):
+        removed = []
+        for path in paths:
+            try:
+                os.remove(self.object_path(bucket, path))
+                removed.append({'name': path})
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def get_public_url(self, bucket, path):
+        return f'{self.public_url}/{bucket}/{path}'
+
+    def info(self, bucket, path):
+        try:
+            stat = os.stat(self.object_path(bucket, path))
+        except FileNotFoundError:
+            raise StorageException({'statusCode': 404, 'error': 'not_found', 'message': 'Object not found'})
+        # No metadata is kept, the content type is guessed from the extension
+        return {
+            'name': path,
+            'bucket_id': bucket,
+            'size': stat.st_size,
+            'content_type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'last_modified': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+        }
+
+    # Supabase signed upload URLs are valid for two hours
+    SIGNED_UPLOAD_TTL = 2 * 3600
+
+    def create_signed_upload_url(self, bucket, path):
+        self.object_path(bucket, path)
+        token = secrets.token_urlsafe(32)
+        with self._write_lock:
+            self._connection().execute(
+                'INSERT INTO signed_uploads (token, bucket, path, expires_at) VALUES (?, ?, ?, ?)',
+                (token, bucket, path, time.time() + self.SIGNED_UPLOAD_TTL)
+            )
+        url = f'{self.public_url}/upload/sign/{bucket}/{path}?token={token}'
+        return {'signed_url': url, 'signedUrl': url, 'token': token, 'path': path}
+
+    def upload_to_signed_url(self, bucket, path, token, file, file_options=None):
+        row = self._connection().execute(
+            'SELECT bucket, path, expires_at FROM signed_uploads WHERE token = ?', (token,)
+        ).fetchone()
+        if row is None or (row[0], row[1]) != (bucket, path) or row[2] < time.time():
+            raise StorageException({'statusCode': 400, 'error': 'InvalidSignature', 'message': 'Invalid signature'})
+        # Without x-upsert a second upload with the same token is rejected as a duplicate
+        return self.upload(bucket, path, file, file_options)
+
+
+class FakeQuery:
+    """Chainable request builder with the subset of the postgrest-py API used by this app."""
+
+    def __init__(self, backend, table):
+        self._backend = backend
+        self.table = table
+        self.method = 'select'
+        self.columns = '*'
+        self.payload = None
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+        self.row_offset = None
+        self.count = None
+
+    def select(self, *columns, count=None):
+        self.method = 'select'
+        self.columns = ','.join(columns) if columns else '*'
+        if self.columns == 'count':
+            self.columns, count = 'id', count or 'exact'
+        self.count = count
+        return self
+
+    def insert(self, payload, count=None, **kwargs):
+        self.method, self.payload, self.count = 'insert', payload, count
+        return self
+
+    def upsert(self, payload, count=None, on_conflict='', **kwargs):
+        # Conflicts are always resolved on id, the only key the app upserts on
+        self.method, self.payload, self.count = 'upsert', payload, count
+        return self
+
+    def update(self, payload, count=None, **kwargs):
+        self.method, self.payload, self.count = 'update', payload, count
+        return self
+
+    def delete(self, count=None, **kwargs):
+        self.method, self.count = 'delete', count
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((f'{_column(column)} = ?', [_sql_value(value)]))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append((f'{_column(column)} != ?', [_sql_value(value)]))
+        return self
+
+    def or_(self, filters, reference_table=None):
+        self.filters.append(_logic_sql(filters, 'OR'))
+        return self
+
+    def order(self, column, *, desc=False, nullsfirst=False, foreign_table=None):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self.row_limit = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    def execute(self):
+        self._backend.simulate_latency()
+        return self._backend.execute(self)
+
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        if self._backend.latency:
+            await asyncio.sleep(self._backend.latency)
+        return self._backend.execute(self)
+
+
+class FakeBucket:
+    def __init__(self, backend, bucket):
+        self._backend = backend
+        self._bucket = bucket
+
+    def upload(self, path, file, file_options=None):
+        self._backend.simulate_latency()
+        return self._backend.upload(self._bucket, path, file, file_options)
+
+    def upload_stream(self, path, chunks, content_type=None, upsert=False, cache_control='3600'):
+        # Same contract as supabase_clients.StreamingBucket.upload_stream
+        self._backend.simulate_latency()
+        return self._backend.upload(self._bucket, path, chunks, {
+            'content-type': content_type or 'application/octet-stream', 'x-upsert': str(upsert).lower()
+        })
+
+    def download(self, path):
+        self._backend.simulate_latency()
+        return self._backend.download(self._bucket, path)
+
+    def download_head(self, path, length):
+        # Same contract as supabase_clients.StreamingBucket.download_head
+        self._backend.simulate_latency()
+        return self._backend.download(self._bucket, path, length)
+
+    def remove(self, paths):
+        self._backend.simulate_latency()
+        return self._backend.remove(self._bucket, paths)
+
+    def get_public_url(self, path, options=None):
+        return self._backend.get_public_url(self._bucket, path)
+
+    def info(self, path):
+        self._backend.simulate_latency()
+        return self._backend.info(self._bucket, path)
+
+    def exists(self, path):
+        try:
+            self.info(path)
+            return True
+        except StorageException:
+            return False
+
+    def create_signed_upload_url(self, path):
+        self._backend.simulate_latency()
+        return self._backend.create_signed_upload_url(self._bucket, path)
+
+    def upload_to_signed_url(self, path, token, file, file_options=None):
+        self._backend.simulate_latency()
+        return self._backend.upload_to_signed_url(self._bucket, path, token, file, file_options)
+
+
+class FakeStorage:
+    def __init__(self, backend):
+        self._backend = backend
+
+    def from_(self, bucket):
+        # Offline setups often have no SUPABASE_BUCKET_NAME configured
+        return FakeBucket(self._backend, bucket or 'uploads')
+
+
+class FakeSupabaseClient:
+    """Drop-in for supabase.Client covering table() and storage; auth is not available offline."""
+
+    query_class = FakeQuery
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.storage = FakeStorage(backend)
+
+    def table(self, table_name):
+        return self.query_class(self.backend, table_name)
+
+    from_ = table
+
+
+class AsyncFakeSupabaseClient(FakeSupabaseClient):
+    """Drop-in for supabase.AsyncClient, sharing the backend with the sync client."""
+
+    query_class = AsyncFakeQuery
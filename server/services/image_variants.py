@@ -0,0 +1,222 @@
+# services/image_variants.py - Responsive WebP variants of uploaded images, encoded in a process pool
+import atexit
+import io
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Raised for files that are not images Pillow can safely decode
+INVALID_IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError)
+
+ORIENTATION_TAG = 0x0112
+
+
+def verify_image(data):
+    """
+    Check that data is an image Pillow can open, without decoding its pixels.
+
+    Cheap enough to run in the request thread before anything is stored.
+    Files that pass can still fail to render if their pixel data is corrupt.
+
+    Raises:
+        INVALID_IMAGE_ERRORS: If the data is not an image or is a decompression bomb
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except INVALID_IMAGE_ERRORS:
+        raise
+    except Exception as e:
+        # verify() reports broken files with a range of exception types
+        raise UnidentifiedImageError(f"Invalid image: {str(e)}")
+
+
+def render_variants(data, widths, thumbnail_size, quality):
+    """
+    Decode an image once and encode its resized WebP variants.
+
+    Runs in a pool worker process, so it only uses its arguments and Pillow.
+    Widths above the image's own width are capped at it, so a small image
+    gets a single full-size variant rather than upscaled copies. Animated
+    images get no variants, a still WebP would lose the animation.
+
+    Args:
+        data (bytes): The uploaded file
+        widths (tuple): Target widths in pixels
+        thumbnail_size (tuple): (width, height) the thumbnail is cropped to
+        quality (int): WebP quality, 0-100
+
+    Returns:
+        dict: 'width' and 'height' of the image and 'variants', a list of
+              (name, width, height, webp bytes) tuples
+    """
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    # Orientations 5-8 are rotated by 90 degrees, so the displayed width is the stored height
+    if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+        width, height = height, width
+    result = {'width': width, 'height': height, 'variants': []}
+    if getattr(image, 'is_animated', False):
+        return result
+
+    targets = sorted({min(target, width) for target in widths})
+    # Let JPEG decode at a reduced scale when every output is much smaller than the source
+    scale = min(1, max(targets[-1] / width, thumbnail_size[0] / width, thumbnail_size[1] / height))
+    image.draft('RGB', (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    def encode(img):
+        out = io.BytesIO()
+        img.save(out, 'WEBP', quality=quality, method=4)
+        return out.getvalue()
+
+    for target in targets:
+        target_height = max(1, round(image.height * target / image.width))
+        resized = image if image.size == (target, target_height) else image.resize(
+            (target, target_height), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+        result['variants'].append((f'w{target}', target, target_height, encode(resized)))
+
+    thumbnail = ImageOps.fit(image, thumbnail_size, Image.Resampling.LANCZOS)
+    result['variants'].append(('thumb', thumbnail.width, thumbnail.height, encode(thumbnail)))
+    return result
+
+
+class ImageProcessor:
+    """
+    Generates responsive variants of uploaded images off the request threads.
+
+    Decoding and WebP encoding are CPU bound, so they run in a pool of worker
+    processes instead of the request worker, which only waits for the result
+    and uploads the encoded variants to storage in parallel. The pool is
+    started on first use with the spawn method, as forking a process that
+    already runs threads is unsafe, and workers are replaced after
+    max_tasks_per_child images to return memory held by Pillow. With
+    workers=0, or where processes cannot be started (serverless runtimes
+    without /dev/shm), images are rendered in the calling thread.
+    """
+
+    def __init__(self, workers=2, widths=(480, 768, 1280, 1920), thumbnail_size=(320, 320),
+                 quality=80, timeout=30, max_tasks_per_child=100):
+        self.workers = workers
+        self.widths = widths
+        self.thumbnail_size = thumbnail_size
+        self.quality = quality
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self._pool = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        """Read the variant settings from the app config and stop the pool on interpreter shutdown."""
+        self.workers = app.config.get('IMAGE_PROCESS_WORKERS', self.workers)
+        self.widths = app.config.get('IMAGE_VARIANT_WIDTHS', self.widths)
+        self.thumbnail_size = app.config.get('IMAGE_THUMBNAIL_SIZE', self.thumbnail_size)
+        self.quality = app.config.get('IMAGE_WEBP_QUALITY', self.quality)
+        self.timeout = app.config.get('IMAGE_PROCESS_TIMEOUT', self.timeout)
+        # create_app may run several times in one process (tests, CLI), one exit handler is enough
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None and self.workers > 0:
+                try:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        max_tasks_per_child=self.max_tasks_per_child
+                    )
+                except (OSError, NotImplementedError) as e:
+                    current_app.logger.warning(f"Image process pool unavailable, rendering inline: {str(e)}")
+                    self.workers = 0
+            return self._pool
+
+    def _reset_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, data):
+        """
+        Render the variants of an image in the process pool.
+
+        Args:
+            data (bytes): The uploaded file
+
+        Returns:
+            dict: See render_variants
+
+        Raises:
+            INVALID_IMAGE_ERRORS: If the data is not a decodable image
+            TimeoutError: If the pool did not finish within timeout seconds
+        """
+        args = (data, tuple(self.widths), tuple(self.thumbnail_size), self.quality)
+        pool = self._get_pool()
+        if pool is None:
+            return render_variants(*args)
+        future = pool.submit(render_variants, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory), start a fresh pool for the next upload
+            self._reset_pool(pool)
+            raise
+
+    def publish(self, bucket, base_path, data):
+        """
+        Render the variants of an image and store them next to the original.
+
+        Args:
+            bucket: From client.storage.from_(bucket_name)
+            base_path (str): Object path prefix, variants are stored as base_path/<name>.webp
+            data (bytes): The uploaded file
+
+        Returns:
+            dict: 'width', 'height', 'variants' mapping '<width>w' to its public URL,
+                  'srcset' ready for an <img> tag and 'thumbnailUrl'
+        """
+        rendered = self.render(data)
+        variants = rendered['variants']
+        paths = [f"{base_path}/{name}.webp" for name, _, _, _ in variants]
+
+        if variants:
+            with ThreadPoolExecutor(max_workers=len(variants)) as uploads:
+                list(uploads.map(
+                    lambda path, variant: bucket.upload_stream(path, (variant[3],), 'image/webp', upsert=True),
+                    paths, variants
+                ))
+
+        urls = {}
+        thumbnail_url = None
+        for path, (name, width, _, _) in zip(paths, variants):
+            if name == 'thumb':
+                thumbnail_url = bucket.get_public_url(path)
+            else:
+                urls[f'{width}w'] = bucket.get_public_url(path)
+        return {
+            'width': rendered['width'],
+            'height': rendered['height'],
+            'variants': urls,
+            'srcset': ', '.join(f'{url} {descriptor}' for descriptor, url in urls.items()),
+            'thumbnailUrl': thumbnail_url
+        }
+
+    def shutdown(self):
+        """Stop the worker processes, if they were ever started."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+image_processor = ImageProcessor()
@@ -0,0 +1,202 @@
+# services/job_queue.py - Database-backed background job queue
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from extensions import db
+from models.job import Job
+
+# Job kind -> callable taking the job payload as keyword arguments
+_handlers = {}
+
+# Id of the job run_job is executing in this process, for touch_job
+_current_job_id = None
+
+
+def job_handler(kind):
+    """
+    Decorator to register the function that executes jobs of a given kind.
+
+    The function is called with the job payload as keyword arguments and
+    should raise to signal failure; failed jobs are retried with backoff.
+    Handlers that can run longer than JOB_LOCK_TIMEOUT must call touch_job
+    as they make progress, or another worker reclaims the job.
+    """
+    def decorator(f):
+        _handlers[kind] = f
+        return f
+    return decorator
+
+
+def enqueue(kind, payload=None, max_attempts=None, run_at=None, commit=True):
+    """
+    Add a job to the queue.
+
+    Args:
+        kind (str): Registered job kind
+        payload (dict): Keyword arguments for the handler, must be JSON serializable
+        max_attempts (int): Attempts before the job is marked failed
+        run_at (datetime): Earliest time the job may run, defaults to now
+        commit (bool): Commit immediately; pass False to enqueue as part of
+            the caller's transaction
+
+    Returns:
+        Job: The queued job
+    """
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 5),
+        run_at=run_at or datetime.utcnow()
+    )
+    db.session.add(job)
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
+    return job
+
+
+def claim_next_job():
+    """
+    Lock the next due job and mark it running.
+
+    Jobs left running by a worker that died are reclaimed once their lock
+    is older than JOB_LOCK_TIMEOUT seconds. Live workers keep the lock
+    fresh with touch_job.
+
+    Returns:
+        Job: The claimed job, or None when nothing is due
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config.get('JOB_LOCK_TIMEOUT', 1800))
+
+    job = (Job.query
+           .filter(or_(
+               and_(Job.status == 'queued', Job.run_at <= now),
+               and_(Job.status == 'running', Job.locked_at < stale_before)
+           ))
+           .order_by(Job.run_at)
+           .with_for_update(skip_locked=True)
+           .first())
+
+    if job is None:
+        db.session.commit()
+        return None
+
+    job.status = 'running'
+    job.locked_at = now
+    job.attempts = (job.attempts or 0) + 1
+    db.session.commit()
+    return job
+
+
+def touch_job(job_id=None):
+    """
+    Refresh the lock of a running job so it is not reclaimed as stale.
+
+    Long handlers call this after every unit of work (a chunk of emails,
+    a part of an upload). The update goes through its own connection and
+    commits at once, leaving the caller's session and its pending state
+    alone.
+
+    Args:
+        job_id (int): The job, defaults to the one run_job is executing
+
+    Returns:
+        bool: False if the job is no longer running, e.g. it was reclaimed
+    """
+    job_id = job_id if job_id is not None else _current_job_id
+    if job_id is None:
+        return False
+    with db.engine.begin() as connection:
+        result = connection.execute(
+            update(Job.__table__)
+            .where(Job.__table__.c.id == job_id, Job.__table__.c.status == 'running')
+            .values(locked_at=datetime.utcnow())
+        )
+    return result.rowcount == 1
+
+
+def is_final_attempt():
+    """
+    Whether the job run_job is executing will not be retried if it fails.
+
+    Lets a handler record a permanent failure in its own tables before it
+    raises for the last time.
+    """
+    if _current_job_id is None:
+        return False
+    job = db.session.get(Job, _current_job_id)
+    return job is not None and job.attempts >= job.max_attempts
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome.
+
+    Args:
+        job (Job): A job returned by claim_next_job
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    global _current_job_id
+    job_id = job.id
+    handler = _handlers.get(job.kind)
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        _current_job_id = job_id
+        try:
+            handler(**job.payload)
+        finally:
+            _current_job_id = None
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = str(e)
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            current_app.logger.error(f"Job {job_id} ({job.kind}) failed permanently: {str(e)}")
+        else:
+            # Exponential backoff between attempts
+            delay = current_app.config.get('JOB_RETRY_DELAY', 30) * 2 ** (job.attempts - 1)
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + timedelta(seconds=delay)
+            current_app.logger.warning(f"Job {job_id} ({job.kind}) failed, retrying in {delay}s: {str(e)}")
+        db.session.commit()
+        return False
+
+    job = db.session.get(Job, job_id)
+    job.status = 'succeeded'
+    job.locked_at = None
+    job.last_error = None
+    db.session.commit()
+    current_app.logger.info(f"Job {job_id} ({job.kind}) succeeded")
+    return True
+
+
+def work(burst=False):
+    """
+    Process jobs until interrupted.
+
+    Args:
+        burst (bool): Return once the queue has no due jobs instead of polling
+
+    Returns:
+        int: Number of jobs processed
+    """
+    processed = 0
+    poll_interval = current_app.config.get('JOB_POLL_INTERVAL', 5)
+    while True:
+        job = claim_next_job()
+        if job is None:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
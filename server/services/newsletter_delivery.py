@@ -0,0 +1,180 @@
+# services/newsletter_delivery.py - Parallel, rate-limited bulk email delivery
+import smtplib
+import threading
+import time
+
+# Attempts per recipient when the connection drops mid-send
+_MAX_ATTEMPTS = 2
+# Consecutive connection failures after which a delivery worker gives up
+_MAX_CONNECT_FAILURES = 3
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how many messages are sent per second.
+
+    Up to capacity messages may go out in a burst, after which callers are
+    held to rate messages per second.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_temporary_failure(error):
+    """
+    Whether a failed send may succeed if tried again later.
+
+    Connection problems, 4xx replies and a refused sender (which would fail
+    every recipient alike) are temporary. Other 5xx replies (unknown
+    mailbox, rejected content) and errors building or encoding the message
+    are permanent.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return any(code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPSenderRefused):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class DeliveryReport:
+    """
+    Outcome of a bulk delivery: number sent and the error for each failed recipient.
+
+    Recipients whose failure was temporary are also listed in temporary.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = {}
+        self.temporary = set()
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.sent += 1
+
+    def record_failure(self, recipient, error, temporary=None):
+        with self._lock:
+            self.failed[recipient] = str(error)
+            if temporary if temporary is not None else is_temporary_failure(error):
+                self.temporary.add(recipient)
+
+    def to_dict(self):
+        return {'sent': self.sent, 'failed': dict(self.failed), 'temporary': sorted(self.temporary)}
+
+
+def deliver(recipients, build_message, smtp_pool, concurrency=4, rate=10):
+    """
+    Send one message per recipient over several SMTP sessions in parallel.
+
+    Each of the concurrency workers holds one pooled connection and pulls
+    recipients from the shared iterable, so recipients may be a generator.
+    All workers share one token bucket, so total throughput is capped at
+    rate messages per second. A refused address, or a message that fails for
+    any other reason, is recorded and skipped. If a connection drops, the
+    recipient is retried on a fresh connection.
+
+    Args:
+        recipients (iterable): Recipient email addresses
+        build_message (callable): Returns the email.message.Message for a
+            recipient; called from worker threads, so it must not rely on
+            the Flask application context
+        smtp_pool (SMTPPool): Pool providing authenticated connections
+        concurrency (int): Number of parallel SMTP sessions
+        rate (float): Maximum messages per second across all sessions
+
+    Returns:
+        DeliveryReport: Per-recipient outcome
+    """
+    report = DeliveryReport()
+    bucket = TokenBucket(rate)
+    source = iter(recipients)
+    retries = []
+    lock = threading.Lock()
+
+    def next_recipient():
+        with lock:
+            if retries:
+                return retries.pop()
+            return next(source, None), 1
+
+    def worker():
+        connect_failures = 0
+        current = None
+        while connect_failures < _MAX_CONNECT_FAILURES:
+            try:
+                with smtp_pool.connection() as server:
+                    connect_failures = 0
+                    while True:
+                        current = next_recipient()
+                        recipient, attempt = current
+                        if recipient is None:
+                            return
+                        try:
+                            message = build_message(recipient)
+                        except Exception as e:
+                            report.record_failure(recipient, e)
+                            current = None
+                            continue
+                        bucket.acquire()
+                        try:
+                            server.send_message(message)
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException,
+                                smtplib.SMTPNotSupportedError) as e:
+                            report.record_failure(recipient, e)
+                        except (smtplib.SMTPException, OSError):
+                            # The connection is gone, retried on a fresh one below
+                            raise
+                        except Exception as e:
+                            # e.g. UnicodeEncodeError for an address smtplib cannot encode;
+                            # reset the session in case the transaction was half started
+                            report.record_failure(recipient, e)
+                            current = None
+                            server.rset()
+                        else:
+                            report.record_success()
+                        current = None
+            except (smtplib.SMTPException, OSError) as e:
+                connect_failures += 1
+                if current is not None:
+                    recipient, attempt = current
+                    if attempt < _MAX_ATTEMPTS:
+                        with lock:
+                            retries.append((recipient, attempt + 1))
+                    else:
+                        report.record_failure(recipient, e, temporary=True)
+                    current = None
+
+    threads = [threading.Thread(target=worker, name=f'newsletter-{i}', daemon=True)
+               for i in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every worker gave up on connecting, account for whoever is left
+    for recipient, _ in retries:
+        report.record_failure(recipient, 'SMTP connection unavailable', temporary=True)
+    for recipient in source:
+        report.record_failure(recipient, 'SMTP connection unavailable', temporary=True)
+    return report
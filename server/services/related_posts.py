@@ -0,0 +1,212 @@
+# services/related_posts.py - Precomputed related-posts index
+import math
+import re
+from collections import Counter
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, text
+from extensions import db
+from models.blog import BlogPost, BlogPostTag, BlogPostRelated
+
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WORD_PATTERN = re.compile(r'[a-z0-9]{2,}')
+
+# Rows of the TF-IDF matrix are built and compared this many posts at a time
+_BLOCK_SIZE = 512
+
+
+def _settings():
+    """Read tuning knobs from the app config."""
+    config = current_app.config
+    return (
+        config.get('RELATED_POSTS_TOP_K', 10),
+        config.get('RELATED_POSTS_TAG_WEIGHT', 0.5),
+        config.get('RELATED_POSTS_MAX_FEATURES', 2048),
+    )
+
+
+def _tokenize(title, content):
+    """Count the words of a post, with markup stripped and the title counted twice."""
+    plain = _TAG_PATTERN.sub(' ', f"{title or ''} {title or ''} {content or ''}").lower()
+    return Counter(_WORD_PATTERN.findall(plain))
+
+
+class _Corpus:
+    """Published posts vectorised for similarity: TF-IDF over words plus tag sets."""
+
+    def __init__(self, max_features):
+        rows = (db.session.query(BlogPost.id, BlogPost.title, BlogPost.content)
+                .filter(BlogPost.status == 'published')
+                .order_by(BlogPost.id)
+                .all())
+        self.ids = [row.id for row in rows]
+        self.position = {post_id: i for i, post_id in enumerate(self.ids)}
+        self.term_counts = [_tokenize(row.title, row.content) for row in rows]
+
+        # Vocabulary: the most widespread terms that occur in at least two posts,
+        # since a term unique to one post cannot make two posts similar
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        shared = [(df, term) for term, df in document_frequency.items() if df > 1]
+        shared.sort(reverse=True)
+        vocabulary = [term for _, term in shared[:max_features]]
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        n = len(self.ids)
+        self.idf = np.array(
+            [math.log((1 + n) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+            dtype=np.float32
+        )
+
+        # Binary post x tag matrix for Jaccard similarity
+        tag_rows = (db.session.query(BlogPostTag.post_id, BlogPostTag.tag_id)
+                    .filter(BlogPostTag.post_id.in_(db.session.query(BlogPost.id)
+                                                    .filter(BlogPost.status == 'published')))
+                    .all())
+        tag_index = {}
+        for _, tag_id in tag_rows:
+            tag_index.setdefault(tag_id, len(tag_index))
+        self.tags = np.zeros((n, max(len(tag_index), 1)), dtype=np.float32)
+        for post_id, tag_id in tag_rows:
+            if post_id in self.position:
+                self.tags[self.position[post_id], tag_index[tag_id]] = 1.0
+        self.tag_counts = self.tags.sum(axis=1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def tfidf(self, start, stop):
+        """L2-normalised TF-IDF rows for posts start..stop, with sublinear term frequency."""
+        block = np.zeros((stop - start, len(self.vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(self.term_counts[start:stop]):
+            for term, count in counts.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    block[row, column] = 1 + math.log(count)
+        block *= self.idf
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return block / norms
+
+    def jaccard(self, start, stop, other_start, other_stop):
+        """Tag Jaccard similarity between two ranges of posts."""
+        intersection = self.tags[start:stop] @ self.tags[other_start:other_stop].T
+        union = (self.tag_counts[start:stop, None]
+                 + self.tag_counts[None, other_start:other_stop]
+                 - intersection)
+        return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    def similarity(self, start, stop, tag_weight, tfidf=None):
+        """Blended similarity of posts start..stop against every post in the corpus."""
+        scores = np.zeros((stop - start, len(self)), dtype=np.float32)
+        rows = self.tfidf(start, stop)
+        for other_start in range(0, len(self), _BLOCK_SIZE):
+            other_stop = min(other_start + _BLOCK_SIZE, len(self))
+            others = tfidf[other_start:other_stop] if tfidf is not None else self.tfidf(other_start, other_stop)
+            scores[:, other_start:other_stop] = (
+                (1 - tag_weight) * (rows @ others.T)
+                + tag_weight * self.jaccard(start, stop, other_start, other_stop)
+            )
+        # A post is never related to itself
+        for row in range(stop - start):
+            scores[row, start + row] = 0
+        return scores
+
+
+def _top_neighbours(scores, ids, top_k):
+    """Pick the top_k positive (related_post_id, score) pairs from one row of scores."""
+    k = min(top_k, len(scores))
+    if k == 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    candidates = candidates[np.argsort(-scores[candidates])]
+    return [(ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+
+
+def rebuild_related_index():
+    """
+    Recompute the related-posts index for every published post.
+
+    Returns:
+        int: Number of posts indexed
+    """
+    top_k, tag_weight, max_features = _settings()
+    corpus = _Corpus(max_features)
+    tfidf = corpus.tfidf(0, len(corpus))
+
+    BlogPostRelated.query.delete()
+    for start in range(0, len(corpus), _BLOCK_SIZE):
+        stop = min(start + _BLOCK_SIZE, len(corpus))
+        scores = corpus.similarity(start, stop, tag_weight, tfidf)
+        rows = []
+        for row in range(stop - start):
+            post_id = corpus.ids[start + row]
+            rows.extend(
+                {'post_id': post_id, 'related_post_id': related_id, 'score': score}
+                for related_id, score in _top_neighbours(scores[row], corpus.ids, top_k)
+            )
+        if rows:
+            db.session.execute(BlogPostRelated.__table__.insert(), rows)
+    db.session.commit()
+    return len(corpus)
+
+
+def update_related_for_post(post_id):
+    """
+    Add a newly published post to the related-posts index.
+
+    The post gets its own top-k neighbours, and it is inserted into the
+    neighbour list of every other post where it beats the current worst
+    entry. Term weights of existing posts are not recomputed; run
+    rebuild_related_index periodically for that.
+
+    Args:
+        post_id (str): The post ID
+    """
+    top_k, tag_weight, max_features = _settings()
+    corpus = _Corpus(max_features)
+    position = corpus.position.get(post_id)
+    if position is None:
+        return
+
+    scores = corpus.similarity(position, position + 1, tag_weight)[0]
+
+    BlogPostRelated.query.filter_by(post_id=post_id).delete()
+    own = [
+        {'post_id': post_id, 'related_post_id': related_id, 'score': score}
+        for related_id, score in _top_neighbours(scores, corpus.ids, top_k)
+    ]
+    if own:
+        db.session.execute(BlogPostRelated.__table__.insert(), own)
+
+    # Current size and weakest score of every neighbour list
+    lists = {
+        row.post_id: (row.size, row.weakest)
+        for row in db.session.query(
+            BlogPostRelated.post_id,
+            func.count().label('size'),
+            func.min(BlogPostRelated.score).label('weakest')
+        ).filter(BlogPostRelated.related_post_id != post_id).group_by(BlogPostRelated.post_id)
+    }
+
+    additions = []
+    for i in np.nonzero(scores > 0)[0]:
+        other_id = corpus.ids[i]
+        size, weakest = lists.get(other_id, (0, 0.0))
+        if size < top_k or scores[i] > weakest:
+            additions.append({'post_id': other_id, 'related_post_id': post_id, 'score': float(scores[i])})
+
+    if additions:
+        BlogPostRelated.query.filter(
+            BlogPostRelated.post_id.in_([row['post_id'] for row in additions]),
+            BlogPostRelated.related_post_id == post_id
+        ).delete(synchronize_session=False)
+        db.session.execute(BlogPostRelated.__table__.insert(), additions)
+        # Trim every list that grew past top_k
+        db.session.execute(
+            text("DELETE FROM blog_post_related WHERE post_id = :post_id "
+                 "AND related_post_id NOT IN (SELECT related_post_id FROM blog_post_related "
+                 "WHERE post_id = :post_id ORDER BY score DESC LIMIT :top_k)"),
+            [{'post_id': row['post_id'], 'top_k': top_k} for row in additions]
+        )
+    db.session.commit()
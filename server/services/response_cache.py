@@ -0,0 +1,117 @@
+# services/response_cache.py - In-process HTTP response cache for public read endpoints
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, make_response, Response
+
+
+class CachedResponse:
+    """A rendered 200 response together with its validators."""
+
+    def __init__(self, body, mimetype, version):
+        self.body = body
+        self.mimetype = mimetype
+        self.version = version
+        self.etag = hashlib.sha256(body).hexdigest()
+        self.stored_at = time.monotonic()
+
+    def to_response(self):
+        """Build a fresh response, answering conditional requests with 304."""
+        response = Response(self.body, status=200, mimetype=self.mimetype)
+        response.set_etag(self.etag)
+        # Clients may keep the response but must revalidate it, which is a cheap 304
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response.make_conditional(request)
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of rendered responses keyed by route and query string.
+
+    Every write to the cached content calls invalidate(), which bumps the
+    content version and drops all entries. The cache is per process, so
+    entries also expire after a TTL to bound staleness across workers.
+    """
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read cache limits from the app config."""
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, entry):
+        """Cache entry unless the content changed while it was being rendered."""
+        with self._lock:
+            if entry.version != self.version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self):
+        """Return the current content version."""
+        with self._lock:
+            return self.version
+
+    def invalidate(self):
+        """Bump the content version and drop every cached response."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key():
+    """Key a request by path and its query string with parameters sorted."""
+    args = sorted(request.args.items(multi=True))
+    return request.path, urlencode(args)
+
+
+def cached_response(f):
+    """
+    Decorator to serve a GET endpoint from the response cache.
+
+    Only 200 responses are cached. Responses carry a strong ETag of the
+    body, so If-None-Match gets a 304. There is no Last-Modified: view
+    counts, the related-posts index and other workers change the content
+    without calling invalidate(), so no clock here knows when it changed.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = _cache_key()
+        entry = response_cache.get(key)
+
+        if entry is None:
+            version = response_cache.snapshot()
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            entry = CachedResponse(response.get_data(), response.mimetype, version)
+            response_cache.store(key, entry)
+
+        return entry.to_response()
+    return decorated_function
@@ -0,0 +1,133 @@
+# services/search_service.py - Full-text search over blog posts
+import re
+from sqlalchemy import func, or_, select, text, table, column, literal_column
+from extensions import db
+from models.blog import BlogPost
+
+# Only word characters reach the database query; everything else is treated as a separator
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_MAX_QUERY_TOKENS = 16
+
+_fts_table = table('blog_posts_fts', column('post_id'))
+
+
+def _dialect():
+    """Return the name of the database dialect the session is bound to."""
+    return db.session.get_bind().dialect.name
+
+
+def _plain_text(html):
+    """Strip HTML tags and collapse whitespace so markup is not indexed."""
+    return ' '.join(_TAG_PATTERN.sub(' ', html or '').split())
+
+
+def _tokenize(search):
+    """Split a raw search string into lowercase search terms."""
+    return _TOKEN_PATTERN.findall(search.lower())[:_MAX_QUERY_TOKENS]
+
+
+def _postgres_vector(title, content):
+    """Build the weighted tsvector expression stored in BlogPost.search_vector."""
+    title_vector = func.setweight(func.to_tsvector('english', title), literal_column("'A'"))
+    content_vector = func.setweight(func.to_tsvector('english', content), literal_column("'B'"))
+    return title_vector.op('||')(content_vector)
+
+
+def index_post(post):
+    """
+    Update the search index entry for a blog post.
+
+    Must be called inside the transaction that writes the post, after the
+    post has been flushed so that its id is assigned.
+
+    Args:
+        post (BlogPost): The post that was created or updated
+    """
+    title = post.title or ''
+    content = _plain_text(post.content)
+    dialect = _dialect()
+
+    if dialect == 'postgresql':
+        post.search_vector = _postgres_vector(title, content)
+    elif dialect == 'sqlite':
+        db.session.execute(
+            text("DELETE FROM blog_posts_fts WHERE post_id = :post_id"),
+            {'post_id': post.id}
+        )
+        db.session.execute(
+            text("INSERT INTO blog_posts_fts (post_id, title, content) VALUES (:post_id, :title, :content)"),
+            {'post_id': post.id, 'title': title, 'content': content}
+        )
+
+
+def apply_search(query, search):
+    """
+    Restrict a BlogPost query to posts matching a search string.
+
+    The last term is matched as a prefix so results keep up with the
+    debounced search box while the user is still typing.
+
+    Args:
+        query: A BlogPost query
+        search (str): The raw search string from the request
+
+    Returns:
+        tuple: The filtered query and an ORDER BY clause ranking results by
+        relevance, or None when the backend cannot rank
+    """
+    terms = _tokenize(search)
+    if not terms:
+        return query, None
+
+    dialect = _dialect()
+
+    if dialect == 'postgresql':
+        ts_query = func.to_tsquery('english', ' & '.join(terms[:-1] + [f'{terms[-1]}:*']))
+        query = query.filter(BlogPost.search_vector.op('@@')(ts_query))
+        return query, func.ts_rank_cd(BlogPost.search_vector, ts_query).desc()
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        matches = (select(
+                       _fts_table.c.post_id,
+                       # Title matches weigh ten times as much as body matches
+                       literal_column('bm25(blog_posts_fts, 0.0, 10.0, 1.0)').label('rank'))
+                   .where(text("blog_posts_fts MATCH :fts_query").bindparams(fts_query=match))
+                   .subquery())
+        query = query.join(matches, matches.c.post_id == BlogPost.id)
+        return query, matches.c.rank.asc()
+
+    # Other databases have no index to use, fall back to a plain substring scan
+    query = query.filter(or_(
+        BlogPost.title.ilike(f'%{search}%'),
+        BlogPost.content.ilike(f'%{search}%')
+    ))
+    return query, None
+
+
+def rebuild_search_index(batch_size=500):
+    """
+    Reindex every blog post, e.g. after enabling search on an existing database.
+
+    Args:
+        batch_size (int): Number of posts loaded and committed at a time
+
+    Returns:
+        int: Number of posts indexed
+    """
+    indexed = 0
+    last_id = None
+    while True:
+        query = BlogPost.query.order_by(BlogPost.id)
+        if last_id is not None:
+            query = query.filter(BlogPost.id > last_id)
+        posts = query.limit(batch_size).all()
+        if not posts:
+            break
+        for post in posts:
+            index_post(post)
+        last_id = posts[-1].id
+        indexed += len(posts)
+        db.session.commit()
+    return indexed
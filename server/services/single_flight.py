@@ -0,0 +1,152 @@
+# services/single_flight.py - Coalescing of identical concurrent reads, with an optional short TTL
+import copy
+import inspect
+import threading
+import time
+from functools import wraps
+from flask import current_app
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one execution of a read between all callers asking for the same key at once.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for and receive the same result instead of repeating the
+    request. With a ttl, a non-None result is also kept for that many seconds.
+    Keys are (namespace, ...) tuples so writes can invalidate a whole
+    namespace, e.g. every cached read of one table.
+
+    Counters: hits (served from the TTL cache), coalesced (joined an
+    in-flight call) and misses (executed the function).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._cache = {}
+        self._generations = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def do(self, key, func, ttl=0):
+        """
+        Return func() for key, sharing the call with concurrent callers.
+
+        Args:
+            key (tuple): Hashable key, its first element is the namespace
+            func (callable): Performs the read
+            ttl (float): Seconds to keep a non-None result, 0 to only coalesce
+
+        Returns:
+            A private copy of the result
+        """
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.hits += 1
+                return copy.deepcopy(cached[1])
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                generation = self._generations.get(key[0], 0)
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # Skip caching if a write invalidated the namespace while the read was running
+                if (ttl and call.error is None and call.result is not None
+                        and self._generations.get(key[0], 0) == generation):
+                    self._cache[key] = (time.monotonic() + ttl, call.result)
+            call.done.set()
+        return copy.deepcopy(call.result)
+
+    def invalidate(self, namespace):
+        """Drop cached results of a namespace; reads already in flight are not cached."""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key in self._cache if key[0] == namespace]:
+                del self._cache[key]
+
+    def stats(self):
+        """Current counters and cache size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'coalesced': self.coalesced,
+                'misses': self.misses,
+                'in_flight': len(self._in_flight),
+                'cached': len(self._cache)
+            }
+
+
+supabase_reads = SingleFlight()
+
+
+def coalesced_read(namespace):
+    """
+    Decorator for SupabaseService read classmethods, keyed on namespace, method and arguments.
+
+    The TTL is SUPABASE_READ_CACHE_TTL seconds, 0 (only coalesce) by default.
+    Apply below @classmethod.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(cls, *args, **kwargs):
+            key = (namespace, f.__name__, args, tuple(sorted(kwargs.items())))
+            ttl = current_app.config.get('SUPABASE_READ_CACHE_TTL', 0)
+            return supabase_reads.do(key, lambda: f(cls, *args, **kwargs), ttl)
+        return decorated
+    return decorator
+
+
+def invalidates(namespace):
+    """
+    Decorator for SupabaseService write classmethods, sync or async.
+
+    Invalidates namespace once the write returns or raises, as a failed
+    request may still have been applied. Apply below @classmethod.
+    """
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def decorated(cls, *args, **kwargs):
+                try:
+                    return await f(cls, *args, **kwargs)
+                finally:
+                    supabase_reads.invalidate(namespace)
+        else:
+            @wraps(f)
+            def decorated(cls, *args, **kwargs):
+                try:
+                    return f(cls, *args, **kwargs)
+                finally:
+                    supabase_reads.invalidate(namespace)
+        return decorated
+    return decorator
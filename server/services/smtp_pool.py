@@ -0,0 +1,182 @@
+# services/smtp_pool.py - Pooled, authenticated SMTP connections shared by all email senders
+import atexit
+import os
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+SMTPSettings = namedtuple('SMTPSettings', ['host', 'port', 'username', 'password', 'use_tls'])
+
+
+def smtp_settings():
+    """
+    Read SMTP server settings from the environment.
+
+    Returns:
+        SMTPSettings: The settings, with password None when email is disabled
+    """
+    return SMTPSettings(
+        host=os.environ.get('SMTP_SERVER', 'smtp.gmail.com'),
+        port=int(os.environ.get('SMTP_PORT', 587)),
+        username=os.environ.get('SMTP_USERNAME', 'solveeaseofficial@gmail.com'),
+        password=os.environ.get('GOOGLE_APP_PASSWORD'),
+        use_tls=os.environ.get('SMTP_USE_TLS', 'true').lower() != 'false'
+    )
+
+
+class SMTPPool:
+    """
+    Keep authenticated SMTP connections open and hand them out to senders.
+
+    A connection that sat idle for more than health_check_after seconds is
+    probed with NOOP before it is reused, and one idle for more than
+    max_idle seconds is closed, since servers drop idle clients. At most
+    max_size connections are open at once; further callers wait.
+    """
+
+    def __init__(self, settings, max_size=4, timeout=30, health_check_after=15, max_idle=240):
+        self.settings = settings
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_idle = max_idle
+        self.connections_opened = 0
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Open, secure and authenticate a new connection."""
+        server = smtplib.SMTP(self.settings.host, self.settings.port, timeout=self.timeout)
+        try:
+            if self.settings.use_tls:
+                server.starttls()
+            if self.settings.username and self.settings.password:
+                server.login(self.settings.username, self.settings.password)
+        except Exception:
+            self._close(server)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def _is_healthy(self, server, idle_for):
+        """Decide whether an idle connection can be reused."""
+        if idle_for > self.max_idle:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _acquire(self):
+        """Take a live connection from the pool, opening one if none is idle."""
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    server, released_at = self._idle.get_nowait()
+                except Empty:
+                    return self._connect()
+                if self._is_healthy(server, time.monotonic() - released_at):
+                    return server
+                self._close(server)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, server, reusable):
+        if reusable:
+            self._idle.put((server, time.monotonic()))
+        else:
+            self._close(server)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled smtplib.SMTP connection.
+
+        The connection goes back to the pool afterwards, unless the server
+        dropped it or the error leaves its state unknown.
+        """
+        server = self._acquire()
+        try:
+            yield server
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+            # The server answered and smtplib reset the transaction, the session is still usable
+            reusable = getattr(e, 'smtp_code', None) != 421
+            self._release(server, reusable)
+            raise
+        except BaseException:
+            self._release(server, False)
+            raise
+        else:
+            self._release(server, True)
+
+    def send_message(self, msg, retries=1):
+        """
+        Send a message over a pooled connection.
+
+        Args:
+            msg (email.message.Message): The message to send
+            retries (int): Reconnect attempts if the server dropped the connection
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as server:
+                    server.send_message(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                if attempt == retries:
+                    raise
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._close(server)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    """
+    Get the process-wide pool for the configured SMTP server.
+
+    Returns:
+        SMTPPool: The shared pool, or None when no SMTP password is configured
+    """
+    settings = smtp_settings()
+    if not settings.password:
+        return None
+
+    with _pools_lock:
+        pool = _pools.get(settings)
+        if pool is None:
+            pool = SMTPPool(settings, max_size=int(os.environ.get('SMTP_POOL_SIZE', 4)))
+            _pools[settings] = pool
+        return pool
+
+
+@atexit.register
+def _close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
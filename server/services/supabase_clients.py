@@ -0,0 +1,319 @@
+# services/supabase_clients.py - Process-wide Supabase clients sharing one pooled HTTP/2 transport
+import asyncio
+import atexit
+import threading
+import weakref
+from urllib.parse import quote
+import httpx
+from gotrue.http_clients import AsyncClient as AsyncAuthHttpClient, SyncClient as AuthHttpClient
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from storage3._async.client import AsyncStorageClient
+from storage3._sync.client import SyncStorageClient
+from storage3._sync.file_api import SyncBucketProxy
+from storage3.exceptions import StorageApiError
+from supabase import AClient, AsyncClientOptions, Client, ClientOptions
+
+# Connection pool settings, replaced by init_app from the app config
+_settings = {
+    'backend': 'supabase',
+    'fake': {},
+    'pool_size': 20,
+    'keepalive': 10,
+    'keepalive_expiry': 60,
+    'http2': True,
+    'postgrest_timeout': 30,
+    'storage_timeout': 60
+}
+
+_transport = None
+_clients = {}
+_fake_backend = None
+_lock = threading.Lock()
+
+# Async clients and their transport are bound to the event loop they were created on
+_async_registries = weakref.WeakKeyDictionary()
+
+
+def init_app(app):
+    """Read pool size, keep-alive and timeout settings from the app config."""
+    _settings.update({
+        'backend': app.config.get('SUPABASE_BACKEND', _settings['backend']),
+        'fake': {
+            'db_path': app.config.get('FAKE_SUPABASE_DB'),
+            'storage_dir': app.config.get('FAKE_SUPABASE_STORAGE_DIR'),
+            'public_url': app.config.get('FAKE_SUPABASE_PUBLIC_URL', 'http://localhost:5000/fake-storage'),
+            'latency': app.config.get('FAKE_SUPABASE_LATENCY', 0.0)
+        },
+        'pool_size': app.config.get('SUPABASE_HTTP_POOL_SIZE', _settings['pool_size']),
+        'keepalive': app.config.get('SUPABASE_HTTP_KEEPALIVE', _settings['keepalive']),
+        'keepalive_expiry': app.config.get('SUPABASE_HTTP_KEEPALIVE_EXPIRY', _settings['keepalive_expiry']),
+        'http2': app.config.get('SUPABASE_HTTP2', _settings['http2']),
+        'postgrest_timeout': app.config.get('SUPABASE_POSTGREST_TIMEOUT', _settings['postgrest_timeout']),
+        'storage_timeout': app.config.get('SUPABASE_STORAGE_TIMEOUT', _settings['storage_timeout'])
+    })
+
+
+def using_fake_backend():
+    """Whether SUPABASE_BACKEND selects the offline stand-in from services/fake_supabase.py."""
+    return _settings['backend'] == 'fake'
+
+
+def fake_backend():
+    """The process-wide offline backend, created on first use."""
+    global _fake_backend
+    from services.fake_supabase import FakeSupabaseBackend
+    with _lock:
+        if _fake_backend is None:
+            _fake_backend = FakeSupabaseBackend(**_settings['fake'])
+        return _fake_backend
+
+
+def _shared_transport():
+    """The keep-alive connection pool every Supabase sub-client sends through."""
+    global _transport
+    if _transport is None:
+        _transport = httpx.HTTPTransport(
+            http2=_settings['http2'],
+            limits=_limits()
+        )
+    return _transport
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=_settings['pool_size'],
+        max_keepalive_connections=_settings['keepalive'],
+        keepalive_expiry=_settings['keepalive_expiry']
+    )
+
+
+def _http_client(cls=httpx.Client, **kwargs):
+    return cls(transport=_shared_transport(), follow_redirects=True, **kwargs)
+
+
+def _async_registry():
+    """The async transport and clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    registry = _async_registries.get(loop)
+    if registry is None:
+        registry = {
+            'transport': httpx.AsyncHTTPTransport(http2=_settings['http2'], limits=_limits()),
+            'clients': {}
+        }
+        _async_registries[loop] = registry
+    return registry
+
+
+def _async_http_client(cls=httpx.AsyncClient, **kwargs):
+    return cls(transport=_async_registry()['transport'], follow_redirects=True, **kwargs)
+
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return _http_client(base_url=base_url, headers=headers, timeout=timeout)
+
+
+class StreamingBucket(SyncBucketProxy):
+    """
+    storage3 bucket that can also stream objects in and read part of one.
+
+    storage3's upload() only accepts whole files and download() only
+    returns whole objects. upload_stream() and download_head() send their
+    requests over the bucket's own pooled session instead. That session is
+    private to storage3, and this is the only place it is used directly;
+    services/fake_supabase.py has the same methods for offline runs.
+    """
+
+    def upload_stream(self, path, chunks, content_type=None, upsert=False, cache_control='3600'):
+        """
+        Upload an object from an iterable of byte chunks, without holding it whole.
+
+        An exception raised by the iterable aborts the request, so storage
+        discards the partial object.
+
+        Args:
+            path (str): Object path inside the bucket
+            chunks (iterable): Byte strings making up the object
+            content_type (str): Content-Type stored with the object
+            upsert (bool): Overwrite an existing object at path
+            cache_control (str): max-age in seconds served with the object
+
+        Returns:
+            dict: The object's path and Key
+        """
+        headers = {
+            'content-type': content_type or 'application/octet-stream',
+            'cache-control': f"max-age={cache_control}",
+            'x-upsert': str(upsert).lower()
+        }
+        response = self._client.post(f"/object/{self.id}/{quote(path)}", content=chunks, headers=headers)
+        self._raise_for_status(response)
+        return {'path': path, 'Key': response.json().get('Key')}
+
+    def download_head(self, path, length):
+        """
+        Download the first length bytes of an object, e.g. to check its file signature.
+
+        Sent as a range request; should storage ignore the range, the
+        transfer is cut off after length bytes all the same.
+
+        Returns:
+            bytes: At most length bytes
+        """
+        headers = {'range': f"bytes=0-{length - 1}"}
+        with self._client.stream('GET', f"/object/{self.id}/{quote(path)}", headers=headers) as response:
+            self._raise_for_status(response)
+            head = b''
+            for chunk in response.iter_bytes():
+                head += chunk
+                if len(head) >= length:
+                    break
+        return head[:length]
+
+    @staticmethod
+    def _raise_for_status(response):
+        """Raise storage3's StorageApiError for an error response, like its own methods do."""
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            exc.response.read()
+            try:
+                error = exc.response.json()
+            except ValueError:
+                error = {}
+            raise StorageApiError(
+                error.get('message', exc.response.text), error.get('error'),
+                error.get('statusCode', exc.response.status_code)
+            )
+
+
+class _PooledStorageClient(SyncStorageClient):
+    def _create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return _http_client(base_url=base_url, headers=headers, timeout=timeout)
+
+    def from_(self, id):
+        return StreamingBucket(id, self._client)
+
+
+class PooledSupabaseClient(Client):
+    """
+    Supabase client whose auth, PostgREST and storage sub-clients share one transport.
+
+    supabase-py gives every sub-client its own httpx connection pool and
+    builds new ones whenever the auth session changes. Here they all send
+    through the process-wide pool, so connections (multiplexed over HTTP/2
+    when the server supports it) are opened once and kept alive.
+    """
+
+    def _init_supabase_auth_client(self, auth_url, client_options, verify=True, proxy=None):
+        client = super()._init_supabase_auth_client(auth_url, client_options, verify, proxy)
+        client._http_client = _http_client(AuthHttpClient)
+        return client
+
+    def _init_postgrest_client(self, rest_url, headers, schema, timeout=None, verify=True, proxy=None):
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+    def _init_storage_client(self, storage_url, headers, storage_client_timeout=None, verify=True, proxy=None):
+        return _PooledStorageClient(storage_url, headers, storage_client_timeout)
+
+
+class _PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return _async_http_client(base_url=base_url, headers=headers, timeout=timeout)
+
+
+class _PooledAsyncStorageClient(AsyncStorageClient):
+    def _create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return _async_http_client(base_url=base_url, headers=headers, timeout=timeout)
+
+
+class PooledAsyncSupabaseClient(AClient):
+    """Async counterpart of PooledSupabaseClient, sharing one transport per event loop."""
+
+    def _init_supabase_auth_client(self, auth_url, client_options, verify=True, proxy=None):
+        client = super()._init_supabase_auth_client(auth_url, client_options, verify, proxy)
+        client._http_client = _async_http_client(AsyncAuthHttpClient)
+        return client
+
+    def _init_postgrest_client(self, rest_url, headers, schema, timeout=None, verify=True, proxy=None):
+        return _PooledAsyncPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+    def _init_storage_client(self, storage_url, headers, storage_client_timeout=None, verify=True, proxy=None):
+        return _PooledAsyncStorageClient(storage_url, headers, storage_client_timeout)
+
+
+def get_supabase_client(url, key):
+    """
+    Get the process-wide client for a Supabase project and key.
+
+    The client is created on first use and reused for every later call
+    with the same credentials, so requests pay neither client construction
+    nor connection setup.
+
+    Args:
+        url (str): Supabase project URL
+        key (str): API key, e.g. the anon or the service role key
+
+    Returns:
+        Client: The shared client
+    """
+    if using_fake_backend():
+        from services.fake_supabase import FakeSupabaseClient
+        return FakeSupabaseClient(fake_backend())
+
+    with _lock:
+        client = _clients.get((url, key))
+        if client is None:
+            options = ClientOptions(
+                postgrest_client_timeout=_settings['postgrest_timeout'],
+                storage_client_timeout=_settings['storage_timeout']
+            )
+            client = PooledSupabaseClient.create(url, key, options)
+            _clients[(url, key)] = client
+        return client
+
+
+async def get_async_supabase_client(url, key):
+    """
+    Get the async client for a Supabase project and key on the running event loop.
+
+    Like get_supabase_client, but clients are kept per event loop, since
+    async connections cannot move between loops.
+
+    Args:
+        url (str): Supabase project URL
+        key (str): API key
+
+    Returns:
+        AsyncClient: The shared client for this loop
+    """
+    if using_fake_backend():
+        from services.fake_supabase import AsyncFakeSupabaseClient
+        return AsyncFakeSupabaseClient(fake_backend())
+
+    clients = _async_registry()['clients']
+    client = clients.get((url, key))
+    if client is None:
+        options = AsyncClientOptions(
+            postgrest_client_timeout=_settings['postgrest_timeout'],
+            storage_client_timeout=_settings['storage_timeout']
+        )
+        client = await PooledAsyncSupabaseClient.create(url, key, options)
+        clients[(url, key)] = client
+    return client
+
+
+@atexit.register
+def close_clients():
+    """
+    Drop every cached client and close the shared connection pool.
+
+    Runs at interpreter exit. Clients requested afterwards are created
+    again on a new pool.
+    """
+    global _transport
+    with _lock:
+        _clients.clear()
+        if _transport is not None:
+            _transport.close()
+            _transport = None
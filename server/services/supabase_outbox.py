@@ -0,0 +1,173 @@
+# services/supabase_outbox.py - Batched, retried mirroring of local rows to Supabase
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+import extensions
+from extensions import db
+from models.job import Job
+from models.outbox import SupabaseOutbox
+from services.job_queue import enqueue, job_handler
+from services.single_flight import supabase_reads
+from services.task_dispatcher import task_dispatcher
+
+FLUSH_SUPABASE_OUTBOX = 'flush_supabase_outbox'
+
+# Set while a flush is queued on the task dispatcher, so bursts share one flush
+_flush_scheduled = threading.Event()
+# One flush at a time per process; SKIP LOCKED separates processes
+_flush_lock = threading.Lock()
+
+
+def add_to_outbox(table_name, record):
+    """
+    Queue a row for mirroring to Supabase as part of the caller's transaction.
+    
+    Nothing is sent here: the row reaches Supabase only once the caller
+    commits, and is then upserted on its id by flush_outbox, so mirroring
+    the same row twice is harmless.
+    
+    Args:
+        table_name (str): Supabase table
+        record (dict): JSON serializable row, including its 'id'
+    
+    Returns:
+        SupabaseOutbox: The outbox entry, or None when Supabase is not configured
+    """
+    if not extensions.supabase_client:
+        return None
+    entry = SupabaseOutbox(table_name=table_name, payload=record)
+    db.session.add(entry)
+    return entry
+
+
+def flush_outbox(batch_size=None):
+    """
+    Upsert due outbox rows to Supabase, one request per table per batch.
+    
+    Each batch is claimed with FOR UPDATE SKIP LOCKED and marked sending in
+    a short transaction, so no row lock is held during the HTTP request and
+    several processes can flush at once without sending a row twice. A
+    claim lapses after SUPABASE_OUTBOX_CLAIM_TIMEOUT seconds, so rows of a
+    flusher that died are sent again. A batch that fails is retried with
+    exponential backoff and marked failed after SUPABASE_OUTBOX_MAX_ATTEMPTS
+    attempts; see requeue_failed.
+    
+    Returns:
+        int: Number of outbox rows mirrored
+    """
+    client = extensions.supabase_client
+    if not client:
+        return 0
+    
+    batch_size = batch_size or current_app.config.get('SUPABASE_OUTBOX_BATCH_SIZE', 100)
+    max_attempts = current_app.config.get('SUPABASE_OUTBOX_MAX_ATTEMPTS', 8)
+    retry_delay = current_app.config.get('SUPABASE_OUTBOX_RETRY_DELAY', 30)
+    claim_timeout = current_app.config.get('SUPABASE_OUTBOX_CLAIM_TIMEOUT', 300)
+    mirrored = 0
+    next_retry = None
+    
+    while True:
+        now = datetime.utcnow()
+        entries = (SupabaseOutbox.query
+                   .filter(SupabaseOutbox.status.in_(('pending', 'sending')), SupabaseOutbox.next_attempt_at <= now)
+                   .order_by(SupabaseOutbox.id)
+                   .limit(batch_size)
+                   .with_for_update(skip_locked=True)
+                   .all())
+        if not entries:
+            db.session.commit()
+            break
+        
+        by_table = OrderedDict()
+        for entry in entries:
+            # One upsert may not touch a key twice, the newest payload wins
+            rows, ids = by_table.setdefault(entry.table_name, ({}, []))
+            rows[entry.payload.get('id', f'outbox-{entry.id}')] = entry.payload
+            ids.append(entry.id)
+            entry.status = 'sending'
+            entry.next_attempt_at = now + timedelta(seconds=claim_timeout)
+        # Release the row locks before talking to Supabase
+        db.session.commit()
+        
+        for table_name, (rows, ids) in by_table.items():
+            try:
+                client.table(table_name).upsert(list(rows.values()), on_conflict='id').execute()
+            except Exception as e:
+                current_app.logger.error(f"Error mirroring {len(rows)} rows to Supabase table {table_name}: {str(e)}")
+                for entry in SupabaseOutbox.query.filter(SupabaseOutbox.id.in_(ids)):
+                    entry.attempts = (entry.attempts or 0) + 1
+                    entry.last_error = str(e)
+                    if entry.attempts >= max_attempts:
+                        entry.status = 'failed'
+                    else:
+                        # Exponential backoff between attempts
+                        entry.status = 'pending'
+                        entry.next_attempt_at = now + timedelta(seconds=retry_delay * 2 ** (entry.attempts - 1))
+                        next_retry = min(next_retry or entry.next_attempt_at, entry.next_attempt_at)
+                db.session.commit()
+                continue
+            supabase_reads.invalidate(table_name)
+            SupabaseOutbox.query.filter(SupabaseOutbox.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            mirrored += len(ids)
+        
+        if len(entries) < batch_size:
+            break
+    
+    if next_retry is not None:
+        _schedule_retry(next_retry)
+    return mirrored
+
+
+def requeue_failed(table_name=None):
+    """
+    Give outbox rows that ran out of attempts a fresh set of attempts.
+    
+    Args:
+        table_name (str): Only requeue rows for this Supabase table
+    
+    Returns:
+        int: Number of rows requeued
+    """
+    query = SupabaseOutbox.query.filter(SupabaseOutbox.status == 'failed')
+    if table_name:
+        query = query.filter(SupabaseOutbox.table_name == table_name)
+    requeued = query.update({
+        SupabaseOutbox.status: 'pending',
+        SupabaseOutbox.attempts: 0,
+        SupabaseOutbox.next_attempt_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+
+def _schedule_retry(run_at):
+    """Make sure a durable job flushes the outbox again once the backoff expires."""
+    queued = Job.query.filter(Job.kind == FLUSH_SUPABASE_OUTBOX, Job.status == 'queued').first()
+    if queued is None:
+        enqueue(FLUSH_SUPABASE_OUTBOX, run_at=run_at)
+    elif queued.run_at > run_at:
+        queued.run_at = run_at
+        db.session.commit()
+
+
+def _flush_in_background():
+    with _flush_lock:
+        # Rows committed from here on are picked up by this flush or trigger the next one
+        _flush_scheduled.clear()
+        return flush_outbox()
+
+
+def schedule_outbox_flush():
+    """Flush the outbox after the current request, coalescing with a flush that is already queued."""
+    if not extensions.supabase_client or _flush_scheduled.is_set():
+        return
+    _flush_scheduled.set()
+    task_dispatcher.submit(_flush_in_background, description='Supabase outbox flush')
+
+
+@job_handler(FLUSH_SUPABASE_OUTBOX)
+def flush_supabase_outbox():
+    """Job entry point for retrying the outbox after a failed flush."""
+    flush_outbox()
@@ -1,5 +1,12 @@
 # services/supabase_service.py - Service for Supabase operations
+import base64
+import json
 from flask import current_app
+from services.single_flight import coalesced_read, invalidates
+
+# Count modes accepted by paginate: PostgREST's exact COUNT(*), or 'estimated',
+# which is exact for small results and the planner's row estimate for large ones
+COUNT_MODES = ('exact', 'estimated')
 
 class SupabaseService:
     """
@@ -20,7 +27,114 @@ class SupabaseService:
             current_app.logger.warning("Supabase client not initialized")
         return supabase_client
     
+    @staticmethod
+    def encode_cursor(row):
+        """Encode the (created_at, id) position of a row as an opaque cursor."""
+        raw = json.dumps([row['created_at'], row['id']])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Returns:
+            tuple: (created_at, id)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, row_id = json.loads(raw)
+        except Exception:
+            raise ValueError('Invalid cursor')
+        if not isinstance(created_at, str) or not isinstance(row_id, (int, str)):
+            raise ValueError('Invalid cursor')
+        return created_at, row_id
+    
+    @classmethod
+    def paginate(cls, client, table, page=1, page_size=20, filters=None, cursor=None, count='exact'):
+        """
+        Fetch one page of a table, newest first, together with its total in a single request.
+        
+        Rows and count come back from the same PostgREST call (count in the
+        Content-Range header), instead of a second select('count') request.
+        Pages are addressed by page number, or, when cursor is given (empty
+        string for the first page), by keyset on (created_at, id), which
+        stays cheap on deep pages.
+        
+        Args:
+            client: The Supabase client
+            table (str): Table name
+            page (int): Page number (1-indexed), ignored with a cursor
+            page_size (int): Number of items per page
+            filters (dict): Column -> value equality filters
+            cursor (str): Position from a previous page's next_cursor
+            count (str): 'exact', 'estimated' or None to skip counting
+        
+        Returns:
+            dict: items, page_size and total, plus page and pages, or
+                  next_cursor in keyset mode
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = cls.page_query(client, table, page, page_size, filters, cursor, count)
+        return cls.page_result(query.execute(), page, page_size, cursor)
+    
+    @classmethod
+    def page_query(cls, client, table, page=1, page_size=20, filters=None, cursor=None, count='exact'):
+        """Build the request for paginate without executing it, for sync and async clients alike."""
+        query = client.table(table).select('*', count=count) if count else client.table(table).select('*')
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        
+        if cursor is not None:
+            if cursor:
+                created_at, row_id = cls.decode_cursor(cursor)
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{json.dumps(row_id)})'
+                )
+            # One extra row tells whether there is a next page
+            return (query
+                    .order('created_at', desc=True)
+                    .order('id', desc=True)
+                    .limit(page_size + 1))
+        
+        # Calculate range for pagination
+        start = (page - 1) * page_size
+        end = start + page_size - 1
+        return (query
+                .order('created_at', desc=True)
+                .order('id', desc=True)
+                .range(start, end))
+    
+    @classmethod
+    def page_result(cls, response, page=1, page_size=20, cursor=None):
+        """Shape the response to a page_query request like paginate does."""
+        if cursor is not None:
+            items = response.data[:page_size]
+            has_more = len(response.data) > page_size
+            return {
+                'items': items,
+                'page_size': page_size,
+                'total': response.count,
+                'next_cursor': cls.encode_cursor(items[-1]) if has_more else None
+            }
+        
+        total = response.count or 0
+        return {
+            'items': response.data,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'pages': (total + page_size - 1) // page_size
+        }
+    
     @classmethod
+    @invalidates('contacts')
     def insert_contact(cls, contact_data):
         """
         Insert a new contact into Supabase.
@@ -43,13 +157,16 @@ class SupabaseService:
             return None
     
     @classmethod
-    def get_contacts(cls, page=1, page_size=20):
+    @coalesced_read('contacts')
+    def get_contacts(cls, page=1, page_size=20, cursor=None, count='exact'):
         """
         Get contacts with pagination.
         
         Args:
             page (int): Page number (1-indexed)
             page_size (int): Number of items per page
+            cursor (str): Keyset position instead of page, see paginate
+            count (str): 'exact', 'estimated' or None
             
         Returns:
             dict: Paginated contacts data
@@ -59,32 +176,13 @@ class SupabaseService:
             return None
             
         try:
-            # Calculate range for pagination
-            start = (page - 1) * page_size
-            end = start + page_size - 1
-            
-            response = (client.table('contacts')
-                        .select('*')
-                        .order('created_at', desc=True)
-                        .range(start, end)
-                        .execute())
-            
-            # Get total count for pagination info
-            count_response = client.table('contacts').select('count', count='exact').execute()
-            total = count_response.count or 0
-            
-            return {
-                'items': response.data,
-                'page': page,
-                'page_size': page_size,
-                'total': total,
-                'pages': (total + page_size - 1) // page_size
-            }
+            return cls.paginate(client, 'contacts', page=page, page_size=page_size, cursor=cursor, count=count)
         except Exception as e:
             current_app.logger.error(f"Error getting contacts from Supabase: {str(e)}")
             return None
     
     @classmethod
+    @coalesced_read('contacts')
     def get_contact_by_id(cls, contact_id):
         """
         Get a specific contact by ID.
@@ -114,6 +212,7 @@ class SupabaseService:
             return None
     
     @classmethod
+    @invalidates('contacts')
     def update_contact(cls, contact_id, update_data):
         """
         Update an existing contact.
@@ -143,6 +242,7 @@ class SupabaseService:
             return None
     
     @classmethod
+    @invalidates('contacts')
     def delete_contact(cls, contact_id):
         """
         Delete a contact by ID.
@@ -170,6 +270,7 @@ class SupabaseService:
     
     # Career Application methods
     @classmethod
+    @invalidates('career_applications')
     def insert_career_application(cls, application_data):
         """
         Insert a new career application into Supabase.
@@ -192,6 +293,7 @@ class SupabaseService:
             return None
     
     @classmethod
+    @coalesced_read('career_applications')
     def get_career_application_by_email(cls, email):
         """
         Get a career application by email.
@@ -221,6 +323,7 @@ class SupabaseService:
             return None
     
     @classmethod
+    @coalesced_read('career_applications')
     def get_career_application_by_id(cls, application_id):
         """
         Get a career application by application ID.
@@ -250,7 +353,8 @@ class SupabaseService:
             return None
     
     @classmethod
-    def get_career_applications(cls, page=1, page_size=20, status_filter=None):
+    @coalesced_read('career_applications')
+    def get_career_applications(cls, page=1, page_size=20, status_filter=None, cursor=None, count='exact'):
         """
         Get career applications with pagination and optional status filter.
         
@@ -258,6 +362,8 @@ class SupabaseService:
             page (int): Page number (1-indexed)
             page_size (int): Number of items per page
             status_filter (str): Optional status to filter by
+            cursor (str): Keyset position instead of page, see paginate
+            count (str): 'exact', 'estimated' or None
             
         Returns:
             dict: Paginated applications data
@@ -267,40 +373,40 @@ class SupabaseService:
             return None
             
         try:
-            # Calculate range for pagination
-            start = (page - 1) * page_size
-            end = start + page_size - 1
-            
-            query = client.table('career_applications').select('*')
-            
-            if status_filter:
-                query = query.eq('status', status_filter)
-            
-            response = (query
-                        .order('created_at', desc=True)
-                        .range(start, end)
-                        .execute())
-            
-            # Get total count for pagination info
-            count_query = client.table('career_applications').select('count', count='exact')
-            if status_filter:
-                count_query = count_query.eq('status', status_filter)
-            
-            count_response = count_query.execute()
-            total = count_response.count or 0
-            
-            return {
-                'items': response.data,
-                'page': page,
-                'page_size': page_size,
-                'total': total,
-                'pages': (total + page_size - 1) // page_size
-            }
+            filters = {'status': status_filter} if status_filter else None
+            return cls.paginate(client, 'career_applications', page=page, page_size=page_size,
+                                filters=filters, cursor=cursor, count=count)
         except Exception as e:
             current_app.logger.error(f"Error getting career applications from Supabase: {str(e)}")
             return None
     
     @classmethod
+    def iter_career_applications(cls, status_filter=None, batch_size=1000):
+        """
+        Yield every career application, newest first, batch_size rows per request.
+        
+        Walks the keyset pages of paginate without counting, so each request
+        stays cheap however deep the export goes and only one page is held
+        in memory.
+        
+        Args:
+            status_filter (str): Optional status to filter by
+            batch_size (int): Rows per request
+        """
+        client = cls.get_client()
+        if not client:
+            return
+        
+        filters = {'status': status_filter} if status_filter else None
+        cursor = ''
+        while cursor is not None:
+            result = cls.paginate(client, 'career_applications', page_size=batch_size,
+                                  filters=filters, cursor=cursor, count=None)
+            yield from result['items']
+            cursor = result['next_cursor']
+    
+    @classmethod
+    @invalidates('career_applications')
     def update_career_application_status(cls, application_id, status):
         """
         Update the status of a career application.
@@ -0,0 +1,131 @@
+# services/task_dispatcher.py - Run short side effects after the response, on a bounded thread pool
+import atexit
+import threading
+import time
+from queue import Queue, Full
+
+
+class _Task:
+    __slots__ = ('func', 'args', 'kwargs', 'description', 'attempt')
+
+    def __init__(self, func, args, kwargs, description):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.description = description
+        self.attempt = 1
+
+
+class TaskDispatcher:
+    """
+    Fire-and-forget execution of side effects such as notification emails.
+
+    Tasks go onto a bounded queue served by up to max_workers daemon threads,
+    each running inside its own app context, so the request can respond
+    before they finish. A task that raises or returns False is retried after
+    retry_delay seconds, doubled on every attempt, up to max_attempts times.
+    When the queue is full the task runs in the calling thread instead of
+    being dropped.
+
+    Unlike the job queue, tasks live only in memory and are lost if the
+    process dies; use it for work that is cheap to lose.
+    """
+
+    def __init__(self, max_workers=4, max_queue=1000, max_attempts=3, retry_delay=2, shutdown_timeout=10):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.shutdown_timeout = shutdown_timeout
+        self._app = None
+        self._queue = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        """Bind the dispatcher to an app and drain the queue on interpreter shutdown."""
+        self.max_workers = app.config.get('TASK_DISPATCH_WORKERS', self.max_workers)
+        self.max_queue = app.config.get('TASK_DISPATCH_QUEUE_SIZE', self.max_queue)
+        self.max_attempts = app.config.get('TASK_DISPATCH_MAX_ATTEMPTS', self.max_attempts)
+        self.retry_delay = app.config.get('TASK_DISPATCH_RETRY_DELAY', self.retry_delay)
+        self._app = app
+        self._queue = Queue(self.max_queue)
+        # create_app may run several times in one process (tests, CLI), one exit handler is enough
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def submit(self, func, *args, description=None, **kwargs):
+        """
+        Schedule func(*args, **kwargs) to run in the background.
+
+        Args:
+            func (callable): The task; returning False counts as a failure
+            description (str): Used in log messages, defaults to the function name
+        """
+        task = _Task(func, args, kwargs, description or func.__name__)
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(task)
+        except Full:
+            self._app.logger.warning(f"Task queue full, running {task.description} inline")
+            self._run(task)
+
+    def shutdown(self):
+        """Stop accepting retries and wait up to shutdown_timeout seconds for queued tasks."""
+        self._stop.set()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for _ in self._threads:
+            try:
+                self._queue.put(None, timeout=max(0, deadline - time.monotonic()))
+            except Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+    def _ensure_workers(self):
+        """Start the worker threads, including in freshly forked processes."""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, name=f'task-dispatch-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            self._run(task)
+
+    def _run(self, task):
+        with self._app.app_context():
+            try:
+                ok = task.func(*task.args, **task.kwargs) is not False
+                error = None if ok else 'returned False'
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                return
+
+            if task.attempt >= self.max_attempts or self._stop.is_set():
+                self._app.logger.error(f"Task {task.description} failed after {task.attempt} attempts: {error}")
+                return
+            delay = self.retry_delay * 2 ** (task.attempt - 1)
+            self._app.logger.warning(f"Task {task.description} failed, retrying in {delay}s: {error}")
+        task.attempt += 1
+        timer = threading.Timer(delay, self._retry, args=(task,))
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self, task):
+        try:
+            self._queue.put_nowait(task)
+        except Full:
+            self._run(task)
+
+
+task_dispatcher = TaskDispatcher()
@@ -0,0 +1,58 @@
+# services/upload_index.py - Content-addressed index of stored uploads, so repeated bytes are stored once
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from extensions import db
+from models.upload import UploadedImage
+
+
+def find_image(digest):
+    """
+    Look up an already stored image by content.
+
+    Args:
+        digest (str): Hex SHA-256 of the image bytes
+
+    Returns:
+        UploadedImage: The stored image, None if unknown or the index is unavailable
+    """
+    try:
+        return db.session.get(UploadedImage, digest.lower())
+    except SQLAlchemyError as e:
+        # Without the index every upload is simply stored again
+        db.session.rollback()
+        current_app.logger.warning(f"Upload index lookup failed: {str(e)}")
+        return None
+
+
+def record_image(digest, object_path, public_url, content_type, size, variants=None):
+    """
+    Add a stored image to the index.
+
+    When the same bytes were recorded concurrently by another request the
+    existing entry is kept; both point at identical content.
+
+    Args:
+        digest (str): Hex SHA-256 of the image bytes
+        object_path (str): Path of the original in the bucket
+        public_url (str): Public URL of the original
+        content_type (str): Content-Type sent with the upload
+        size (int): Size in bytes
+        variants (dict): From ImageProcessor.publish
+
+    Returns:
+        UploadedImage: The index entry for digest
+    """
+    image = UploadedImage(
+        sha256=digest, object_path=object_path, public_url=public_url,
+        content_type=content_type, size=size, variants=variants
+    )
+    db.session.add(image)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return db.session.get(UploadedImage, digest) or image
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Failed to index upload {object_path}: {str(e)}")
+    return image
@@ -0,0 +1,172 @@
+# services/upload_stream.py - Read uploads from the request stream chunk by chunk, for streaming into storage
+import hashlib
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import MultipartDecoder, File, Data, Epilogue, NEED_DATA
+
+# Bound on the multipart headers the decoder buffers before a part's data starts
+MAX_PART_HEADER_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The uploaded file is larger than the allowed maximum."""
+
+    def __init__(self, max_size):
+        super().__init__(f"Upload exceeds the maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class MalformedUpload(ValueError):
+    """The request body is not multipart or has no file in the expected field."""
+
+
+class StreamedFile:
+    """
+    The file part of a multipart request, read lazily from the request stream.
+
+    Iterating yields the file's bytes in chunks as they arrive, so the upload
+    is never held in memory or written to disk as a whole. The size limit is
+    checked as the bytes go through and UploadTooLarge is raised as soon as
+    it is exceeded. A StreamedFile can only be iterated once.
+    """
+
+    def __init__(self, events, filename, content_type, max_size):
+        self._events = events
+        self.filename = filename
+        self.content_type = content_type
+        self.max_size = max_size
+        self.size = 0
+
+    def __iter__(self):
+        for event in self._events:
+            if not isinstance(event, Data):
+                break
+            self.size += len(event.data)
+            if self.max_size is not None and self.size > self.max_size:
+                raise UploadTooLarge(self.max_size)
+            if event.data:
+                yield event.data
+            if not event.more_data:
+                return
+        raise MalformedUpload("Upload ended before the file was complete")
+
+
+def _boundary_safe_reads(stream, boundary, chunk_size):
+    """
+    Read the request stream, never handing the decoder half a boundary line.
+
+    Given a buffer ending in "\r\n--<boundary>-", werkzeug's decoder passes
+    the "\r" on as file data, so a read that happens to stop there would
+    add a byte to the file. Bytes from the start of a boundary are held
+    back until its line is complete.
+    """
+    marker = b'--' + boundary
+    window = len(marker) + 8
+    fed = b''       # Tail of what the decoder has been given
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            if pending:
+                yield pending
+            yield None
+            return
+        data = pending + chunk
+        seen = fed + data
+        cut = seen.rfind(marker, max(0, len(seen) - window))
+        if cut != -1 and b'\n' not in seen[cut:]:
+            split = max(0, cut - len(fed))
+            data, pending = data[:split], data[split:]
+        else:
+            pending = b''
+        if data:
+            fed = (fed + data)[-window:]
+            yield data
+
+
+def _multipart_events(reads, decoder):
+    """Feed the request stream into the decoder, yielding its events."""
+    while True:
+        try:
+            event = decoder.next_event()
+        except ValueError as e:
+            raise MalformedUpload(str(e))
+        if event is NEED_DATA:
+            try:
+                decoder.receive_data(next(reads))
+            except RequestEntityTooLarge:
+                raise MalformedUpload("Multipart part headers are too large")
+            continue
+        yield event
+        if isinstance(event, Epilogue):
+            return
+
+
+def open_multipart_file(stream, content_type, field, max_size=None, chunk_size=64 * 1024):
+    """
+    Find a file field in a multipart request body without reading the file itself.
+
+    Args:
+        stream: The raw request body, e.g. flask.request.stream. Must not have been
+                consumed by request.files or request.form
+        content_type (str): The request Content-Type header
+        field (str): Name of the form field holding the file
+        max_size (int): Largest accepted file size in bytes, None for no limit
+        chunk_size (int): Bytes read from the stream at a time
+
+    Returns:
+        StreamedFile: Positioned at the start of the file's data
+
+    Raises:
+        MalformedUpload: If the body is not multipart or has no such file field
+    """
+    mimetype, options = parse_options_header(content_type or '')
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        raise MalformedUpload("Request is not multipart/form-data")
+
+    boundary = boundary.encode('latin-1')
+    # The decoder's bound covers its unparsed buffer plus the chunk being fed in
+    decoder = MultipartDecoder(boundary, max_form_memory_size=chunk_size + MAX_PART_HEADER_SIZE)
+    events = _multipart_events(_boundary_safe_reads(stream, boundary, chunk_size), decoder)
+    for event in events:
+        if isinstance(event, File) and event.name == field:
+            return StreamedFile(events, event.filename, event.headers.get('content-type'), max_size)
+    raise MalformedUpload(f"No {field} part in the request")
+
+
+def read_stream(stream, max_size=None, chunk_size=64 * 1024):
+    """
+    Iterate over a raw request body in chunks, e.g. flask.request.stream.
+
+    Raises:
+        UploadTooLarge: As soon as more than max_size bytes were read
+    """
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise UploadTooLarge(max_size)
+        yield chunk
+
+
+def collect_chunks(chunks):
+    """
+    Read an upload to the end into a single buffer, hashing it on the way.
+
+    Args:
+        chunks (iterable): Byte strings, e.g. a StreamedFile
+
+    Returns:
+        tuple: (the upload's bytes, hex SHA-256 of them)
+    """
+    received = []
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+        received.append(chunk)
+    # The chunk list is dropped on return, only the joined copy is kept
+    return b''.join(received), digest.hexdigest()
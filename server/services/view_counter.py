@@ -0,0 +1,115 @@
+# services/view_counter.py - Write-behind buffering for blog post view counts
+import atexit
+import threading
+import time
+from collections import Counter
+from sqlalchemy import bindparam, func, update
+from extensions import db
+from models.blog import BlogPost
+
+
+class ViewCounter:
+    """
+    Buffer view increments in process and write them to the database in batches.
+
+    A flush issues a single executemany of
+    UPDATE blog_posts SET view_count = view_count + :views WHERE id = :post_id,
+    so workers never overwrite each other's counts and no row is locked per view.
+    Pending counts are flushed every flush_interval seconds by a background
+    thread, whenever max_pending distinct posts are buffered, and at exit.
+    """
+
+    def __init__(self, flush_interval=10, max_pending=1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._app = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._thread = None
+        self._stop = threading.Event()
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        """Bind the counter to an app and flush it on interpreter shutdown."""
+        self.flush_interval = app.config.get('VIEW_COUNT_FLUSH_INTERVAL', self.flush_interval)
+        self.max_pending = app.config.get('VIEW_COUNT_MAX_PENDING', self.max_pending)
+        if self._app is not None and self._app is not app:
+            # Counts buffered so far belong to the previous app's database
+            self.flush()
+        self._app = app
+        # create_app may run several times in one process (tests, CLI), one exit flush is enough
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def increment(self, post_id):
+        """
+        Record one view of a post.
+
+        Args:
+            post_id (str): The post ID
+        """
+        self._ensure_flusher()
+        with self._lock:
+            self._pending[post_id] += 1
+            full = len(self._pending) >= self.max_pending
+            overdue = time.monotonic() - self._last_flush >= self.flush_interval
+        # Serverless platforms may freeze the background thread between requests
+        if full or overdue:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered increments to the database.
+
+        Returns:
+            int: Number of posts updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        table = BlogPost.__table__
+        statement = (update(table)
+                     .where(table.c.id == bindparam('post_id'))
+                     .values(view_count=func.coalesce(table.c.view_count, 0) + bindparam('views')))
+        params = [{'post_id': post_id, 'views': views} for post_id, views in pending.items()]
+
+        # A separate app context gives the flush its own session, apart from any request
+        with self._app.app_context():
+            try:
+                db.session.execute(statement, params)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                # Keep the counts so the next flush retries them
+                with self._lock:
+                    self._pending.update(pending)
+                self._app.logger.error(f"Error flushing blog view counts: {str(e)}")
+                return 0
+        return len(params)
+
+    def shutdown(self):
+        """Stop the background thread and flush whatever is still buffered."""
+        self._stop.set()
+        if self._app is not None:
+            self.flush()
+
+    def _ensure_flusher(self):
+        """Start the periodic flush thread, including in freshly forked workers."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+view_counter = ViewCounter()
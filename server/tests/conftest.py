@@ -0,0 +1,70 @@
+# tests/conftest.py - Shared fixtures: the app on a throwaway SQLite database and the offline Supabase backend
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so it is set before the app is imported
+_workdir = tempfile.mkdtemp(prefix='solve-ease-tests-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(_workdir, 'app.db')}",
+    'SECRET_KEY': 'test-secret-key',
+    'JWT_SECRET_KEY': 'test-jwt-secret-key-that-is-long-enough',
+    'SUPABASE_BACKEND': 'fake',
+    'FAKE_SUPABASE_DB': os.path.join(_workdir, 'supabase.db'),
+    'FAKE_SUPABASE_STORAGE_DIR': os.path.join(_workdir, 'storage'),
+    'FAKE_SUPABASE_PUBLIC_URL': 'http://localhost/fake-storage',
+    'SUPABASE_BUCKET_NAME': 'uploads',
+    'IMAGE_PROCESS_WORKERS': '0',
+    'GOOGLE_APP_PASSWORD': '',
+})
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from extensions import db  # noqa: E402
+from models.user import User  # noqa: E402
+from services.response_cache import response_cache  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    """Run every test in an app context on empty tables."""
+    with app.app_context():
+        yield
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.execute(text("DELETE FROM blog_posts_fts"))
+        db.session.commit()
+        response_cache.invalidate()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user():
+    user = User(username='editor', email='editor@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
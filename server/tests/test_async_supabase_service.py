@@ -0,0 +1,18 @@
+from services.async_supabase_service import AsyncSupabaseService as service, run_sync
+
+
+def test_contact_round_trip():
+    inserted = run_sync(service.insert_contact({'id': 'c1', 'name': 'Ada', 'email': 'ada@example.com'}))
+    assert inserted[0]['id'] == 'c1'
+
+    updated = run_sync(service.update_contact('c1', {'name': 'Ada L.'}))
+    assert updated['name'] == 'Ada L.'
+    assert run_sync(service.get_contact_by_id('c1'))['name'] == 'Ada L.'
+
+    assert run_sync(service.delete_contact('c1')) is True
+    assert run_sync(service.get_contact_by_id('c1')) is None
+    assert run_sync(service.delete_contact('c1')) is False
+
+
+def test_update_of_unknown_contact_returns_none():
+    assert run_sync(service.update_contact('missing', {'name': 'x'})) is None
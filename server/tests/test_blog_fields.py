@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models.blog import BlogPost, BlogTag
+
+
+@pytest.fixture
+def post():
+    tag = BlogTag(name='Python', slug='python')
+    post = BlogPost(title='Fields', slug='fields', content='long body', excerpt='short',
+                    status='published', published_at=datetime.utcnow(), tags=[tag])
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_without_fields_the_full_post_is_listed(client, post):
+    listed = client.get('/api/blog/posts').get_json()['posts'][0]
+    assert listed == post.to_dict()
+
+
+def test_summary_leaves_out_the_body(client, post):
+    listed = client.get('/api/blog/posts', query_string={'fields': 'summary'}).get_json()['posts'][0]
+    assert 'content' not in listed
+    assert listed['excerpt'] == 'short'
+    assert [tag['slug'] for tag in listed['tags']] == ['python']
+
+
+def test_field_list_selects_fields(client, post):
+    listed = client.get('/api/blog/posts', query_string={'fields': 'title,slug'}).get_json()['posts'][0]
+    assert listed == {'title': 'Fields', 'slug': 'fields'}
+
+
+def test_unknown_field_is_rejected(client, post):
+    response = client.get('/api/blog/posts', query_string={'fields': 'title,password'})
+    assert response.status_code == 400
+    assert 'password' in response.get_json()['error']
+
+
+@contextmanager
+def recorded_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.parametrize('fields, tag_queries', [(None, 1), ('summary', 1), ('title,tags', 1), ('title,slug', 0)])
+def test_tags_are_queried_only_when_listed(client, post, fields, tag_queries):
+    with recorded_queries() as statements:
+        response = client.get('/api/blog/posts', query_string={'fields': fields} if fields else {})
+    assert response.status_code == 200
+    assert sum('blog_tags' in statement for statement in statements) == tag_queries
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.blog import BlogPost, BlogTag
+
+
+@pytest.fixture
+def posts():
+    """Seven published posts, three of them sharing one publish time, and a draft."""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    times = [base - timedelta(days=n) for n in range(4)] + [base - timedelta(days=5)] * 3
+    posts = [
+        BlogPost(title=f'Post {n}', slug=f'post-{n}', content='body', status='published', published_at=at)
+        for n, at in enumerate(times)
+    ]
+    posts.append(BlogPost(title='Draft', slug='draft', content='body', status='draft'))
+    db.session.add_all(posts)
+    db.session.commit()
+    return posts
+
+
+def walk(client, **params):
+    """Follow next_cursor from the first page to the last, returning the pages of ids."""
+    pages, cursor = [], ''
+    while cursor is not None:
+        response = client.get('/api/blog/posts', query_string={'cursor': cursor, **params})
+        assert response.status_code == 200
+        data = response.get_json()
+        pages.append([post['id'] for post in data['posts']])
+        cursor = data['next_cursor']
+    return pages
+
+
+def expected_order(posts, descending=True):
+    published = [post for post in posts if post.published_at is not None]
+    return [post.id for post in sorted(published, key=lambda p: (p.published_at, p.id), reverse=descending)]
+
+
+def test_cursor_walks_every_post_once_in_order(client, posts):
+    pages = walk(client, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [post_id for page in pages for post_id in page] == expected_order(posts)
+
+
+def test_cursor_breaks_publish_time_ties_by_id(client, posts):
+    # A page boundary falls inside the three posts published at the same time
+    pages = walk(client, limit=5)
+    assert [post_id for page in pages for post_id in page] == expected_order(posts)
+
+
+def test_cursor_ascending(client, posts):
+    pages = walk(client, limit=2, sort='date_asc')
+    assert [post_id for page in pages for post_id in page] == expected_order(posts, descending=False)
+
+
+def test_exact_multiple_of_limit_has_no_empty_last_page(client, posts):
+    pages = walk(client, limit=7)
+    assert len(pages) == 1 and len(pages[0]) == 7
+
+
+def test_cursor_mode_skips_the_count(client, posts):
+    data = client.get('/api/blog/posts', query_string={'cursor': '', 'limit': 2}).get_json()
+    assert 'total' not in data
+    assert data['limit'] == 2
+
+
+def test_invalid_cursor_is_rejected(client, posts):
+    response = client.get('/api/blog/posts', query_string={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+
+
+def test_cursor_rejects_relevance_sort(client, posts):
+    response = client.get('/api/blog/posts', query_string={'cursor': '', 'sort': 'relevance'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', 'ten'])
+def test_limit_below_one_is_rejected(client, posts, limit):
+    for params in ({'cursor': ''}, {'page': 1}):
+        response = client.get('/api/blog/posts', query_string={'limit': limit, **params})
+        assert response.status_code == 400
+
+
+def test_limit_is_capped(client, posts):
+    data = client.get('/api/blog/posts', query_string={'cursor': '', 'limit': 100000}).get_json()
+    assert data['limit'] == 100
+
+
+def test_tag_filter_lists_posts_once(client, posts):
+    first, second = BlogTag(name='One', slug='one'), BlogTag(name='Two', slug='two')
+    posts[0].tags.extend([first, second])
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    pages = walk(client, tags=f'{first.id},{second.id}')
+    assert pages == [[posts[0].id]]
+
+
+def test_page_mode_is_unchanged(client, posts):
+    data = client.get('/api/blog/posts', query_string={'page': 2, 'limit': 3}).get_json()
+    assert data['total'] == 8
+    assert data['page'] == 2
+    assert len(data['posts']) == 3
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.blog import BlogPost
+from services.response_cache import response_cache
+from services.search_service import index_post, rebuild_search_index
+
+
+def make_post(title, content, days_ago=0, status='published'):
+    post = BlogPost(
+        title=title,
+        slug=title.lower().replace(' ', '-'),
+        content=content,
+        status=status,
+        published_at=datetime.utcnow() - timedelta(days=days_ago) if status == 'published' else None
+    )
+    db.session.add(post)
+    db.session.flush()
+    index_post(post)
+    db.session.commit()
+    return post
+
+
+@pytest.fixture
+def posts():
+    return [
+        make_post('Scaling Flask workers', '<p>Gunicorn and <strong>threads</strong></p>', days_ago=2),
+        make_post('Postgres indexes', 'Btree and GIN indexes for search', days_ago=1),
+        make_post('Team offsite', 'We went hiking, no flask in sight', days_ago=0),
+    ]
+
+
+def search(client, term, **params):
+    response = client.get('/api/blog/posts', query_string={'search': term, **params})
+    assert response.status_code == 200
+    return [post['title'] for post in response.get_json()['posts']]
+
+
+def test_search_matches_title_and_body(client, posts):
+    assert set(search(client, 'flask')) == {'Scaling Flask workers', 'Team offsite'}
+    assert search(client, 'gin') == ['Postgres indexes']
+
+
+def test_last_term_is_a_prefix(client, posts):
+    assert search(client, 'post') == ['Postgres indexes']
+    assert search(client, 'scaling work') == ['Scaling Flask workers']
+
+
+def test_markup_is_not_indexed(client, posts):
+    assert search(client, 'threads') == ['Scaling Flask workers']
+    assert search(client, 'strong') == []
+
+
+def test_relevance_ranks_title_matches_first(client, posts):
+    assert search(client, 'flask', sort='relevance') == ['Scaling Flask workers', 'Team offsite']
+
+
+def test_punctuation_cannot_break_the_query(client, posts):
+    assert search(client, '"flask* (') == ['Team offsite', 'Scaling Flask workers']
+
+
+def test_rebuild_indexes_existing_posts(client):
+    post = BlogPost(title='Unindexed', slug='unindexed', content='legacy row', status='published',
+                    published_at=datetime.utcnow())
+    db.session.add(post)
+    db.session.commit()
+    assert search(client, 'legacy') == []
+
+    assert rebuild_search_index() == 1
+    response_cache.invalidate()
+    assert search(client, 'legacy') == ['Unindexed']
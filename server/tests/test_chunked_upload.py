@@ -0,0 +1,164 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.upload import ChunkedUpload
+from services import chunked_upload
+from services.job_queue import work
+from services.supabase_clients import fake_backend
+
+PART_SIZE = 1000
+
+
+@pytest.fixture(autouse=True)
+def small_parts(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'CHUNKED_UPLOAD_PART_SIZE', PART_SIZE)
+
+
+def start(client, auth_headers, size, filename='clip.mp4'):
+    return client.post('/api/uploads/multipart', json={
+        'filename': filename, 'size': size, 'content_type': 'video/mp4'
+    }, headers=auth_headers)
+
+
+def put_part(client, auth_headers, upload_id, part_number, data, headers=None):
+    return client.put(f'/api/uploads/multipart/{upload_id}/parts/{part_number}', data=data,
+                      headers={**auth_headers, **(headers or {})})
+
+
+def send_all(client, auth_headers, data):
+    upload_id = start(client, auth_headers, len(data)).get_json()['upload_id']
+    parts = [data[start:start + PART_SIZE] for start in range(0, len(data), PART_SIZE)]
+    # Any order works
+    for part_number in reversed(range(1, len(parts) + 1)):
+        assert put_part(client, auth_headers, upload_id, part_number, parts[part_number - 1]).status_code == 200
+    return upload_id
+
+
+def stored(path):
+    return fake_backend().download('uploads', path)
+
+
+def exists(path):
+    return os.path.exists(fake_backend().object_path('uploads', path))
+
+
+def test_initiate_validates_name_and_size(app, client, auth_headers):
+    assert start(client, auth_headers, 100, filename='run.exe').status_code == 400
+    assert start(client, auth_headers, 0).status_code == 400
+    assert start(client, auth_headers, app.config['CHUNKED_UPLOAD_MAX_SIZE'] + 1).status_code == 413
+
+    body = start(client, auth_headers, 3500).get_json()
+    assert (body['part_size'], body['part_count'], body['offset']) == (PART_SIZE, 4, 0)
+
+
+def test_parts_are_validated(client, auth_headers):
+    upload_id = start(client, auth_headers, 3500).get_json()['upload_id']
+
+    assert put_part(client, auth_headers, upload_id, 0, b'x' * PART_SIZE).status_code == 400
+    assert put_part(client, auth_headers, upload_id, 5, b'x' * PART_SIZE).status_code == 400
+    # Every part but the last has exactly part_size bytes, the last the remainder
+    assert put_part(client, auth_headers, upload_id, 1, b'x' * 999).status_code == 400
+    assert put_part(client, auth_headers, upload_id, 4, b'x' * PART_SIZE).status_code == 400
+    assert put_part(client, auth_headers, upload_id, 4, b'x' * 500).status_code == 200
+
+    wrong_digest = {'X-Content-SHA256': hashlib.sha256(b'other').hexdigest()}
+    response = put_part(client, auth_headers, upload_id, 2, b'y' * PART_SIZE, headers=wrong_digest)
+    assert response.status_code == 400
+    assert put_part(client, auth_headers, upload_id, 2, b'y' * PART_SIZE, headers={
+        'X-Content-SHA256': 'zz'
+    }).status_code == 400
+
+    state = client.get(f'/api/uploads/multipart/{upload_id}', headers=auth_headers).get_json()
+    assert state['parts_received'] == [4]
+    assert state['missing_parts'] == [1, 2, 3]
+
+
+def test_offset_tracks_the_parts_received_from_the_start(client, auth_headers):
+    upload_id = start(client, auth_headers, 3500).get_json()['upload_id']
+    put_part(client, auth_headers, upload_id, 2, b'b' * PART_SIZE)
+    response = client.get(f'/api/uploads/multipart/{upload_id}', headers=auth_headers)
+    assert response.headers['Upload-Offset'] == '0'
+
+    response = put_part(client, auth_headers, upload_id, 1, b'a' * PART_SIZE)
+    assert response.get_json()['offset'] == 2 * PART_SIZE
+    assert response.headers['Upload-Offset'] == str(2 * PART_SIZE)
+
+
+def test_complete_requires_every_part(client, auth_headers):
+    upload_id = start(client, auth_headers, 2500).get_json()['upload_id']
+    put_part(client, auth_headers, upload_id, 1, b'a' * PART_SIZE)
+    response = client.post(f'/api/uploads/multipart/{upload_id}/complete', headers=auth_headers)
+    assert response.status_code == 409
+    assert 'Missing parts: 2, 3' in response.get_json()['error']
+
+
+def test_parts_are_assembled_by_the_worker(client, auth_headers, monkeypatch):
+    touches = []
+    monkeypatch.setattr(chunked_upload, 'touch_job', lambda: touches.append(1))
+    data = os.urandom(3500)
+    upload_id = send_all(client, auth_headers, data)
+
+    response = client.post(f'/api/uploads/multipart/{upload_id}/complete', headers=auth_headers)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'assembling'
+    assert work(burst=True) == 1
+
+    state = client.get(f'/api/uploads/multipart/{upload_id}', headers=auth_headers).get_json()
+    assert state['status'] == 'completed'
+    upload = db.session.get(ChunkedUpload, upload_id)
+    assert stored(upload.object_path) == data
+    assert not any(exists(chunked_upload.part_path(upload, n)) for n in range(1, 5))
+    # The job's lock was refreshed once per part
+    assert len(touches) == 4
+
+    # Completing again is a no-op
+    assert client.post(f'/api/uploads/multipart/{upload_id}/complete', headers=auth_headers).status_code == 200
+
+
+def test_assembly_that_runs_out_of_attempts_is_marked_failed(app, client, auth_headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_MAX_ATTEMPTS', 1)
+    data = os.urandom(2500)
+    upload_id = send_all(client, auth_headers, data)
+    upload = db.session.get(ChunkedUpload, upload_id)
+    part = chunked_upload.part_path(upload, 2)
+    saved = stored(part)
+    fake_backend().remove('uploads', [part])
+
+    client.post(f'/api/uploads/multipart/{upload_id}/complete', headers=auth_headers)
+    work(burst=True)
+    state = client.get(f'/api/uploads/multipart/{upload_id}', headers=auth_headers).get_json()
+    assert state['status'] == 'failed'
+
+    # Completing again queues a fresh assembly
+    fake_backend().upload('uploads', part, saved)
+    response = client.post(f'/api/uploads/multipart/{upload_id}/complete', headers=auth_headers)
+    assert response.status_code == 202
+    work(burst=True)
+    db.session.expire_all()
+    upload = db.session.get(ChunkedUpload, upload_id)
+    assert upload.status == 'completed'
+    assert stored(upload.object_path) == data
+
+
+def test_purge_counts_only_removed_uploads(client, auth_headers, monkeypatch):
+    ids = [send_all(client, auth_headers, os.urandom(1500)) for _ in range(3)]
+    uploads = [db.session.get(ChunkedUpload, upload_id) for upload_id in ids]
+    for upload, status in zip(uploads, ('uploading', 'failed', 'aborted')):
+        upload.status = status
+        upload.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+
+    remove_parts = chunked_upload._remove_parts
+
+    def flaky_remove_parts(bucket, upload):
+        if upload.id == ids[2]:
+            raise RuntimeError('storage unavailable')
+        remove_parts(bucket, upload)
+
+    monkeypatch.setattr(chunked_upload, '_remove_parts', flaky_remove_parts)
+    assert chunked_upload.purge_expired_uploads() == 2
+    assert [upload.id for upload in ChunkedUpload.query] == [ids[2]]
@@ -0,0 +1,90 @@
+import io
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from extensions import db
+from models.upload import DirectUpload
+from services.direct_upload import SIGNED_UPLOAD_URL_LIFETIME, purge_expired_direct_uploads, sniff_media_types
+from services.supabase_clients import fake_backend
+
+
+def png_bytes():
+    out = io.BytesIO()
+    Image.new('RGB', (8, 8), (0, 0, 255)).save(out, 'PNG')
+    return out.getvalue()
+
+
+def start(client, auth_headers, filename='photo.png'):
+    response = client.post('/api/uploads/direct', json={'filename': filename}, headers=auth_headers)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def browser_upload(upload, data):
+    fake_backend().upload_to_signed_url('uploads', upload['path'], upload['token'], data,
+                                        {'x-upsert': 'true'})
+
+
+def complete(client, auth_headers, upload):
+    return client.post(f"/api/uploads/direct/{upload['upload_id']}/complete", headers=auth_headers)
+
+
+def exists(path):
+    try:
+        fake_backend().info('uploads', path)
+        return True
+    except Exception:
+        return False
+
+
+def test_completed_upload_is_recorded(client, auth_headers):
+    upload = start(client, auth_headers)
+    assert complete(client, auth_headers, upload).status_code == 409
+
+    browser_upload(upload, png_bytes())
+    response = complete(client, auth_headers, upload)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'completed'
+    assert body['content_type'] == 'image/png'
+
+
+def test_content_must_match_the_declared_type(client, auth_headers):
+    upload = start(client, auth_headers)
+    browser_upload(upload, b'<html><script>alert(1)</script></html>')
+
+    response = complete(client, auth_headers, upload)
+    assert response.status_code == 415
+    assert not exists(upload['path'])
+    assert db.session.get(DirectUpload, upload['upload_id']).status == 'rejected'
+
+
+def test_sniffing_recognises_the_accepted_formats():
+    assert sniff_media_types(png_bytes()) == {'image'}
+    assert sniff_media_types(b'\x00\x00\x00\x18ftypmp42') == {'video', 'audio'}
+    assert sniff_media_types(b'\x00\x00\x00\x18ftypM4A ') == {'audio'}
+    assert sniff_media_types(b'\x1a\x45\xdf\xa3\x01') == {'video', 'audio'}
+    assert sniff_media_types(b'ID3\x04\x00') == {'audio'}
+    assert sniff_media_types(b'%PDF-1.7') == set()
+
+
+def test_purge_removes_abandoned_and_refused_uploads_once_their_url_expired(client, auth_headers):
+    pending, rejected, recent = (start(client, auth_headers) for _ in range(3))
+    browser_upload(pending, png_bytes())
+    browser_upload(rejected, b'not an image')
+    assert complete(client, auth_headers, rejected).status_code == 415
+    # The signed URL still works after the rejection
+    browser_upload(rejected, b'not an image, again')
+    browser_upload(recent, png_bytes())
+
+    old = datetime.utcnow() - SIGNED_UPLOAD_URL_LIFETIME - timedelta(minutes=1)
+    for upload in (pending, rejected):
+        db.session.get(DirectUpload, upload['upload_id']).created_at = old
+    db.session.commit()
+
+    assert purge_expired_direct_uploads() == 2
+    assert not exists(pending['path'])
+    assert not exists(rejected['path'])
+    assert exists(recent['path'])
+    assert [upload.id for upload in DirectUpload.query] == [recent['upload_id']]
@@ -0,0 +1,32 @@
+from services.email_service import newsletter_message_builder
+from services.email_templates import NEWSLETTER_TEMPLATE, PrerenderedEmail
+
+
+def test_recipient_fields_are_escaped():
+    email = PrerenderedEmail(NEWSLETTER_TEMPLATE, ['unsubscribe_url'], title='Post', excerpt='', post_url='/p')
+    body = email.render(unsubscribe_url='/u?email=a@b.c&x="<y>"')
+    assert '/u?email=a@b.c&amp;x=&#34;&lt;y&gt;&#34;' in body
+
+
+def test_shared_values_are_escaped_once():
+    email = PrerenderedEmail(NEWSLETTER_TEMPLATE, ['unsubscribe_url'], title='<b>Tom & Jerry</b>', excerpt='', post_url='/p')
+    body = email.render(unsubscribe_url='/u')
+    assert '&lt;b&gt;Tom &amp; Jerry&lt;/b&gt;' in body
+
+
+def test_nul_in_shared_values_does_not_open_a_slot():
+    email = PrerenderedEmail(NEWSLETTER_TEMPLATE, ['unsubscribe_url'],
+                             title='Broken\x00title\x00', excerpt='\x00unsubscribe_url\x00', post_url='/p')
+    body = email.render(unsubscribe_url='/u')
+    assert 'Brokentitle' in body
+    assert '\x00' not in body
+    assert body.count('/u"') == 1
+
+
+def test_newsletter_builder_renders_each_recipient():
+    build = newsletter_message_builder({'title': 'Hello\x00', 'slug': 'hello', 'content': '<p>Body</p>'})
+    message = build('reader@example.com')
+    assert message['To'] == 'reader@example.com'
+    body = message.get_payload(decode=True).decode()
+    assert 'reader%40example.com' in body
+    assert '<p>Body' not in body
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import extensions
+from extensions import db
+from models.blog import BlogSubscriber
+from models.contact import Contact
+from services.supabase_service import SupabaseService
+
+
+@pytest.fixture
+def applications():
+    table = extensions.supabase_client.table('career_applications')
+    table.delete().execute()
+    now = datetime.utcnow()
+    rows = [
+        {'id': n, 'application_id': f'app-{n}', 'full_name': f'Applicant {n}', 'email': f'a{n}@example.com',
+         'contact_number': '+15550100', 'status': 'pending' if n % 2 else 'reviewing',
+         'created_at': (now - timedelta(minutes=n)).isoformat()}
+        for n in range(1, 6)
+    ]
+    table.insert(rows).execute()
+    yield rows
+    table.delete().execute()
+
+
+def read_csv(response):
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_contacts_export_as_csv_and_ndjson(client, auth_headers):
+    db.session.add_all([
+        Contact(name='Ada', email='ada@example.com', subject='Hello', message='First',
+                created_at=datetime(2024, 1, 1)),
+        Contact(name='Grace', email='grace@example.com', subject='Hi', message='Second',
+                created_at=datetime(2024, 1, 2))
+    ])
+    db.session.commit()
+
+    response = client.get('/api/contacts/export', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="contacts.csv"'
+    rows = read_csv(response)
+    # Newest first, like the list view
+    assert [row['name'] for row in rows] == ['Grace', 'Ada']
+    assert rows[0]['created_at'] == '2024-01-02T00:00:00'
+
+    response = client.get('/api/contacts/export?format=ndjson', headers=auth_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    assert [row['email'] for row in read_ndjson(response)] == ['grace@example.com', 'ada@example.com']
+
+
+def test_subscribers_export(client, auth_headers):
+    db.session.add_all([BlogSubscriber(email='one@example.com'),
+                        BlogSubscriber(email='two@example.com', is_active=False)])
+    db.session.commit()
+
+    rows = read_csv(client.get('/api/blog/newsletter/subscribers/export', headers=auth_headers))
+    assert [(row['email'], row['is_active']) for row in rows] == [('one@example.com', 'True'),
+                                                                  ('two@example.com', 'False')]
+    assert list(rows[0]) == ['id', 'email', 'is_active', 'subscribed_at']
+
+    rows = read_ndjson(client.get('/api/blog/newsletter/subscribers/export?format=ndjson', headers=auth_headers))
+    assert [row['is_active'] for row in rows] == [True, False]
+
+
+def test_applications_export_pages_through_supabase_and_filters(client, auth_headers, applications, monkeypatch):
+    pages = []
+    paginate = SupabaseService.paginate.__func__
+
+    def small_pages(cls, client, table, **kwargs):
+        pages.append(kwargs['cursor'])
+        return paginate(cls, client, table, **{**kwargs, 'page_size': 2})
+
+    monkeypatch.setattr(SupabaseService, 'paginate', classmethod(small_pages))
+
+    rows = read_csv(client.get('/api/apply/export', headers=auth_headers))
+    assert [row['application_id'] for row in rows] == [f'app-{n}' for n in range(1, 6)]
+    assert len(pages) == 3
+
+    response = client.get('/api/apply/export?format=ndjson&status=reviewing', headers=auth_headers)
+    assert [row['application_id'] for row in read_ndjson(response)] == ['app-2', 'app-4']
+
+
+def test_export_is_streamed(client, auth_headers):
+    db.session.add_all(BlogSubscriber(email=f'reader{n}@example.com') for n in range(3000))
+    db.session.commit()
+
+    response = client.get('/api/blog/newsletter/subscribers/export', headers=auth_headers)
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    assert response.headers['X-Accel-Buffering'] == 'no'
+    chunks = list(response.response)
+    # The header goes out on its own, then the rows in several chunks
+    assert chunks[0] == b'id,email,is_active,subscribed_at\r\n'
+    assert len(chunks) > 2
+    assert len(list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))) == 3000
+
+
+def test_formula_cells_are_escaped_in_csv_only(client, auth_headers):
+    values = ['=HYPERLINK("http://evil.test","x")', '+cmd|/C calc!A0', '-2+3', '@SUM(A1)', '\tTab', '\rCR']
+    db.session.add_all(Contact(name=value, email='x@example.com', subject='s', message='m') for value in values)
+    db.session.commit()
+
+    rows = read_csv(client.get('/api/contacts/export', headers=auth_headers))
+    assert sorted(row['name'] for row in rows) == sorted("'" + value for value in values)
+
+    rows = read_ndjson(client.get('/api/contacts/export?format=ndjson', headers=auth_headers))
+    assert sorted(row['name'] for row in rows) == sorted(values)
+
+
+@pytest.mark.parametrize('url', ['/api/contacts/export', '/api/blog/newsletter/subscribers/export', '/api/apply/export'])
+def test_unknown_format_is_rejected(client, auth_headers, url):
+    response = client.get(f'{url}?format=xlsx', headers=auth_headers)
+    assert response.status_code == 400
+    assert 'csv, ndjson' in response.get_json()['error']
+    assert client.get(url).status_code == 401
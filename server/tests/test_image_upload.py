@@ -0,0 +1,117 @@
+import io
+import os
+
+from PIL import Image
+
+from services.fake_supabase import FakeBucket
+from services.supabase_clients import fake_backend
+
+
+def png_bytes(size=(640, 480), color=(200, 40, 40)):
+    out = io.BytesIO()
+    Image.new('RGB', size, color).save(out, 'PNG')
+    return out.getvalue()
+
+
+def upload(client, auth_headers, data, filename='photo.png', headers=None):
+    return client.post(
+        '/api/uploads/image',
+        data={'image': (io.BytesIO(data), filename)},
+        headers={**auth_headers, **(headers or {})},
+        content_type='multipart/form-data'
+    )
+
+
+def stored_objects(prefix='blog-uploads'):
+    root = os.path.join(fake_backend().storage_dir, 'uploads', prefix)
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), root)
+        for folder, _, names in os.walk(root) for name in names
+    )
+
+
+def test_image_is_stored_with_its_variants(client, auth_headers):
+    data = png_bytes()
+    response = upload(client, auth_headers, data)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['deduplicated'] is False
+    assert body['size'] == len(data)
+    assert (body['width'], body['height']) == (640, 480)
+    assert set(body['variants']) == {'480w', '640w'}
+    assert body['thumbnailUrl'].endswith('/thumb.webp')
+    digest = body['sha256']
+    assert f"{digest}_photo.png" in stored_objects()
+    with open(os.path.join(fake_backend().storage_dir, 'uploads', 'blog-uploads', f"{digest}_photo.png"), 'rb') as f:
+        assert f.read() == data
+
+
+def test_non_image_is_rejected_before_anything_is_stored(client, auth_headers, monkeypatch):
+    writes = []
+    upload_stream = FakeBucket.upload_stream
+
+    def recording_upload_stream(self, path, *args, **kwargs):
+        writes.append(path)
+        return upload_stream(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(FakeBucket, 'upload_stream', recording_upload_stream)
+
+    response = upload(client, auth_headers, b'not a png at all' * 100, filename='fake.png')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'File is not a valid image'
+
+    truncated = png_bytes()[:40]
+    assert upload(client, auth_headers, truncated).status_code == 400
+    assert writes == []
+
+
+def test_oversized_image_is_rejected(app, client, auth_headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_MAX_IMAGE_SIZE', 1000)
+    before = stored_objects()
+    response = upload(client, auth_headers, png_bytes(size=(2000, 2000), color=None) + os.urandom(5000))
+    assert response.status_code == 413
+    assert stored_objects() == before
+
+
+def test_disallowed_extension_and_missing_file(client, auth_headers):
+    assert upload(client, auth_headers, png_bytes(), filename='photo.exe').status_code == 400
+    response = client.post('/api/uploads/image', data={'other': 'x'}, headers=auth_headers,
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+
+
+def test_repeated_bytes_are_deduplicated(client, auth_headers, monkeypatch):
+    data = png_bytes(color=(10, 120, 200))
+    first = upload(client, auth_headers, data).get_json()
+
+    writes = []
+    monkeypatch.setattr(FakeBucket, 'upload_stream', lambda self, path, *args, **kwargs: writes.append(path))
+    response = upload(client, auth_headers, data, filename='copy.png')
+
+    assert response.status_code == 200
+    second = response.get_json()
+    assert second['deduplicated'] is True
+    assert second['imageUrl'] == first['imageUrl']
+    assert second['variants'] == first['variants']
+    assert writes == []
+
+
+def test_known_digest_header_skips_the_body(client, auth_headers):
+    first = upload(client, auth_headers, png_bytes(color=(0, 200, 0))).get_json()
+
+    response = client.post('/api/uploads/image', data=b'', headers={
+        **auth_headers, 'X-Content-SHA256': first['sha256'].upper(), 'Content-Type': 'application/octet-stream'
+    })
+    assert response.status_code == 200
+    assert response.get_json()['deduplicated'] is True
+    assert response.get_json()['imageUrl'] == first['imageUrl']
+
+
+def test_digest_header_is_checked_against_the_bytes(client, auth_headers):
+    response = upload(client, auth_headers, png_bytes(color=(1, 2, 3)), headers={'X-Content-SHA256': '0' * 64})
+    assert response.status_code == 400
+    assert 'does not match' in response.get_json()['error']
+
+    response = upload(client, auth_headers, png_bytes(), headers={'X-Content-SHA256': 'not-a-digest'})
+    assert response.status_code == 400
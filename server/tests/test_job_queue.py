@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.job import Job
+from services.job_queue import claim_next_job, enqueue, job_handler, run_job, touch_job, work
+
+calls = []
+
+
+@job_handler('test_record')
+def record(value):
+    calls.append(value)
+
+
+@job_handler('test_fail')
+def fail(message):
+    raise RuntimeError(message)
+
+
+@job_handler('test_heartbeat')
+def heartbeat():
+    calls.append(touch_job())
+
+
+@pytest.fixture(autouse=True)
+def reset_calls(app):
+    calls.clear()
+    app.config.update(JOB_RETRY_DELAY=30, JOB_LOCK_TIMEOUT=1800)
+
+
+def test_job_runs_with_its_payload(app):
+    job = enqueue('test_record', {'value': 42})
+    assert work(burst=True) == 1
+    assert calls == [42]
+    assert db.session.get(Job, job.id).status == 'succeeded'
+
+
+def test_future_jobs_are_not_claimed(app):
+    enqueue('test_record', {'value': 1}, run_at=datetime.utcnow() + timedelta(minutes=5))
+    assert claim_next_job() is None
+
+
+def test_failures_back_off_exponentially(app):
+    job = enqueue('test_fail', {'message': 'smtp down'}, max_attempts=3)
+    job_id = job.id
+    delays = []
+    for _ in range(2):
+        claimed = claim_next_job()
+        assert claimed.id == job_id
+        before = datetime.utcnow()
+        assert run_job(claimed) is False
+        job = db.session.get(Job, job_id)
+        assert job.status == 'queued'
+        assert job.last_error == 'smtp down'
+        assert job.locked_at is None
+        delays.append(round((job.run_at - before).total_seconds()))
+        # Make the retry due now
+        job.run_at = datetime.utcnow()
+        db.session.commit()
+    assert delays == [30, 60]
+
+
+def test_last_attempt_marks_the_job_failed(app):
+    job = enqueue('test_fail', {'message': 'boom'}, max_attempts=1)
+    run_job(claim_next_job())
+    job = db.session.get(Job, job.id)
+    assert job.status == 'failed'
+    assert job.attempts == 1
+    assert claim_next_job() is None
+
+
+def test_unknown_kind_fails(app):
+    job = enqueue('test_missing', max_attempts=1)
+    run_job(claim_next_job())
+    job = db.session.get(Job, job.id)
+    assert job.status == 'failed'
+    assert 'test_missing' in job.last_error
+
+
+def test_running_job_is_not_claimed_twice(app):
+    enqueue('test_record', {'value': 1})
+    assert claim_next_job() is not None
+    assert claim_next_job() is None
+
+
+def test_stale_lock_is_reclaimed(app):
+    job = enqueue('test_record', {'value': 1})
+    claimed = claim_next_job()
+    claimed.locked_at = datetime.utcnow() - timedelta(seconds=1801)
+    db.session.commit()
+
+    reclaimed = claim_next_job()
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+
+
+def test_touch_job_keeps_the_lock_fresh(app):
+    job = enqueue('test_record', {'value': 1})
+    claimed = claim_next_job()
+    claimed.locked_at = datetime.utcnow() - timedelta(seconds=1801)
+    db.session.commit()
+
+    assert touch_job(job.id) is True
+    assert claim_next_job() is None
+
+
+def test_touch_job_defaults_to_the_running_job(app):
+    job = enqueue('test_heartbeat')
+    assert work(burst=True) == 1
+    assert calls == [True]
+    assert db.session.get(Job, job.id).status == 'succeeded'
+    assert touch_job() is False
+
+
+def test_touch_job_reports_a_lost_lock(app):
+    job = enqueue('test_record', {'value': 1})
+    run_job(claim_next_job())
+    assert touch_job(job.id) is False
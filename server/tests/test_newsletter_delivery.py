@@ -0,0 +1,149 @@
+import smtplib
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+import pytest
+
+from benchmarks.smtp_sink import SMTPSink
+from services.newsletter_delivery import deliver
+from services.smtp_pool import SMTPPool, SMTPSettings
+
+
+def build_message(recipient):
+    message = EmailMessage()
+    message['From'] = 'news@example.com'
+    message['To'] = recipient
+    message['Subject'] = 'New post'
+    message.set_content('Hello')
+    return message
+
+
+@pytest.fixture
+def sink():
+    sink = SMTPSink().start()
+    yield sink
+    sink.stop()
+
+
+@pytest.fixture
+def smtp_pool(sink):
+    pool = SMTPPool(SMTPSettings('127.0.0.1', sink.port, 'user', 'secret', False), max_size=4)
+    yield pool
+    pool.close()
+
+
+class FlakyServer:
+    """Stands in for an smtplib.SMTP session, failing for chosen recipients."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.sent = []
+        self.resets = 0
+
+    def send_message(self, message):
+        error = self.errors.get(message['To'])
+        if error is not None:
+            raise error
+        self.sent.append(message['To'])
+
+    def rset(self):
+        self.resets += 1
+
+
+class FakePool:
+    def __init__(self, server):
+        self.server = server
+
+    @contextmanager
+    def connection(self):
+        yield self.server
+
+
+def test_every_recipient_is_delivered(sink, smtp_pool):
+    recipients = [f'reader{n}@example.com' for n in range(50)]
+    report = deliver(recipients, build_message, smtp_pool, concurrency=4, rate=1000)
+    assert report.sent == 50
+    assert report.failed == {}
+    assert sink.snapshot()['messages'] == 50
+    assert sink.snapshot()['connections'] <= 4
+
+
+def test_refused_recipients_are_recorded(sink, smtp_pool):
+    sink.fail_rate = 1.0
+    report = deliver(['a@example.com', 'b@example.com'], build_message, smtp_pool, concurrency=1, rate=1000)
+    assert report.sent == 0
+    assert set(report.failed) == {'a@example.com', 'b@example.com'}
+
+
+def test_unexpected_errors_do_not_stop_the_worker():
+    server = FlakyServer({'bad@example.com': UnicodeEncodeError('ascii', 'é', 0, 1, 'ordinal not in range')})
+    recipients = ['first@example.com', 'bad@example.com', 'last@example.com']
+    report = deliver(recipients, build_message, FakePool(server), concurrency=1, rate=1000)
+
+    assert server.sent == ['first@example.com', 'last@example.com']
+    assert report.sent == 2
+    assert list(report.failed) == ['bad@example.com']
+    assert server.resets == 1
+
+
+def test_message_build_errors_are_recorded():
+    def build(recipient):
+        if recipient == 'bad@example.com':
+            raise ValueError('bad header')
+        return build_message(recipient)
+
+    server = FlakyServer({})
+    report = deliver(['bad@example.com', 'good@example.com'], build, FakePool(server), concurrency=1, rate=1000)
+    assert server.sent == ['good@example.com']
+    assert report.failed == {'bad@example.com': 'bad header'}
+
+
+def test_unsupported_addresses_keep_the_connection():
+    server = FlakyServer({'ünicode@example.com': smtplib.SMTPNotSupportedError('SMTPUTF8 not supported')})
+    report = deliver(['ünicode@example.com', 'next@example.com'], build_message, FakePool(server), concurrency=1, rate=1000)
+    assert server.sent == ['next@example.com']
+    assert list(report.failed) == ['ünicode@example.com']
+
+
+def test_refusals_are_permanent_and_drops_temporary(sink, smtp_pool):
+    sink.fail_rate = 1.0
+    report = deliver(['a@example.com'], build_message, smtp_pool, concurrency=1, rate=1000)
+    assert report.temporary == set()
+
+    sink.fail_rate, sink.drop_rate = 0.0, 1.0
+    report = deliver(['b@example.com'], build_message, smtp_pool, concurrency=1, rate=1000)
+    assert report.sent == 0
+    assert report.temporary == {'b@example.com'}
+
+
+def test_connection_dropped_while_idle_is_replaced_after_the_health_check(sink):
+    # health_check_after=0 probes every reused connection with NOOP
+    pool = SMTPPool(SMTPSettings('127.0.0.1', sink.port, 'user', 'secret', False), max_size=1, health_check_after=0)
+    pool.send_message(build_message('first@example.com'))
+    assert sink.drop_connections() == 1
+
+    with pool.connection() as server:
+        server.send_message(build_message('second@example.com'))
+    assert pool.connections_opened == 2
+    assert sink.snapshot()['messages'] == 2
+    pool.close()
+
+
+def test_connection_dropped_between_checks_is_reconnected_on_send(sink):
+    pool = SMTPPool(SMTPSettings('127.0.0.1', sink.port, 'user', 'secret', False), max_size=1)
+    pool.send_message(build_message('first@example.com'))
+    sink.drop_connections()
+
+    # Reused without a NOOP, the send finds the connection gone and retries on a new one
+    pool.send_message(build_message('second@example.com'))
+    assert pool.connections_opened == 2
+    assert sink.snapshot()['messages'] == 2
+
+    sink.drop_connections()
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        pool.send_message(build_message('third@example.com'), retries=0)
+    # The dead connection was not put back, the next caller gets a fresh one
+    with pool.connection() as server:
+        assert server.noop()[0] == 250
+    assert pool.connections_opened == 3
+    pool.close()
@@ -0,0 +1,163 @@
+import smtplib
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models.blog import BlogPost, BlogSubscriber, NewsletterCampaign
+from models.job import Job
+from services import blog_jobs
+from services.blog_jobs import SEND_POST_NEWSLETTER, send_post_newsletter
+from services.job_queue import enqueue, work
+from services.newsletter_delivery import DeliveryReport
+
+
+class ScriptedDelivery:
+    """Replaces deliver_newsletter, failing recipients with the error given for them."""
+
+    def __init__(self):
+        self.errors = {}
+        self.outage_from_chunk = None
+        self.chunks = 0
+        self.sent = []
+
+    def __call__(self, recipients, build_message, smtp_pool):
+        self.chunks += 1
+        outage = self.outage_from_chunk is not None and self.chunks >= self.outage_from_chunk
+        report = DeliveryReport()
+        for recipient in recipients:
+            build_message(recipient)
+            if outage:
+                report.record_failure(recipient, ConnectionRefusedError('connection refused'))
+            elif recipient in self.errors:
+                report.record_failure(recipient, self.errors[recipient])
+            else:
+                self.sent.append(recipient)
+                report.record_success()
+        return report
+
+
+@pytest.fixture
+def delivery(app, monkeypatch):
+    delivery = ScriptedDelivery()
+    monkeypatch.setattr(blog_jobs, 'deliver_newsletter', delivery)
+    monkeypatch.setattr(blog_jobs, 'get_smtp_pool', lambda: object())
+    app.config['NEWSLETTER_CHUNK_SIZE'] = 2
+    yield delivery
+    app.config['NEWSLETTER_CHUNK_SIZE'] = 500
+
+
+@pytest.fixture
+def post():
+    post = BlogPost(title='Launch', slug='launch', content='body', status='published', published_at=datetime.utcnow())
+    db.session.add(post)
+    db.session.add_all(BlogSubscriber(email=f'reader{n}@example.com') for n in range(5))
+    db.session.add(BlogSubscriber(email='gone@example.com', is_active=False))
+    db.session.commit()
+    return post
+
+
+def refused(recipient, code=550):
+    return smtplib.SMTPRecipientsRefused({recipient: (code, b'No such user here')})
+
+
+def campaign(post):
+    return NewsletterCampaign.query.filter_by(post_id=post.id).one()
+
+
+def test_every_active_subscriber_gets_one_email(delivery, post):
+    send_post_newsletter(post.id)
+    assert delivery.sent == [f'reader{n}@example.com' for n in range(5)]
+    assert campaign(post).status == 'completed'
+    assert campaign(post).sent_count == 5
+
+
+def test_permanent_refusals_advance_the_checkpoint(delivery, post):
+    # The last chunk holds only reader4, whose mailbox does not exist
+    delivery.errors['reader4@example.com'] = refused('reader4@example.com')
+    send_post_newsletter(post.id)
+
+    assert campaign(post).status == 'completed'
+    assert (campaign(post).sent_count, campaign(post).failed_count) == (4, 1)
+
+
+def test_a_chunk_of_only_refusals_completes(delivery, post):
+    for n in (2, 3):
+        delivery.errors[f'reader{n}@example.com'] = refused(f'reader{n}@example.com')
+    send_post_newsletter(post.id)
+    assert campaign(post).status == 'completed'
+    assert campaign(post).failed_count == 2
+
+
+def test_temporary_refusals_retry_the_chunk(delivery, post):
+    for n in (2, 3):
+        delivery.errors[f'reader{n}@example.com'] = refused(f'reader{n}@example.com', code=450)
+    with pytest.raises(RuntimeError):
+        send_post_newsletter(post.id)
+    assert campaign(post).last_subscriber_id == 2
+    assert campaign(post).status == 'sending'
+
+
+def test_temporary_refusals_in_a_partly_sent_chunk_are_resent(delivery, post):
+    # reader2 and reader3 share a chunk, only reader2 is turned away for now
+    delivery.errors['reader2@example.com'] = refused('reader2@example.com', code=450)
+    send_post_newsletter(post.id)
+
+    assert campaign(post).status == 'completed'
+    assert (campaign(post).sent_count, campaign(post).failed_count) == (4, 0)
+    resend = Job.query.filter_by(kind=SEND_POST_NEWSLETTER).one()
+    assert resend.payload['subscriber_ids'] == [BlogSubscriber.query.filter_by(email='reader2@example.com').one().id]
+    assert resend.run_at > datetime.utcnow()
+
+    # Still refused: the resend backs off without counting a failure
+    resend.run_at = datetime.utcnow()
+    db.session.commit()
+    work(burst=True)
+    resend = db.session.get(Job, resend.id)
+    assert resend.status == 'queued'
+    assert campaign(post).failed_count == 0
+
+    del delivery.errors['reader2@example.com']
+    resend.run_at = datetime.utcnow()
+    db.session.commit()
+    work(burst=True)
+    assert db.session.get(Job, resend.id).status == 'succeeded'
+    assert sorted(delivery.sent) == [f'reader{n}@example.com' for n in range(5)]
+    assert (campaign(post).sent_count, campaign(post).failed_count) == (5, 0)
+
+
+def test_resend_that_runs_out_of_attempts_counts_the_failures(app, delivery, post, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_MAX_ATTEMPTS', 1)
+    delivery.errors['reader2@example.com'] = refused('reader2@example.com', code=450)
+    send_post_newsletter(post.id)
+
+    resend = Job.query.filter_by(kind=SEND_POST_NEWSLETTER).one()
+    resend.run_at = datetime.utcnow()
+    db.session.commit()
+    work(burst=True)
+    assert db.session.get(Job, resend.id).status == 'failed'
+    assert (campaign(post).sent_count, campaign(post).failed_count) == (4, 1)
+
+
+def test_outage_keeps_the_checkpoint_and_the_retry_resumes(delivery, post):
+    job = enqueue(SEND_POST_NEWSLETTER, {'post_id': post.id})
+    delivery.outage_from_chunk = 2
+    work(burst=True)
+
+    job = db.session.get(Job, job.id)
+    assert job.status == 'queued'
+    assert campaign(post).last_subscriber_id == 2
+
+    delivery.outage_from_chunk = None
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+    work(burst=True)
+    assert db.session.get(Job, job.id).status == 'succeeded'
+    assert delivery.sent == [f'reader{n}@example.com' for n in range(5)]
+
+
+def test_completed_campaign_is_not_resent(delivery, post):
+    send_post_newsletter(post.id)
+    delivery.sent.clear()
+    send_post_newsletter(post.id)
+    assert delivery.sent == []
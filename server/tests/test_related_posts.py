@@ -0,0 +1,59 @@
+import uuid
+
+from models.blog import BlogTag
+from models.job import Job
+from extensions import db
+from services.blog_jobs import UPDATE_RELATED_POSTS
+from services.job_queue import work
+from services.related_posts import rebuild_related_index
+
+
+def publish(client, auth_headers, slug, content, tags=()):
+    response = client.post('/api/blog/posts', headers=auth_headers, json={
+        'title': slug.replace('-', ' ').title(), 'slug': slug, 'content': content,
+        'status': 'published', 'tags': list(tags)
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def related(client, post_id):
+    response = client.get(f'/api/blog/posts/{post_id}/related', query_string={'limit': 5})
+    assert response.status_code == 200
+    return [post['id'] for post in response.get_json()]
+
+
+def test_publishing_queues_the_index_update(client, auth_headers):
+    post_id = publish(client, auth_headers, 'flask-workers', 'gunicorn workers and threads')
+    jobs = Job.query.filter_by(kind=UPDATE_RELATED_POSTS).all()
+    assert [job.payload for job in jobs] == [{'post_id': post_id}]
+
+
+def test_worker_adds_new_posts_to_both_sides(client, auth_headers):
+    tag = BlogTag(name='Python', slug='python')
+    db.session.add(tag)
+    db.session.commit()
+    tag_id = tag.id
+
+    flask_id = publish(client, auth_headers, 'flask-workers', 'gunicorn workers threads python flask', [tag_id])
+    offsite_id = publish(client, auth_headers, 'team-offsite', 'hiking lake picnic weekend')
+    work(burst=True)
+    asyncio_id = publish(client, auth_headers, 'python-asyncio', 'python asyncio threads workers flask', [tag_id])
+    work(burst=True)
+
+    assert related(client, asyncio_id) == [flask_id]
+    assert related(client, flask_id) == [asyncio_id]
+    assert related(client, offsite_id) == []
+
+
+def test_rebuild_matches_incremental_neighbours(client, auth_headers):
+    first = publish(client, auth_headers, 'sql-indexes', 'btree gin index postgres query planner')
+    second = publish(client, auth_headers, 'sql-planner', 'postgres query planner explain index')
+    work(burst=True)
+    assert rebuild_related_index() == 2
+    assert related(client, first) == [second]
+
+
+def test_unknown_post_is_404(client):
+    response = client.get(f'/api/blog/posts/{uuid.uuid4()}/related')
+    assert response.status_code == 404
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.http import http_date
+
+from extensions import db
+from models.blog import BlogPost
+from services.response_cache import response_cache
+from services.view_counter import view_counter
+
+
+@pytest.fixture
+def post():
+    post = BlogPost(title='Cached', slug='cached', content='body', status='published',
+                    published_at=datetime.utcnow())
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_response_carries_validators(client, post):
+    response = client.get('/api/blog/posts/cached')
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    assert 'Last-Modified' not in response.headers
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+
+def test_matching_etag_gets_304(client, post):
+    etag = client.get('/api/blog/posts/cached').headers['ETag']
+    response = client.get('/api/blog/posts/cached', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_stale_etag_gets_the_body(client, post):
+    response = client.get('/api/blog/posts/cached', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.get_json()['slug'] == 'cached'
+
+
+def test_flushed_views_are_not_hidden_behind_a_304(client, post, monkeypatch):
+    first = client.get('/api/blog/posts/cached')
+    view_counter.increment(post.id)
+    view_counter.flush()
+    db.session.expire_all()
+    # The flush does not invalidate the cache, the entry is refreshed once its TTL runs out
+    monkeypatch.setattr(response_cache, 'ttl', -1)
+
+    response = client.get('/api/blog/posts/cached', headers={
+        'If-Modified-Since': http_date(datetime.utcnow() + timedelta(hours=1))
+    })
+    assert response.status_code == 200
+    assert response.get_json()['view_count'] == 1
+    assert response.headers['ETag'] != first.headers['ETag']
+
+
+def test_query_parameter_order_shares_an_entry(client, post):
+    first = client.get('/api/blog/posts?limit=5&page=1').headers['ETag']
+    second = client.get('/api/blog/posts?page=1&limit=5', headers={'If-None-Match': first})
+    assert second.status_code == 304
+
+
+def test_creating_a_post_changes_the_etag(client, post, auth_headers):
+    etag = client.get('/api/blog/posts').headers['ETag']
+    created = client.post('/api/blog/posts', headers=auth_headers,
+                          json={'title': 'New', 'slug': 'new', 'content': 'fresh', 'status': 'draft'})
+    assert created.status_code == 201
+
+    response = client.get('/api/blog/posts', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_errors_are_not_cached(client):
+    assert client.get('/api/blog/posts/missing').status_code != 200
+    post = BlogPost(title='Late', slug='missing', content='body', status='published',
+                    published_at=datetime.utcnow())
+    db.session.add(post)
+    db.session.commit()
+    assert client.get('/api/blog/posts/missing').status_code == 200
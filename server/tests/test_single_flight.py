@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight, invalidates, supabase_reads
+
+THREADS = 8
+
+
+def run_concurrently(reads, func):
+    """Call reads.do from THREADS threads at once; func returns once all but the first have joined."""
+    barrier = threading.Barrier(THREADS)
+    results, errors = [], []
+
+    def read():
+        deadline = time.monotonic() + 5
+        while reads.coalesced < THREADS - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return func()
+
+    def caller():
+        barrier.wait()
+        try:
+            results.append(reads.do(('contacts', 'get'), read))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_reads_share_one_call():
+    reads = SingleFlight()
+    calls = []
+
+    def read():
+        calls.append(1)
+        return {'rows': [1, 2]}
+
+    results, errors = run_concurrently(reads, read)
+    assert errors == []
+    assert len(calls) == 1
+    assert results == [{'rows': [1, 2]}] * THREADS
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == THREADS
+    assert (reads.misses, reads.coalesced) == (1, THREADS - 1)
+
+
+def test_an_error_reaches_every_waiter():
+    reads = SingleFlight()
+    calls = []
+
+    def read():
+        calls.append(1)
+        raise RuntimeError('timed out')
+
+    results, errors = run_concurrently(reads, read)
+    assert results == []
+    assert len(calls) == 1
+    assert len(errors) == THREADS
+    assert all(isinstance(e, RuntimeError) and str(e) == 'timed out' for e in errors)
+    # Nothing is left in flight or cached, the next call runs again
+    assert reads.stats()['in_flight'] == 0
+    with pytest.raises(RuntimeError):
+        reads.do(('contacts', 'get'), read)
+    assert len(calls) == 2
+
+
+def test_ttl_result_is_dropped_on_invalidate():
+    reads = SingleFlight()
+    calls = []
+
+    def read():
+        calls.append(1)
+        return {'rows': len(calls)}
+
+    assert reads.do(('contacts', 'get'), read, ttl=60) == {'rows': 1}
+    assert reads.do(('contacts', 'get'), read, ttl=60) == {'rows': 1}
+    assert reads.hits == 1
+    reads.invalidate('contacts')
+    assert reads.do(('contacts', 'get'), read, ttl=60) == {'rows': 2}
+
+
+class Service:
+    @classmethod
+    @invalidates('contacts')
+    def write(cls, fail=False):
+        if fail:
+            raise RuntimeError('timed out')
+        return 'ok'
+
+    @classmethod
+    @invalidates('contacts')
+    async def write_async(cls, fail=False):
+        if fail:
+            raise RuntimeError('timed out')
+        return 'ok'
+
+
+def cached_read():
+    return supabase_reads.do(('contacts', 'cached'), lambda: {'rows': 1}, ttl=60)
+
+
+@pytest.mark.parametrize('fail', [False, True])
+def test_writes_invalidate_even_when_they_raise(fail):
+    cached_read()
+    hits = supabase_reads.hits
+    cached_read()
+    assert supabase_reads.hits == hits + 1
+    hits += 1
+
+    try:
+        assert Service.write(fail=fail) == 'ok'
+    except RuntimeError:
+        assert fail
+    cached_read()
+    assert supabase_reads.hits == hits
+
+
+@pytest.mark.parametrize('fail', [False, True])
+def test_async_writes_invalidate_even_when_they_raise(fail):
+    cached_read()
+    hits = supabase_reads.hits
+
+    try:
+        assert asyncio.run(Service.write_async(fail=fail)) == 'ok'
+    except RuntimeError:
+        assert fail
+    cached_read()
+    assert supabase_reads.hits == hits
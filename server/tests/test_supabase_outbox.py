@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+import extensions
+from extensions import db
+from models.outbox import SupabaseOutbox
+from services.supabase_outbox import add_to_outbox, flush_outbox, requeue_failed
+
+
+class RecordingClient:
+    """Wraps the Supabase client, recording each upsert and the outbox state seen during it."""
+
+    def __init__(self, client, fail=False):
+        self.client = client
+        self.fail = fail
+        self.upserts = []
+
+    def table(self, name):
+        outer = self
+
+        class Table:
+            def upsert(self, rows, on_conflict=''):
+                # Read through a separate connection, as another process would
+                with db.engine.connect() as connection:
+                    statuses = connection.execute(select(SupabaseOutbox.status)).scalars().all()
+                outer.upserts.append((name, rows, statuses))
+                if outer.fail:
+                    raise RuntimeError('supabase unavailable')
+                return outer.client.table(name).upsert(rows, on_conflict=on_conflict)
+
+        return Table()
+
+
+@pytest.fixture
+def client_proxy(monkeypatch):
+    proxy = RecordingClient(extensions.supabase_client)
+    monkeypatch.setattr(extensions, 'supabase_client', proxy)
+    return proxy
+
+
+def queue(*ids, table='outbox_test'):
+    for row_id in ids:
+        add_to_outbox(table, {'id': row_id, 'name': f'row {row_id}'})
+    db.session.commit()
+
+
+def test_rows_are_upserted_and_removed(client_proxy):
+    queue('a', 'b')
+    assert flush_outbox() == 2
+    assert SupabaseOutbox.query.count() == 0
+    stored = client_proxy.client.table('outbox_test').select('*').eq('id', 'a').execute().data
+    assert stored[0]['name'] == 'row a'
+
+
+def test_batch_is_claimed_before_the_request(client_proxy):
+    queue('a', 'b')
+    flush_outbox()
+    # Committed as sending before the HTTP call, so no row lock was held during it
+    assert client_proxy.upserts[0][2] == ['sending', 'sending']
+
+
+def test_newest_payload_wins_within_a_batch(client_proxy):
+    add_to_outbox('outbox_test', {'id': 'a', 'name': 'old'})
+    add_to_outbox('outbox_test', {'id': 'a', 'name': 'new'})
+    db.session.commit()
+    assert flush_outbox() == 2
+    assert client_proxy.upserts[0][1] == [{'id': 'a', 'name': 'new'}]
+
+
+def test_failures_back_off_then_fail(app, client_proxy, monkeypatch):
+    client_proxy.fail = True
+    monkeypatch.setitem(app.config, 'SUPABASE_OUTBOX_MAX_ATTEMPTS', 2)
+    queue('a')
+
+    assert flush_outbox() == 0
+    entry = SupabaseOutbox.query.one()
+    assert (entry.status, entry.attempts) == ('pending', 1)
+    assert entry.next_attempt_at > datetime.utcnow()
+
+    entry.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    flush_outbox()
+    assert SupabaseOutbox.query.one().status == 'failed'
+
+
+def test_lapsed_claims_are_sent_again(client_proxy):
+    queue('a')
+    entry = SupabaseOutbox.query.one()
+    entry.status = 'sending'
+    entry.next_attempt_at = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+    assert flush_outbox() == 0
+
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert flush_outbox() == 1
+
+
+def test_requeue_failed_rows(client_proxy):
+    queue('a', 'b')
+    queue('c', table='other_table')
+    SupabaseOutbox.query.update({SupabaseOutbox.status: 'failed', SupabaseOutbox.attempts: 8})
+    db.session.commit()
+
+    assert requeue_failed('outbox_test') == 2
+    assert flush_outbox() == 2
+    assert [entry.table_name for entry in SupabaseOutbox.query] == ['other_table']
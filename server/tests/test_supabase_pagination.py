@@ -0,0 +1,132 @@
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+
+import extensions
+from services.fake_supabase import FakeQuery
+from services.supabase_service import SupabaseService
+
+TABLE = 'pagination_test'
+
+
+@pytest.fixture
+def supabase():
+    client = extensions.supabase_client
+    client.table(TABLE).delete().execute()
+    yield client
+    client.table(TABLE).delete().execute()
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Every request sent to the fake backend, as (method, count mode)."""
+    sent = []
+    execute = FakeQuery.execute
+
+    def recording_execute(query):
+        sent.append((query.method, query.count))
+        return execute(query)
+
+    monkeypatch.setattr(FakeQuery, 'execute', recording_execute)
+    return sent
+
+
+def add_rows(supabase, count):
+    # Rows 4 and 5 share a timestamp, so the cursor has to break the tie on id
+    rows = [{'id': n, 'created_at': f'2024-01-{min(n, 4):02d}T00:00:00'} for n in range(1, count + 1)]
+    if rows:
+        supabase.table(TABLE).insert(rows).execute()
+
+
+def ids(result):
+    return [row['id'] for row in result['items']]
+
+
+def test_page_and_exact_count_come_back_in_one_request(supabase, requests):
+    add_rows(supabase, 5)
+    requests.clear()
+
+    result = SupabaseService.paginate(supabase, TABLE, page=1, page_size=2)
+    assert requests == [('select', 'exact')]
+    assert ids(result) == [5, 4]
+    assert (result['page'], result['total'], result['pages']) == (1, 5, 3)
+
+
+def test_last_and_past_the_end_pages(supabase):
+    add_rows(supabase, 5)
+
+    last = SupabaseService.paginate(supabase, TABLE, page=3, page_size=2)
+    assert ids(last) == [1]
+    assert last['pages'] == 3
+
+    past = SupabaseService.paginate(supabase, TABLE, page=4, page_size=2)
+    assert ids(past) == []
+    assert past['total'] == 5
+
+
+def test_empty_table(supabase):
+    result = SupabaseService.paginate(supabase, TABLE, page=1, page_size=2)
+    assert (result['items'], result['total'], result['pages']) == ([], 0, 0)
+
+    result = SupabaseService.paginate(supabase, TABLE, page_size=2, cursor='')
+    assert (result['items'], result['total'], result['next_cursor']) == ([], 0, None)
+
+
+@pytest.mark.parametrize('count', [5, 6])
+def test_cursor_walks_every_row_once(supabase, requests, count):
+    add_rows(supabase, count)
+    requests.clear()
+
+    seen, cursor = [], ''
+    while cursor is not None:
+        result = SupabaseService.paginate(supabase, TABLE, page_size=2, cursor=cursor, count=None)
+        assert result['total'] is None
+        seen.extend(ids(result))
+        cursor = result['next_cursor']
+
+    assert seen == list(range(count, 0, -1))
+    # The extra row fetched per page tells when to stop, so a full last page needs no empty request
+    assert requests == [('select', None)] * ((count + 1) // 2)
+
+
+def test_cursor_with_filters(supabase):
+    add_rows(supabase, 5)
+    supabase.table(TABLE).update({'status': 'open'}).eq('id', 2).execute()
+    supabase.table(TABLE).update({'status': 'open'}).eq('id', 5).execute()
+
+    first = SupabaseService.paginate(supabase, TABLE, page_size=1, filters={'status': 'open'}, cursor='')
+    assert (ids(first), first['total']) == ([5], 2)
+    second = SupabaseService.paginate(supabase, TABLE, page_size=1, filters={'status': 'open'},
+                                      cursor=first['next_cursor'])
+    assert (ids(second), second['next_cursor']) == ([2], None)
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'bm9wZQ', SupabaseService.encode_cursor({'created_at': 1, 'id': 2})])
+def test_malformed_cursor_is_rejected(supabase, cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        SupabaseService.paginate(supabase, TABLE, cursor=cursor)
+
+
+def test_total_is_read_from_the_content_range_header():
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json=[{'id': 5}, {'id': 4}], headers={'Content-Range': '0-1/5'})
+
+    class MockPostgrestClient(SyncPostgrestClient):
+        def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+            return httpx.Client(base_url=base_url, headers=headers, transport=httpx.MockTransport(handler))
+
+    class Client:
+        def __init__(self):
+            self.postgrest = MockPostgrestClient('http://rest.test')
+
+        def table(self, name):
+            return self.postgrest.from_(name)
+
+    result = SupabaseService.paginate(Client(), TABLE, page=1, page_size=2)
+    assert (ids(result), result['total'], result['pages']) == ([5, 4], 5, 3)
+    assert len(sent) == 1
+    assert 'count=exact' in sent[0].headers['prefer']
+    assert sent[0].url.params['order'] == 'created_at.desc,id.desc'
@@ -0,0 +1,96 @@
+import atexit
+import threading
+import time
+
+import pytest
+
+from services.task_dispatcher import TaskDispatcher
+
+
+@pytest.fixture
+def make_dispatcher(app, monkeypatch):
+    monkeypatch.setattr(atexit, 'register', lambda f: f)
+    dispatchers = []
+
+    def make(workers=2, queue_size=100, max_attempts=3, retry_delay=0.05):
+        monkeypatch.setitem(app.config, 'TASK_DISPATCH_WORKERS', workers)
+        monkeypatch.setitem(app.config, 'TASK_DISPATCH_QUEUE_SIZE', queue_size)
+        monkeypatch.setitem(app.config, 'TASK_DISPATCH_MAX_ATTEMPTS', max_attempts)
+        monkeypatch.setitem(app.config, 'TASK_DISPATCH_RETRY_DELAY', retry_delay)
+        dispatcher = TaskDispatcher(shutdown_timeout=5)
+        dispatcher.init_app(app)
+        dispatchers.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in dispatchers:
+        dispatcher.shutdown()
+
+
+def test_failing_task_is_retried_with_backoff(make_dispatcher):
+    dispatcher = make_dispatcher()
+    attempts = []
+    done = threading.Event()
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise ConnectionError('SMTP unavailable')
+        done.set()
+
+    dispatcher.submit(flaky)
+    assert done.wait(5)
+    assert len(attempts) == 3
+    # 0.05s before the second attempt, doubled before the third
+    assert attempts[1] - attempts[0] >= 0.05
+    assert attempts[2] - attempts[1] >= 0.1
+
+
+def test_task_returning_false_stops_after_max_attempts(make_dispatcher):
+    dispatcher = make_dispatcher(max_attempts=2, retry_delay=0.01)
+    attempts = []
+
+    dispatcher.submit(lambda: attempts.append(1) or False, description='always fails')
+    deadline = time.monotonic() + 5
+    while len(attempts) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(attempts) == 2
+
+
+def test_full_queue_runs_the_task_inline(make_dispatcher):
+    dispatcher = make_dispatcher(workers=1, queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+    ran_on = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    dispatcher.submit(blocking)
+    assert started.wait(5)
+    # Fills the queue while the only worker is busy
+    dispatcher.submit(lambda: ran_on.append(threading.current_thread()))
+    dispatcher.submit(lambda: ran_on.append(threading.current_thread()))
+    assert ran_on == [threading.current_thread()]
+
+    release.set()
+    dispatcher.shutdown()
+    assert len(ran_on) == 2 and ran_on[1] is not threading.current_thread()
+
+
+def test_shutdown_drains_the_queue(make_dispatcher):
+    dispatcher = make_dispatcher(workers=1)
+    done = []
+
+    def slow(n):
+        time.sleep(0.02)
+        done.append(n)
+
+    for n in range(5):
+        dispatcher.submit(slow, n)
+    dispatcher.shutdown()
+
+    assert done == [0, 1, 2, 3, 4]
+    assert not any(thread.is_alive() for thread in dispatcher._threads)
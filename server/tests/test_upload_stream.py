@@ -0,0 +1,134 @@
+import io
+import json
+import os
+
+import httpx
+import pytest
+from storage3.exceptions import StorageApiError
+
+import extensions
+
+from services.supabase_clients import StreamingBucket
+from services.upload_stream import MalformedUpload, UploadTooLarge, open_multipart_file
+
+BOUNDARY = 'test-boundary-7MA4YWxkTrZu0gW'
+CONTENT_TYPE = f'multipart/form-data; boundary={BOUNDARY}'
+
+
+def multipart_body(data, field='file', filename='clip.bin'):
+    return (
+        f'--{BOUNDARY}\r\n'
+        f'Content-Disposition: form-data; name="title"\r\n\r\n'
+        f'holiday\r\n'
+        f'--{BOUNDARY}\r\n'
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+def binary_payload(megabytes=20):
+    # Random bytes with line breaks and partial boundaries, which the decoder must hold back and release
+    tricky = b'\r\n--' + BOUNDARY[:10].encode() + b'\r\n\r\n'
+    return b''.join(os.urandom(1024 * 1024 - len(tricky)) + tricky for _ in range(megabytes))
+
+
+def test_binary_file_streams_across_many_chunks():
+    data = binary_payload()
+    stream = io.BytesIO(multipart_body(data))
+
+    file = open_multipart_file(stream, CONTENT_TYPE, 'file', chunk_size=64 * 1024)
+    chunks = list(file)
+
+    assert file.filename == 'clip.bin'
+    assert file.content_type == 'application/octet-stream'
+    assert len(chunks) > 20
+    assert b''.join(chunks) == data
+    assert file.size == len(data)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 7, 21, 4096])
+def test_small_reads_return_the_same_bytes(chunk_size):
+    data = binary_payload(megabytes=1)[:100_000]
+    file = open_multipart_file(io.BytesIO(multipart_body(data)), CONTENT_TYPE, 'file', chunk_size=chunk_size)
+    assert b''.join(file) == data
+
+
+def test_size_limit_stops_the_stream():
+    file = open_multipart_file(io.BytesIO(multipart_body(b'x' * 300_000)), CONTENT_TYPE, 'file',
+                               max_size=100_000, chunk_size=64 * 1024)
+    with pytest.raises(UploadTooLarge):
+        for _ in file:
+            pass
+
+
+def test_missing_field_and_truncated_body_are_malformed():
+    with pytest.raises(MalformedUpload):
+        open_multipart_file(io.BytesIO(multipart_body(b'data')), CONTENT_TYPE, 'image')
+    with pytest.raises(MalformedUpload):
+        open_multipart_file(io.BytesIO(b'{}'), 'application/json', 'file')
+
+    truncated = multipart_body(b'x' * 10_000)[:-2000]
+    file = open_multipart_file(io.BytesIO(truncated), CONTENT_TYPE, 'file')
+    with pytest.raises(MalformedUpload):
+        b''.join(file)
+
+
+def test_streaming_bucket_sends_chunks_as_the_object_body():
+    requests = []
+
+    def handler(request):
+        requests.append((request, b''.join(request.stream)))
+        return httpx.Response(200, json={'Key': 'uploads/a b.bin'})
+
+    session = httpx.Client(base_url='http://storage.test/storage/v1', transport=httpx.MockTransport(handler))
+    bucket = StreamingBucket('uploads', session)
+    chunks = [b'one', b'two', b'three']
+
+    assert bucket.upload_stream('a b.bin', iter(chunks), 'video/mp4', upsert=True) == {
+        'path': 'a b.bin', 'Key': 'uploads/a b.bin'
+    }
+    request, body = requests[0]
+    assert request.url.raw_path == b'/storage/v1/object/uploads/a%20b.bin'
+    assert request.headers['content-type'] == 'video/mp4'
+    assert request.headers['x-upsert'] == 'true'
+    assert body == b'onetwothree'
+
+
+def test_streaming_bucket_raises_storage_errors():
+    def handler(request):
+        b''.join(request.stream)
+        return httpx.Response(409, content=json.dumps({
+            'statusCode': '409', 'error': 'Duplicate', 'message': 'The resource already exists'
+        }))
+
+    session = httpx.Client(base_url='http://storage.test', transport=httpx.MockTransport(handler))
+    with pytest.raises(StorageApiError, match='already exists'):
+        StreamingBucket('uploads', session).upload_stream('a.bin', [b'x'])
+
+
+def test_fake_bucket_streams_and_discards_aborted_uploads():
+    bucket = extensions.supabase_client.storage.from_('uploads')
+    bucket.upload_stream('streams/ok.bin', iter([b'a', b'b']))
+    assert bucket.download('streams/ok.bin') == b'ab'
+
+    def failing():
+        yield b'partial'
+        raise MalformedUpload('client went away')
+
+    with pytest.raises(MalformedUpload):
+        bucket.upload_stream('streams/aborted.bin', failing())
+    assert not bucket.exists('streams/aborted.bin')
+
+
+def test_streaming_bucket_reads_only_the_head_of_an_object():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        # A server that ignores the range still only has its first bytes read
+        return httpx.Response(200, content=b'x' * 100_000)
+
+    session = httpx.Client(base_url='http://storage.test', transport=httpx.MockTransport(handler))
+    assert StreamingBucket('uploads', session).download_head('a.mp4', 64) == b'x' * 64
+    assert requests[0].headers['range'] == 'bytes=0-63'
+    assert requests[0].url.raw_path == b'/object/uploads/a.mp4'
@@ -0,0 +1,38 @@
+import atexit
+from datetime import datetime
+
+from extensions import db
+from models.blog import BlogPost
+from services.view_counter import ViewCounter, view_counter
+
+
+def make_post(slug):
+    post = BlogPost(title=slug, slug=slug, content='body', status='published', published_at=datetime.utcnow())
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+def test_views_are_buffered_then_written_in_one_flush(client):
+    first, second = make_post('first'), make_post('second')
+    view_counter.flush()  # restarts the flush interval, so nothing is flushed inline
+    for post_id in (first.id, first.id, second.id):
+        assert client.post(f'/api/blog/posts/{post_id}/views').status_code == 202
+
+    assert view_counter.flush() == 2
+    db.session.expire_all()
+    assert (first.view_count, second.view_count) == (2, 1)
+    assert view_counter.flush() == 0
+
+
+def test_invalid_post_id_is_rejected(client):
+    assert client.post('/api/blog/posts/not-a-uuid/views').status_code == 400
+
+
+def test_init_app_registers_one_exit_handler(app, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    counter = ViewCounter()
+    for _ in range(3):
+        counter.init_app(app)
+    assert registered == [counter.shutdown]
@@ -0,0 +1,14 @@
+# worker.py - Background job worker, run alongside the web process
+import argparse
+
+from app import app
+from services.job_queue import work
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued background jobs.")
+    parser.add_argument('--burst', action='store_true', help="exit once no jobs are due instead of polling")
+    args = parser.parse_args()
+
+    with app.app_context():
+        processed = work(burst=args.burst)
+    print(f"Processed {processed} jobs")